@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('builds', '0004_add-apiversion-proxy-model'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='buildcommandresult',
+            name='output_compressed',
+            field=models.BinaryField(blank=True, editable=False, null=True, verbose_name='Compressed command output'),
+        ),
+        migrations.AlterField(
+            model_name='buildcommandresult',
+            name='end_time',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='End time'),
+        ),
+        migrations.AlterField(
+            model_name='buildcommandresult',
+            name='exit_code',
+            field=models.IntegerField(blank=True, null=True, verbose_name='Command exit code'),
+        ),
+    ]
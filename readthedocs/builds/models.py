@@ -7,6 +7,7 @@ from __future__ import (
 import logging
 import os.path
 import re
+import zlib
 from builtins import object
 from shutil import rmtree
 
@@ -494,7 +495,14 @@ class BuildCommandResultMixin(object):
 @python_2_unicode_compatible
 class BuildCommandResult(BuildCommandResultMixin, models.Model):
 
-    """Build command for a ``Build``."""
+    """
+    Build command for a ``Build``.
+
+    Commands are saved without ``exit_code`` and ``end_time`` while they
+    run. Outputs longer than ``BUILD_COMMAND_OUTPUT_COMPRESS_SIZE`` are
+    stored compressed in ``output_compressed``, :py:attr:`output` always
+    holds the whole output of loaded instances.
+    """
 
     build = models.ForeignKey(
         Build, verbose_name=_('Build'), related_name='commands')
@@ -502,10 +510,13 @@ class BuildCommandResult(BuildCommandResultMixin, models.Model):
     command = models.TextField(_('Command'))
     description = models.TextField(_('Description'), blank=True)
     output = models.TextField(_('Command output'), blank=True)
-    exit_code = models.IntegerField(_('Command exit code'))
+    output_compressed = models.BinaryField(
+        _('Compressed command output'), blank=True, null=True, editable=False)
+    exit_code = models.IntegerField(
+        _('Command exit code'), blank=True, null=True)
 
     start_time = models.DateTimeField(_('Start time'))
-    end_time = models.DateTimeField(_('End time'))
+    end_time = models.DateTimeField(_('End time'), blank=True, null=True)
 
     class Meta(object):
         ordering = ['start_time']
@@ -518,6 +529,33 @@ class BuildCommandResult(BuildCommandResultMixin, models.Model):
             ugettext('Build command {pk} for build {build}')
             .format(pk=self.pk, build=self.build))
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super(BuildCommandResult, cls).from_db(
+            db, field_names, values)
+        compressed = instance.__dict__.get('output_compressed')
+        if compressed:
+            # Output appended after compressing is still plain text
+            instance.output = (
+                zlib.decompress(bytes(compressed)).decode('utf-8') +
+                instance.__dict__.get('output', '')
+            )
+            instance.output_compressed = None
+        return instance
+
+    def save(self, *args, **kwargs):  # pylint: disable=arguments-differ
+        compress_size = getattr(
+            settings, 'BUILD_COMMAND_OUTPUT_COMPRESS_SIZE', None)
+        output = self.output
+        if compress_size and output and len(output) > compress_size:
+            self.output_compressed = zlib.compress(output.encode('utf-8'))
+            self.output = ''
+        try:
+            return super(BuildCommandResult, self).save(*args, **kwargs)
+        finally:
+            self.output = output
+            self.output_compressed = None
+
     @property
     def run_time(self):
         """Total command runtime in seconds."""
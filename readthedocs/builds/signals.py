@@ -5,3 +5,7 @@ import django.dispatch
 
 
 build_complete = django.dispatch.Signal(providing_args=['build'])
+
+# Sent once the versions of a project are synced with its repository, versions
+# created and updated in bulk don't send the model signals
+versions_synced = django.dispatch.Signal(providing_args=['project'])
@@ -7,7 +7,10 @@ function BuildCommand(data) {
     self.id = ko.observable(data.id);
     self.command = ko.observable(data.command);
     self.output = ko.observable(data.output);
-    self.exit_code = ko.observable(data.exit_code || 0);
+    // Commands are saved while they run, without an exit code
+    self.running = ko.observable(
+        data.exit_code === null || data.exit_code === undefined);
+    self.exit_code = ko.observable(self.running() ? null : data.exit_code);
     self.successful = ko.observable(self.exit_code() === 0);
     self.run_time = ko.observable(data.run_time);
     self.is_showing = ko.observable(!self.successful());
@@ -17,6 +20,9 @@ function BuildCommand(data) {
     };
 
     self.command_status = ko.computed(function () {
+        if (self.running()) {
+            return 'build-command-running';
+        }
         return self.successful() ?
             'build-command-successful' :
             'build-command-failed';
@@ -81,6 +87,11 @@ function BuildDetailView(instance) {
                 );
                 if (!match) {
                     self.commands.push(command);
+                } else if (match.output !== command.output ||
+                           match.exit_code !== command.exit_code ||
+                           match.run_time !== command.run_time) {
+                    // The command was still running at the previous poll
+                    self.commands.replace(match, command);
                 }
             }
         });
@@ -8,13 +8,17 @@ local machine.
 from __future__ import absolute_import
 
 import getpass
+import hashlib
+import json
 import logging
 import os
 import shutil
+import uuid
 
 from builtins import object
 from django.conf import settings
 
+from readthedocs.core.symlink import atomic_symlink
 from readthedocs.core.utils.extend import SettingsOverrideObject
 from readthedocs.core.utils import safe_makedirs
 
@@ -41,6 +45,185 @@ class LocalSyncer(object):
             shutil.copytree(path, target)
 
 
+class LocalDeltaSyncer(LocalSyncer):
+
+    """
+    Local syncer that only copies the files that changed since the last sync.
+
+    A manifest of content hashes is kept next to each synced directory. On
+    every sync a staging tree is assembled by hardlinking the unchanged files
+    from the published tree and copying the changed ones from the build
+    output, so removed files simply disappear.
+
+    The target is a symlink to the published tree, a hidden directory next
+    to it: publishing the staging tree atomically replaces the symlink, so
+    the target is never missing.
+    """
+
+    MANIFEST_TEMPLATE = '.{name}.manifest.json'
+    TREE_TEMPLATE = '.{name}.sync-{id}'
+    CHUNK_SIZE = 64 * 1024
+
+    @classmethod
+    def copy(cls, path, target, is_file=False, **kwargs):
+        """
+        Sync ``path`` to ``target``, returning the transfer stats.
+
+        Files are copied as-is by :py:class:`LocalSyncer`, only directories
+        are synced incrementally.
+        """
+        if is_file:
+            return super(LocalDeltaSyncer, cls).copy(
+                path, target, is_file=is_file, **kwargs)
+
+        log.info("Local Delta Copy %s to %s", path, target)
+        target = target.rstrip('/')
+        manifest_path = cls.manifest_path(target)
+        old_manifest = cls.load_manifest(manifest_path, target)
+        new_manifest = cls.build_manifest(path)
+
+        stats = {
+            'files_copied': 0,
+            'files_linked': 0,
+            'files_deleted': 0,
+            'bytes_copied': 0,
+        }
+        staging = os.path.join(
+            os.path.dirname(target),
+            cls.TREE_TEMPLATE.format(
+                name=os.path.basename(target), id=uuid.uuid4().hex),
+        )
+        os.makedirs(staging)
+        try:
+            cls.stage(path, target, staging, old_manifest, new_manifest, stats)
+            cls.swap(staging, target)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        cls.save_manifest(manifest_path, new_manifest)
+        log.info(
+            "Local Delta Copy %s to %s: %s files copied (%s bytes), "
+            "%s files unchanged, %s files deleted",
+            path, target, stats['files_copied'], stats['bytes_copied'],
+            stats['files_linked'], stats['files_deleted'],
+        )
+        return stats
+
+    @staticmethod
+    def stage(path, target, staging, old_manifest, new_manifest, stats):
+        """Assemble in ``staging`` the tree to publish, updating ``stats``."""
+        for root, dirs, __ in os.walk(path):
+            for dirname in dirs:
+                relpath = os.path.relpath(os.path.join(root, dirname), path)
+                staging_dir = os.path.join(staging, relpath)
+                if not os.path.isdir(staging_dir):
+                    os.makedirs(staging_dir)
+
+        for relpath, (digest, size) in new_manifest.items():
+            staging_file = os.path.join(staging, relpath)
+            target_file = os.path.join(target, relpath)
+            old_entry = old_manifest.get(relpath)
+            if (old_entry and old_entry[0] == digest and
+                    os.path.isfile(target_file)):
+                try:
+                    os.link(target_file, staging_file)
+                    stats['files_linked'] += 1
+                    continue
+                except OSError:
+                    # Different filesystem or no hardlink support: copy
+                    pass
+            shutil.copy2(os.path.join(path, relpath), staging_file)
+            stats['files_copied'] += 1
+            stats['bytes_copied'] += size
+        stats['files_deleted'] = len(set(old_manifest) - set(new_manifest))
+
+    @classmethod
+    def manifest_path(cls, target):
+        """Path of the manifest for ``target``, outside of the served tree."""
+        return os.path.join(
+            os.path.dirname(target),
+            cls.MANIFEST_TEMPLATE.format(name=os.path.basename(target)),
+        )
+
+    @classmethod
+    def file_hash(cls, path):
+        """Return the md5 of the file at ``path`` reading it in chunks."""
+        digest = hashlib.md5()
+        with open(path, 'rb') as fd:
+            for chunk in iter(lambda: fd.read(cls.CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @classmethod
+    def build_manifest(cls, path):
+        """
+        Hash every file under ``path``.
+
+        :returns: a dict mapping the relative path of each file to a
+            ``[md5, size]`` pair
+        """
+        manifest = {}
+        for root, __, filenames in os.walk(path):
+            for filename in filenames:
+                full_path = os.path.join(root, filename)
+                relpath = os.path.relpath(full_path, path)
+                manifest[relpath] = [
+                    cls.file_hash(full_path),
+                    os.path.getsize(full_path),
+                ]
+        return manifest
+
+    @classmethod
+    def load_manifest(cls, manifest_path, target):
+        """
+        Load the manifest of the currently published tree.
+
+        If the manifest is missing or unreadable but the tree exists (e.g. it
+        was published by another syncer) the manifest is rebuilt from disk,
+        which costs reads but no writes.
+        """
+        if not os.path.isdir(target):
+            return {}
+        try:
+            with open(manifest_path) as fd:
+                return json.load(fd)
+        except (IOError, OSError, ValueError):
+            return cls.build_manifest(target)
+
+    @classmethod
+    def save_manifest(cls, manifest_path, manifest):
+        tmp_path = '{0}.tmp'.format(manifest_path)
+        with open(tmp_path, 'w') as fd:
+            json.dump(manifest, fd)
+        os.rename(tmp_path, manifest_path)
+
+    @staticmethod
+    def swap(staging, target):
+        """
+        Point ``target`` to ``staging`` and remove the old tree.
+
+        A directory published otherwise is moved aside for the time it takes
+        to create the symlink, and moved back if that fails.
+        """
+        link = os.path.basename(staging)
+        if os.path.islink(target):
+            old = os.path.join(os.path.dirname(target), os.readlink(target))
+            atomic_symlink(link, target)
+            shutil.rmtree(old, ignore_errors=True)
+            return
+        if not os.path.exists(target):
+            atomic_symlink(link, target)
+            return
+        old = '{0}.old-{1}'.format(target, os.getpid())
+        os.rename(target, old)
+        try:
+            atomic_symlink(link, target)
+        except OSError:
+            os.rename(old, target)
+            raise
+        shutil.rmtree(old)
+
+
 class RemoteSyncer(object):
 
     @classmethod
@@ -128,21 +128,9 @@ class VersionSlugField(models.CharField):
         """Generate a unique slug for a model instance."""
         # pylint: disable=protected-access
 
-        # get fields to populate from and slug field to set
-        slug_field = model_instance._meta.get_field(self.attname)
-
-        slug = self.slugify(getattr(model_instance, self._populate_from))
-        count = 0
-
-        # strip slug depending on max_length attribute of the slug field
-        # and clean-up
-        slug_len = slug_field.max_length
-        if slug_len:
-            slug = slug[:slug_len]
-        original_slug = slug
-
         # exclude the current model instance from the queryset used in finding
         # the next valid slug
+        slug_field = model_instance._meta.get_field(self.attname)
         queryset = self.get_queryset(model_instance.__class__, slug_field)
         if model_instance.pk:
             queryset = queryset.exclude(pk=model_instance.pk)
@@ -153,18 +141,42 @@ class VersionSlugField(models.CharField):
             if self.attname in params:
                 for param in params:
                     kwargs[param] = getattr(model_instance, param, None)
-        kwargs[self.attname] = slug
+
+        def is_taken(slug):
+            kwargs[self.attname] = slug
+            return queryset.filter(**kwargs).exists()
+
+        return self.uniquify(
+            getattr(model_instance, self._populate_from), is_taken)
+
+    def uniquify(self, content, is_taken):
+        """
+        Return a slug for ``content`` for which ``is_taken`` is false.
+
+        Used to allocate slugs without querying the database for each one,
+        e.g. checking against a set of the slugs already in use.
+
+        :param is_taken: callable telling if a slug is already used
+        """
+        slug = self.slugify(content)
+        count = 0
+
+        # strip slug depending on max_length attribute of the slug field
+        # and clean-up
+        slug_len = self.max_length
+        if slug_len:
+            slug = slug[:slug_len]
+        original_slug = slug
 
         # increases the number while searching for the next valid slug
         # depending on the given slug, clean-up
-        while not slug or queryset.filter(**kwargs):
+        while not slug or is_taken(slug):
             slug = original_slug
             end = self.uniquifying_suffix(count)
             end_len = len(end)
             if slug_len and len(slug) + end_len > slug_len:
                 slug = slug[:slug_len - end_len]
             slug = slug + end
-            kwargs[self.attname] = slug
             count += 1
 
         assert self.test_pattern.match(slug), (
@@ -3,10 +3,9 @@
 from __future__ import absolute_import
 import logging
 
-from django.conf import settings
 from django.core.management.base import BaseCommand
 
-from elasticsearch import Elasticsearch
+from readthedocs.search.client import get_es_client
 from readthedocs.search.indexes import Index, PageIndex, ProjectIndex, SectionIndex
 
 log = logging.getLogger(__name__)
@@ -31,7 +30,7 @@ class Command(BaseCommand):
         self._provision_es()
 
     def _index_exists(self):
-        indexes = len(Elasticsearch(settings.ES_HOSTS).indices.get_alias())
+        indexes = len(get_es_client().indices.get_alias())
         return bool(indexes)
 
     def _provision_es(self):
@@ -1,13 +1,25 @@
 # -*- coding: utf-8 -*-
-"""Reindex Elastic Search indexes."""
+"""
+Reindex Elastic Search indexes.
+
+By default a search update task is queued for every version, updating the
+live index. With ``--new-index`` every version is indexed by this command
+into a new index instead, the alias used by search is then moved to it at
+once and the previous index is deleted: search keeps working on the
+previous index for the whole reindex.
+"""
 
 from __future__ import (
     absolute_import, division, print_function, unicode_literals)
 
 import logging
+import time
+from multiprocessing.pool import ThreadPool
 from optparse import make_option
 
+from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
 
 from readthedocs.builds.constants import LATEST
 from readthedocs.builds.models import Version
@@ -15,6 +27,11 @@ from readthedocs.docsitalia.models import PublisherProject
 from readthedocs.docsitalia.utils import get_projects_with_builds
 from readthedocs.projects.models import Project
 from readthedocs.projects.tasks import update_search
+from readthedocs.restapi.utils import index_search_request
+from readthedocs.search.cache import invalidate_search_cache
+from readthedocs.search.indexes import (
+    Index, PageIndex, ProjectIndex, SectionIndex)
+from readthedocs.search.parse_json import iter_all_json_files
 
 
 log = logging.getLogger(__name__)
@@ -33,12 +50,25 @@ class Command(BaseCommand):
                     default=False,
                     action='store_true',
                     help='Only index latest'),
+        make_option('--new-index',
+                    dest='new_index',
+                    default=False,
+                    action='store_true',
+                    help='Index in a new index and switch search to it'),
+        make_option('-j',
+                    dest='jobs',
+                    default=4,
+                    type='int',
+                    help='Versions indexed at the same time with --new-index'),
     )
 
     def handle(self, *args, **options):
         """Build/index all versions or a single project's version."""
         project = options['project']
         only_latest = options['only_latest']
+        if project and options['new_index']:
+            raise CommandError(
+                'A new index can only be built with all the projects')
 
         # index only projects with active publisher and publisher project
         publisher_projects = PublisherProject.objects.filter(
@@ -63,6 +93,10 @@ class Command(BaseCommand):
             log.warning('Indexing only latest')
             queryset = queryset.filter(slug=LATEST)
 
+        if options['new_index']:
+            self.reindex(queryset, jobs=options['jobs'])
+            return
+
         for version_pk, version_slug, project_slug in queryset.values_list(
                 'pk', 'slug', 'project__slug'):
             log.info(u'Reindexing %s:%s' % (project_slug, version_slug))
@@ -77,3 +111,106 @@ class Command(BaseCommand):
                 )
             except Exception:
                 log.exception(u'Reindexing failed for %s:%s' % (project_slug, version_slug))
+
+    def reindex(self, queryset, jobs):
+        """Index every version of ``queryset`` in a new index and switch to it."""
+        index = Index()
+        new_index = index.timestamped_index()
+        log.info('Creating index %s', new_index)
+        # Refreshes and replicas only slow down the bulk indexing, they are
+        # restored before the index is used
+        index.create_index(new_index, settings_override={
+            'refresh_interval': '-1',
+            'number_of_replicas': 0,
+        })
+        for index_cls in (ProjectIndex, PageIndex, SectionIndex):
+            index_cls().put_mapping(new_index)
+
+        try:
+            self.index_versions(queryset, new_index, jobs)
+            self.warm_index(index, new_index)
+        except Exception:
+            log.exception('Reindex failed, deleting index %s', new_index)
+            index.es.indices.delete(index=new_index)
+            raise
+
+        log.info('Switching search to index %s', new_index)
+        index.update_aliases(new_index, delete=True)
+        invalidate_search_cache()
+        log.info('Reindex done')
+
+    def index_versions(self, queryset, new_index, jobs):
+        """Index the versions in ``new_index``, ``jobs`` at a time."""
+        versions = list(queryset.select_related('project'))
+        total = len(versions)
+        start = time.time()
+        pages = 0
+        failed = []
+
+        def index_version(version):
+            try:
+                return version, index_search_request(
+                    version=version,
+                    # Forking a process pool from a threaded process can
+                    # deadlock on the locks held by other threads
+                    page_list=iter_all_json_files(
+                        version, build_dir=False, processes=1),
+                    commit='reindex',
+                    project_scale=0,
+                    page_scale=0,
+                    section=False,
+                    delete=False,
+                    index=new_index,
+                )
+            except Exception:
+                log.exception(
+                    'Reindexing failed for %s:%s',
+                    version.project.slug, version.slug)
+                return version, None
+            finally:
+                # Every thread has its own connection
+                connection.close()
+
+        pool = ThreadPool(jobs)
+        try:
+            results = pool.imap_unordered(index_version, versions)
+            for done, (version, indexed) in enumerate(results, 1):
+                if indexed is None:
+                    failed.append(version)
+                    continue
+                pages += indexed
+                elapsed = time.time() - start
+                log.info(
+                    'Reindexed %s:%s (%d/%d versions, %d pages, %.1f pages/s)',
+                    version.project.slug, version.slug, done, total, pages,
+                    pages / elapsed if elapsed else 0,
+                )
+        finally:
+            pool.close()
+            pool.join()
+
+        if failed:
+            raise CommandError('Reindexing failed for {0} versions: {1}'.format(
+                len(failed),
+                ', '.join('{0}:{1}'.format(version.project.slug, version.slug)
+                          for version in failed),
+            ))
+
+    def warm_index(self, index, new_index):
+        """Restore the settings of ``new_index`` and get it ready for search."""
+        index.es.indices.put_settings(index=new_index, body={
+            'index': {
+                'refresh_interval': index.get_settings()['refresh_interval'],
+                'number_of_replicas': settings.ES_DEFAULT_NUM_REPLICAS,
+            },
+        })
+        index.es.indices.refresh(index=new_index)
+        index.es.cluster.health(
+            index=new_index,
+            wait_for_status='yellow',
+            timeout='{0}s'.format(
+                getattr(settings, 'ES_REINDEX_WARM_TIMEOUT', 600)),
+        )
+        # Load the data structures used by search in memory
+        index.es.search(
+            index=new_index, body={'query': {'match_all': {}}}, size=0)
@@ -13,6 +13,7 @@ from django.http import Http404, HttpResponseBadRequest
 
 from readthedocs.core.utils import cname_to_slug
 from readthedocs.projects.models import Project, Domain
+from readthedocs.search.client import get_es_stats
 
 log = logging.getLogger(__name__)
 
@@ -237,3 +238,39 @@ class FooterNoSessionMiddleware(SessionMiddleware):
                     settings.SESSION_COOKIE_NAME not in request.COOKIES):
                 return response
         return super(FooterNoSessionMiddleware, self).process_response(request, response)
+
+
+def get_es_totals():
+    """Return the number of Elasticsearch requests, errors and time spent."""
+    stats = get_es_stats().values()
+    return (
+        sum(op['count'] for op in stats),
+        sum(op['errors'] for op in stats),
+        sum(op['time'] for op in stats),
+    )
+
+
+class ElasticsearchStatsMiddleware(object):
+
+    """
+    Log the Elasticsearch requests made while serving a request.
+
+    The stats are kept per process, requests served at the same time by
+    other threads of the process are counted as well.
+    """
+
+    def process_request(self, request):
+        request.es_stats_start = get_es_totals()
+
+    def process_response(self, request, response):
+        start = getattr(request, 'es_stats_start', None)
+        if start is None:
+            return response
+        count, errors, elapsed = (
+            end - begin for end, begin in zip(get_es_totals(), start))
+        if count:
+            log.info(
+                'Elasticsearch requests: path=%s count=%d errors=%d time=%.3fs',
+                request.path, count, errors, elapsed,
+            )
+        return response
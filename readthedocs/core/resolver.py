@@ -2,14 +2,75 @@
 
 from __future__ import absolute_import
 from builtins import object
+from collections import OrderedDict
 import re
 
 from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
 
+from readthedocs.builds.constants import LATEST
 from readthedocs.projects.constants import PRIVATE, PUBLIC
 from readthedocs.core.utils.extend import SettingsOverrideObject
 
 
+RESOLVER_CACHE_KEY = 'resolver:project:{pk}'
+
+
+def get_resolver_cache_timeout():
+    return getattr(settings, 'RESOLVER_CACHE_TIMEOUT', 60 * 60)
+
+
+def get_canonical_domain(project):
+    """
+    Return the canonical domain name of ``project``, if any.
+
+    Domains are iterated instead of filtered so that prefetched domains are
+    used without hitting the database.
+    """
+    for domain in project.domains.all():
+        if domain.canonical:
+            return domain.domain
+    return None
+
+
+def get_superproject_relation(project):
+    """Return the first relationship where ``project`` is a subproject."""
+    relations = sorted(project.superprojects.all(), key=lambda rel: rel.pk)
+    if relations:
+        return relations[0]
+    return None
+
+
+def invalidate_resolver_cache(project_pks):
+    """
+    Drop the cached resolver data of the given projects.
+
+    The URL of a translation or a subproject is built from its main project,
+    so the projects resolved through the given ones are dropped as well.
+    """
+    from readthedocs.projects.models import Project
+    pks = set(project_pks)
+    keys = set()
+    new_pks = set(pks)
+    # Translations and subprojects are only followed two levels deep
+    for _ in range(0, 3):
+        if not new_pks:
+            break
+        dependants = Project.objects.filter(
+            Q(pk__in=new_pks) |
+            Q(main_language_project__in=new_pks) |
+            Q(superprojects__parent__in=new_pks)
+        ).values_list('pk', 'slug')
+        new_pks = set()
+        for pk, slug in dependants:
+            keys.update(Resolver().get_cache_keys(pk, slug))
+            if pk not in pks:
+                pks.add(pk)
+                new_pks.add(pk)
+    cache.delete_many(list(keys))
+
+
 class ResolverBase(object):
 
     """
@@ -81,7 +142,8 @@ class ResolverBase(object):
                      language=None, single_version=None, subdomain=None,
                      cname=None, private=None):
         """Resolve a URL with a subset of fields defined."""
-        cname = cname or project.domains.filter(canonical=True).first()
+        data = self.get_project_data(project)
+        cname = cname or data['cname']
         version_slug = version_slug or project.get_default_version()
         language = language or project.language
 
@@ -90,37 +152,20 @@ class ResolverBase(object):
 
         filename = self._fix_filename(project, filename)
 
-        current_project = project
-        project_slug = project.slug
-        subproject_slug = None
-        # We currently support more than 2 levels of nesting subprojects and
-        # translations, only loop twice to avoid sticking in the loop
-        for _ in range(0, 2):
-            main_language_project = current_project.main_language_project
-            relation = current_project.superprojects.first()
-
-            if main_language_project:
-                current_project = main_language_project
-                project_slug = main_language_project.slug
-                language = project.language
-                subproject_slug = None
-            elif relation:
-                current_project = relation.parent
-                project_slug = relation.parent.slug
-                subproject_slug = relation.alias
-                cname = relation.parent.domains.filter(canonical=True).first()
-            else:
-                break
+        if data['translation']:
+            language = project.language
+        if data['subproject']:
+            cname = data['subproject_cname']
 
         single_version = bool(project.single_version or single_version)
 
         return self.base_resolve_path(
-            project_slug=project_slug,
+            project_slug=data['project_slug'],
             filename=filename,
             version_slug=version_slug,
             language=language,
             single_version=single_version,
-            subproject_slug=subproject_slug,
+            subproject_slug=data['subproject_slug'],
             cname=cname,
             private=private,
             subdomain=subdomain,
@@ -128,12 +173,11 @@ class ResolverBase(object):
 
     def resolve_domain(self, project, private=None):
         # pylint: disable=unused-argument
-        canonical_project = self._get_canonical_project(project)
-        domain = canonical_project.domains.filter(canonical=True).first()
-        if domain:
-            return domain.domain
+        data = self.get_project_data(project)
+        if data['canonical_domain']:
+            return data['canonical_domain']
         elif self._use_subdomain():
-            return self._get_project_subdomain(canonical_project)
+            return self._get_project_subdomain(project)
         return getattr(settings, 'PRODUCTION_DOMAIN')
 
     def resolve(self, project, protocol='http', filename='', private=None,
@@ -159,6 +203,139 @@ class ResolverBase(object):
                                    **kwargs),
         )
 
+    def resolve_many(self, projects, protocol='http', **kwargs):
+        """
+        Resolve the URLs of a list of projects.
+
+        The resolver data of the projects is loaded in bulk and the default
+        version and privacy of every project are computed from a single
+        query, so the number of queries doesn't depend on the number of
+        projects.
+
+        :returns: an ordered dict mapping each project pk to its URL
+        """
+        from readthedocs.builds.models import Version
+        projects = list(projects)
+        self.prefetch(projects)
+
+        versions = {}
+        version_values = Version.objects.filter(
+            project__in=[project.pk for project in projects],
+        ).values_list('project', 'slug', 'active', 'privacy_level')
+        for project_pk, slug, active, privacy_level in version_values:
+            versions[(project_pk, slug)] = (active, privacy_level)
+
+        urls = OrderedDict()
+        for project in projects:
+            version_slug = kwargs.get('version_slug')
+            if version_slug is None:
+                version_slug = project.default_version
+                active, __ = versions.get((project.pk, version_slug), (False, None))
+                if version_slug != LATEST and not active:
+                    version_slug = LATEST
+            __, privacy_level = versions.get((project.pk, version_slug), (None, None))
+            if privacy_level is None:
+                privacy_level = getattr(settings, 'DEFAULT_PRIVACY_LEVEL', PUBLIC)
+            resolve_kwargs = dict(kwargs, version_slug=version_slug)
+            if 'private' not in resolve_kwargs:
+                resolve_kwargs['private'] = privacy_level == PRIVATE
+            urls[project.pk] = self.resolve(
+                project, protocol=protocol, **resolve_kwargs)
+        return urls
+
+    def get_cache_keys(self, project_pk, project_slug):
+        """Return every cache key that holds resolver data for a project."""
+        # pylint: disable=unused-argument
+        return [RESOLVER_CACHE_KEY.format(pk=project_pk)]
+
+    def get_project_data(self, project):
+        """
+        Return the cached data needed to resolve ``project``.
+
+        This holds everything the resolver would otherwise query for on
+        every call: canonical domains, the translation and subproject chain
+        and the canonical project.
+        """
+        key = RESOLVER_CACHE_KEY.format(pk=project.pk)
+        data = cache.get(key)
+        if data is None:
+            data = self._build_project_data(project)
+            cache.set(key, data, get_resolver_cache_timeout())
+        return data
+
+    def get_prefetch_queryset(self, project_pks):
+        """Projects with all the relations walked by the resolver."""
+        from readthedocs.projects.models import Project
+        return Project.objects.filter(pk__in=project_pks).select_related(
+            'main_language_project',
+        ).prefetch_related(
+            'domains',
+            'superprojects__parent__domains',
+            'superprojects__parent__superprojects__parent__domains',
+            'superprojects__parent__main_language_project__domains',
+            'main_language_project__domains',
+            'main_language_project__superprojects__parent__domains',
+        )
+
+    def prefetch(self, projects):
+        """Load and cache the resolver data of ``projects`` in bulk."""
+        keys = dict(
+            (RESOLVER_CACHE_KEY.format(pk=project.pk), project.pk)
+            for project in projects
+        )
+        cached = cache.get_many(list(keys))
+        missing = [pk for key, pk in keys.items() if key not in cached]
+        if not missing:
+            return
+        data = {}
+        for project in self.get_prefetch_queryset(missing):
+            data.update(self._get_prefetch_cache_data(project))
+        cache.set_many(data, get_resolver_cache_timeout())
+
+    def _get_prefetch_cache_data(self, project):
+        """Cache entries to store for a project loaded by ``prefetch``."""
+        return {
+            RESOLVER_CACHE_KEY.format(pk=project.pk): (
+                self._build_project_data(project)
+            ),
+        }
+
+    def _build_project_data(self, project):
+        """Walk the project relations to compute the resolver data."""
+        data = {
+            'cname': get_canonical_domain(project),
+            'project_slug': project.slug,
+            'subproject_slug': None,
+            'translation': False,
+            'subproject': False,
+            'subproject_cname': None,
+        }
+        current_project = project
+        # We currently support more than 2 levels of nesting subprojects and
+        # translations, only loop twice to avoid sticking in the loop
+        for _ in range(0, 2):
+            main_language_project = current_project.main_language_project
+            relation = get_superproject_relation(current_project)
+
+            if main_language_project:
+                current_project = main_language_project
+                data['project_slug'] = main_language_project.slug
+                data['subproject_slug'] = None
+                data['translation'] = True
+            elif relation:
+                current_project = relation.parent
+                data['project_slug'] = relation.parent.slug
+                data['subproject_slug'] = relation.alias
+                data['subproject'] = True
+                data['subproject_cname'] = get_canonical_domain(relation.parent)
+            else:
+                break
+
+        canonical_project = self._get_canonical_project(project)
+        data['canonical_slug'] = canonical_project.slug
+        data['canonical_domain'] = get_canonical_domain(canonical_project)
+        return data
+
     def _get_canonical_project(self, project, projects=None):
         """
         Recursively get canonical project for subproject or translations.
@@ -179,7 +356,7 @@ class ResolverBase(object):
             projects.append(project)
         next_project = None
 
-        relation = project.superprojects.first()
+        relation = get_superproject_relation(project)
         if project.main_language_project:
             next_project = project.main_language_project
         elif relation:
@@ -192,8 +369,8 @@ class ResolverBase(object):
         """Determine canonical project domain as subdomain."""
         public_domain = getattr(settings, 'PUBLIC_DOMAIN', None)
         if self._use_subdomain():
-            project = self._get_canonical_project(project)
-            subdomain_slug = project.slug.replace('_', '-')
+            canonical_slug = self.get_project_data(project)['canonical_slug']
+            subdomain_slug = canonical_slug.replace('_', '-')
             return "%s.%s" % (subdomain_slug, public_domain)
 
     def _get_private(self, project, version_slug):
@@ -250,3 +427,4 @@ resolver = Resolver()
 resolve_path = resolver.resolve_path
 resolve_domain = resolver.resolve_domain
 resolve = resolver.resolve
+resolve_many = resolver.resolve_many
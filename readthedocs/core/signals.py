@@ -6,13 +6,19 @@ import logging
 
 from corsheaders import signals
 from django.conf import settings
-from django.db.models.signals import pre_delete
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import Signal
 from django.db.models import Q, Count
 from django.dispatch import receiver
 from future.backports.urllib.parse import urlparse
 
-from readthedocs.projects.models import Project, Domain
+from readthedocs.builds.models import Version
+from readthedocs.builds.signals import versions_synced
+from readthedocs.core.resolver import invalidate_resolver_cache
+from readthedocs.projects.models import Project, Domain, ProjectRelationship
+from readthedocs.redirects.models import Redirect
+from readthedocs.redirects.utils import invalidate_redirects_cache
+from readthedocs.restapi.views.footer_views import invalidate_footer_cache
 
 log = logging.getLogger(__name__)
 
@@ -88,4 +94,60 @@ def delete_projects_and_organizations(sender, instance, *args, **kwargs):
     oauth_organizations.delete()
 
 
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def invalidate_project_resolver_cache(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    invalidate_resolver_cache([instance.pk])
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def invalidate_project_footer_cache(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Footers list the translations of the main project, drop all of them."""
+    main_project = instance.main_language_project or instance
+    slugs = set(main_project.translations.values_list('slug', flat=True))
+    slugs.update([instance.slug, main_project.slug])
+    invalidate_footer_cache(slugs)
+
+
+@receiver(post_save, sender=Version)
+@receiver(post_delete, sender=Version)
+def invalidate_version_footer_cache(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    invalidate_footer_cache(
+        Project.objects.filter(pk=instance.project_id).values_list('slug', flat=True))
+
+
+@receiver(versions_synced)
+def invalidate_synced_versions_footer_cache(sender, project, **kwargs):  # pylint: disable=unused-argument
+    invalidate_footer_cache([project.slug])
+
+
+@receiver(post_save, sender=Domain)
+@receiver(post_delete, sender=Domain)
+def invalidate_domain_resolver_cache(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    invalidate_resolver_cache([instance.project_id])
+    invalidate_footer_cache(
+        Project.objects.filter(pk=instance.project_id).values_list('slug', flat=True))
+
+
+@receiver(post_save, sender=ProjectRelationship)
+@receiver(post_delete, sender=ProjectRelationship)
+def invalidate_relationship_resolver_cache(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    invalidate_resolver_cache([instance.parent_id, instance.child_id])
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def invalidate_project_redirects_cache(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """Unknown slugs are cached as well, a new project has to drop them."""
+    invalidate_redirects_cache([instance.slug])
+
+
+@receiver(post_save, sender=Redirect)
+@receiver(post_delete, sender=Redirect)
+def invalidate_redirect_redirects_cache(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    invalidate_redirects_cache(
+        Project.objects.filter(pk=instance.project_id).values_list('slug', flat=True))
+
+
 signals.check_request_enabled.connect(decide_if_cors)
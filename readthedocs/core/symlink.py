@@ -66,11 +66,34 @@ from readthedocs.core.utils.extend import SettingsOverrideObject
 from readthedocs.core.utils import safe_makedirs
 from readthedocs.projects import constants
 from readthedocs.projects.models import Domain
-from readthedocs.projects.utils import run
 
 log = logging.getLogger(__name__)
 
 
+def atomic_symlink(target, link):
+    """
+    Make ``link`` a symlink pointing to ``target``, like ``ln -nsf``.
+
+    The link is left alone if it already points to ``target``. Otherwise a
+    new link is created next to it and renamed over the old one, so there is
+    no moment in which ``link`` is missing.
+
+    :returns: whether the link was created or changed
+    """
+    if os.path.islink(link) and os.readlink(link) == target:
+        return False
+    tmp_link = '{0}.tmp-{1}'.format(link, os.getpid())
+    if os.path.lexists(tmp_link):
+        os.unlink(tmp_link)
+    os.symlink(target, tmp_link)
+    try:
+        os.rename(tmp_link, link)
+    except OSError:
+        os.unlink(tmp_link)
+        raise
+    return True
+
+
 class Symlink(object):
 
     """Base class for symlinking of projects."""
@@ -93,6 +116,19 @@ class Symlink(object):
                        msg=msg)
                )
 
+    def _symlink(self, target, link):
+        """
+        Point ``link`` to ``target``, touching the disk only if it changed.
+
+        Errors are logged and not raised, so a single broken link doesn't
+        stop the rest of the project from being symlinked.
+        """
+        try:
+            if atomic_symlink(target, link):
+                self._log(u"Updated symlink: {0} -> {1}".format(link, target), level='debug')
+        except OSError:
+            log.exception('Could not symlink path: target=%s link=%s', target, link)
+
     def sanity_check(self):
         """
         Make sure the project_root is the proper structure before continuing.
@@ -156,11 +192,11 @@ class Symlink(object):
 
             # CNAME to doc root
             symlink = os.path.join(self.CNAME_ROOT, dom.domain)
-            run(['ln', '-nsf', self.project_root, symlink])
+            self._symlink(self.project_root, symlink)
 
             # Project symlink
             project_cname_symlink = os.path.join(self.PROJECT_CNAME_ROOT, dom.domain)
-            run(['ln', '-nsf', self.project.doc_path, project_cname_symlink])
+            self._symlink(self.project.doc_path, project_cname_symlink)
 
     def remove_symlink_cname(self, domain):
         """Remove CNAME symlink."""
@@ -198,13 +234,7 @@ class Symlink(object):
                 symlink_dir = os.sep.join(symlink.split(os.path.sep)[:-1])
                 if not os.path.lexists(symlink_dir):
                     safe_makedirs(symlink_dir)
-                # TODO this should use os.symlink, not a call to shell. For now,
-                # this passes command as a list to be explicit about escaping
-                # characters like spaces.
-                status, _, stderr = run(['ln', '-nsf', docs_dir, symlink])
-                if status > 0:
-                    log.error('Could not symlink path: status=%d error=%s',
-                              status, stderr)
+                self._symlink(docs_dir, symlink)
 
         # Remove old symlinks
         if os.path.exists(self.subproject_root):
@@ -235,7 +265,7 @@ class Symlink(object):
             self._log(u"Symlinking translation: {0}->{1}".format(language, slug))
             symlink = os.path.join(self.project_root, language)
             docs_dir = os.path.join(self.WEB_ROOT, slug, language)
-            run(['ln', '-nsf', docs_dir, symlink])
+            self._symlink(docs_dir, symlink)
 
         # Remove old symlinks
         for lang in os.listdir(self.project_root):
@@ -256,18 +286,19 @@ class Symlink(object):
         """
         version = self.get_default_version()
 
-        # Clean up symlinks
+        # Clean up the project directory, an existing symlink is replaced
+        # atomically instead
         symlink = self.project_root
-        if os.path.islink(symlink):
-            os.unlink(symlink)
-        if os.path.exists(symlink):
+        if os.path.exists(symlink) and not os.path.islink(symlink):
             shutil.rmtree(symlink)
 
         # Create symlink
         if version is not None:
             docs_dir = os.path.join(settings.DOCROOT, self.project.slug,
                                     'rtd-builds', version.slug)
-            run(['ln', '-nsf', docs_dir, symlink])
+            self._symlink(docs_dir, symlink)
+        elif os.path.islink(symlink):
+            os.unlink(symlink)
 
     def symlink_versions(self):
         """
@@ -288,7 +319,7 @@ class Symlink(object):
             self._log(u"Symlinking Version: %s" % version)
             symlink = os.path.join(version_dir, version.slug)
             docs_dir = os.path.join(settings.DOCROOT, self.project.slug, 'rtd-builds', version.slug)
-            run(['ln', '-nsf', docs_dir, symlink])
+            self._symlink(docs_dir, symlink)
             versions.add(version.slug)
 
         # Remove old symlinks
@@ -7,8 +7,13 @@ import getpass
 import logging
 import os
 import re
+from datetime import timedelta
+from itertools import islice
 
 from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
 from django.utils import six
 from django.utils.functional import allow_lazy
 from django.utils.safestring import SafeText, mark_safe
@@ -16,7 +21,7 @@ from django.utils.text import slugify as slugify_base
 from future.backports.urllib.parse import urlparse
 from celery import group, chord
 
-from readthedocs.builds.constants import LATEST
+from readthedocs.builds.constants import BUILD_STATE_TRIGGERED, LATEST
 from readthedocs.doc_builder.constants import DOCKER_LIMITS
 
 
@@ -75,12 +80,17 @@ def cname_to_slug(host):
     return slug
 
 
-def trigger_build(project, version=None, record=True, force=False, basic=False):
+def trigger_build(project, version=None, record=True, force=False, basic=False,
+                  coalesce=False):
     """
     Trigger build for project and version.
 
     If project has a ``build_queue``, execute task on this build queue. Queue
     will be prefixed with ``build-`` to unify build queue names.
+
+    With ``coalesce``, no new build is queued while the version already has
+    one waiting to start: that build checks out the version when it starts, so
+    it covers the new changes too, and it's returned instead.
     """
     # Avoid circular import
     from readthedocs.projects.tasks import UpdateDocsTask
@@ -102,13 +112,23 @@ def trigger_build(project, version=None, record=True, force=False, basic=False):
 
     build = None
     if record:
-        build = Build.objects.create(
-            project=project,
-            version=version,
-            type='html',
-            state='triggered',
-            success=True,
-        )
+        with transaction.atomic():
+            if coalesce:
+                pending = get_pending_build(version)
+                if pending is not None:
+                    log.info(
+                        'Build for %s:%s already queued, not triggering '
+                        'another one (build %s)',
+                        project.slug, version.slug, pending.pk,
+                    )
+                    return pending
+            build = Build.objects.create(
+                project=project,
+                version=version,
+                type='html',
+                state=BUILD_STATE_TRIGGERED,
+                success=True,
+            )
         kwargs['build_pk'] = build.pk
 
     options = {}
@@ -133,6 +153,32 @@ def trigger_build(project, version=None, record=True, force=False, basic=False):
     return build
 
 
+def get_pending_build(version):
+    """
+    Return the build of ``version`` waiting to start, if any.
+
+    The version row is locked until the end of the transaction, so concurrent
+    triggers wait for each other instead of both queueing a build. Builds
+    waiting for more than ``BUILD_COALESCE_MAX_AGE`` seconds are considered
+    lost (e.g. their task was dropped) and are ignored.
+    """
+    from readthedocs.builds.models import Build, Version
+
+    list(Version.objects.select_for_update().filter(pk=version.pk))
+    max_age = getattr(settings, 'BUILD_COALESCE_MAX_AGE', 60 * 60)
+    return (
+        Build.objects
+        .filter(
+            version=version,
+            type='html',
+            state=BUILD_STATE_TRIGGERED,
+            date__gte=timezone.now() - timedelta(seconds=max_age),
+        )
+        .order_by('-date')
+        .first()
+    )
+
+
 def send_email(recipient, subject, template, template_html, context=None,
                request=None, from_email=None, **kwargs):  # pylint: disable=unused-argument
     """
@@ -184,3 +230,31 @@ def safe_makedirs(directory_name):
         if e.errno == errno.EEXIST:
             pass
         raise
+
+
+def chunks(iterable, size):
+    """
+    Split ``iterable`` in lists of at most ``size`` elements.
+
+    The iterable is consumed lazily, so this can be used to process a stream
+    of items in bounded batches.
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def incr_cache_generation(key):
+    """
+    Bump the generation number stored in the cache under ``key``.
+
+    Cached entries carrying the generation in their key become stale at
+    once. The generation never expires, it starts at 1 when missing.
+    """
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
@@ -42,13 +42,15 @@ def _build_version(project, slug, already_built=()):
         # these will build at "latest", and thus won't be
         # active
         latest_version = project.versions.get(slug=LATEST)
-        trigger_build(project=project, version=latest_version, force=True)
+        trigger_build(project=project, version=latest_version, force=True,
+                      coalesce=True)
         log.info("(Version build) Building %s:%s",
                  project.slug, latest_version.slug)
         if project.versions.exclude(active=False).filter(slug=slug).exists():
             # Handle the case where we want to build the custom branch too
             slug_version = project.versions.get(slug=slug)
-            trigger_build(project=project, version=slug_version, force=True)
+            trigger_build(project=project, version=slug_version, force=True,
+                          coalesce=True)
             log.info("(Version build) Building %s:%s",
                      project.slug, slug_version.slug)
         return LATEST
@@ -57,7 +59,8 @@ def _build_version(project, slug, already_built=()):
         return None
     elif slug not in already_built:
         version = project.versions.get(slug=slug)
-        trigger_build(project=project, version=version, force=True)
+        trigger_build(project=project, version=version, force=True,
+                      coalesce=True)
         log.info("(Version build) Building %s:%s",
                  project.slug, version.slug)
         return slug
@@ -10,9 +10,11 @@ from __future__ import (
 import codecs
 import logging
 import os
+import shutil
 import sys
 import zipfile
 from glob import glob
+from multiprocessing.pool import ThreadPool
 
 import six
 from django.conf import settings
@@ -24,7 +26,7 @@ from readthedocs.projects.exceptions import ProjectConfigurationError
 from readthedocs.projects.utils import safe_write
 from readthedocs.restapi.client import api
 
-from ..base import BaseBuilder, restoring_chdir
+from ..base import BaseBuilder
 from ..constants import PDF_RE, SPHINX_STATIC_DIR, SPHINX_TEMPLATE_DIR
 from ..environments import BuildCommand, DockerBuildCommand
 from ..exceptions import BuildEnvironmentError
@@ -182,6 +184,32 @@ class BaseSphinx(BaseBuilder):
             cwd=self.project.checkout_path(self.version.slug),
         )
 
+    def get_doctrees_dir(self):
+        """Doctrees directory, relative to the ``conf.py`` directory."""
+        return '_build/doctrees-{format}'.format(format=self.sphinx_builder)
+
+    def get_doctrees_path(self):
+        try:
+            conf_dir = self.project.conf_dir(self.version.slug)
+        except ProjectConfigurationError:
+            conf_dir = self.docs_dir()
+        return os.path.join(conf_dir, self.get_doctrees_dir())
+
+    def seed_doctrees(self, doctrees_path):
+        """
+        Start from a copy of the doctrees of another build.
+
+        Sphinx then reuses the pickled environment instead of parsing the
+        sources again. A copy is used so builders running at the same time
+        never write the same pickles.
+        """
+        target = self.get_doctrees_path()
+        if not os.path.isdir(doctrees_path) or doctrees_path == target:
+            return
+        if os.path.exists(target):
+            shutil.rmtree(target)
+        shutil.copytree(doctrees_path, target)
+
     def build(self):
         self.clean()
         project = self.project
@@ -196,7 +224,7 @@ class BaseSphinx(BaseBuilder):
             '-b',
             self.sphinx_builder,
             '-d',
-            '_build/doctrees-{format}'.format(format=self.sphinx_builder),
+            self.get_doctrees_dir(),
             '-D',
             'language={lang}'.format(lang=project.language),
             '.',
@@ -245,7 +273,6 @@ class LocalMediaBuilder(BaseSphinx):
     sphinx_builder = 'readthedocssinglehtmllocalmedia'
     sphinx_build_dir = '_build/localmedia'
 
-    @restoring_chdir
     def move(self, **__):
         log.info('Creating zip file from %s', self.old_artifact_path)
         target_file = os.path.join(
@@ -257,17 +284,19 @@ class LocalMediaBuilder(BaseSphinx):
         if os.path.exists(target_file):
             os.remove(target_file)
 
-        # Create a <slug>.zip file
-        os.chdir(self.old_artifact_path)
+        # Create a <slug>.zip file. Paths are built from the artifact path
+        # instead of changing the working directory, other builders may be
+        # running in the same process
         archive = zipfile.ZipFile(target_file, 'w')
-        for root, __, files in os.walk('.'):
+        for root, __, files in os.walk(self.old_artifact_path):
             for fname in files:
                 to_write = os.path.join(root, fname)
                 archive.write(
                     filename=to_write,
                     arcname=os.path.join(
                         '{}-{}'.format(self.project.slug, self.version.slug),
-                        to_write),
+                        '.',
+                        os.path.relpath(to_write, self.old_artifact_path)),
                 )
         archive.close()
 
@@ -319,6 +348,7 @@ class PdfBuilder(BaseSphinx):
     """Builder to generate PDF documentation."""
 
     type = 'sphinx_pdf'
+    sphinx_builder = 'latex'
     sphinx_build_dir = '_build/latex'
     pdf_file_name = None
 
@@ -335,7 +365,7 @@ class PdfBuilder(BaseSphinx):
             '-D',
             'language={lang}'.format(lang=self.project.language),
             '-d',
-            '_build/doctrees',
+            self.get_doctrees_dir(),
             '.',
             '_build/latex',
             cwd=cwd,
@@ -360,6 +390,12 @@ class PdfBuilder(BaseSphinx):
             latex_class = DockerLatexBuildCommand
         else:
             latex_class = LatexBuildCommand
+
+        parallel = min(len(tex_files), self.build_env.max_parallel_builds)
+        if parallel > 1:
+            return self.build_tex_files_parallel(
+                pdflatex_cmds, makeindex_cmds, latex_class, latex_cwd, parallel)
+
         pdf_commands = []
         for cmd in pdflatex_cmds:
             cmd_ret = self.build_env.run_command_class(
@@ -378,6 +414,37 @@ class PdfBuilder(BaseSphinx):
             pdf_commands.append(cmd_ret)
         return all(cmd.successful for cmd in pdf_commands)
 
+    def build_tex_files_parallel(self, pdflatex_cmds, makeindex_cmds,
+                                 latex_class, latex_cwd, parallel):
+        """
+        Convert the TeX files to PDF at the same time.
+
+        Every file goes through its own pdflatex, makeindex, pdflatex
+        sequence, ``parallel`` files at a time.
+        """
+        def convert(cmds):
+            pdflatex_cmd, makeindex_cmd = cmds
+            results = []
+            for cmd in (pdflatex_cmd, makeindex_cmd, pdflatex_cmd):
+                results.append(self.build_env.run_command_class(
+                    cls=latex_class, cmd=cmd, cwd=latex_cwd, warn_only=True))
+            return results
+
+        pool = ThreadPool(parallel)
+        try:
+            results = pool.map(convert, zip(pdflatex_cmds, makeindex_cmds))
+        finally:
+            pool.close()
+            pool.join()
+
+        pdf_commands = []
+        for file_commands in results:
+            pdf_match = PDF_RE.search(file_commands[-1].output)
+            if pdf_match:
+                self.pdf_file_name = pdf_match.group(1).strip()
+            pdf_commands.extend(file_commands)
+        return all(cmd.successful for cmd in pdf_commands)
+
     def move(self, **__):
         if not os.path.exists(self.target):
             os.makedirs(self.target)
@@ -12,6 +12,7 @@ import logging
 import subprocess
 import traceback
 import socket
+import threading
 from datetime import datetime
 
 from django.conf import settings
@@ -29,6 +30,7 @@ from requests.exceptions import ConnectionError
 
 from .exceptions import (BuildEnvironmentException, BuildEnvironmentError,
                          BuildEnvironmentWarning, BuildEnvironmentCreationFailed)
+from .output import CommandOutput
 from .constants import (DOCKER_SOCKET, DOCKER_VERSION, DOCKER_IMAGE,
                         DOCKER_LIMITS, DOCKER_TIMEOUT_EXIT_CODE,
                         DOCKER_OOM_EXIT_CODE, SPHINX_TEMPLATE_DIR,
@@ -45,6 +47,29 @@ __all__ = (
     'LocalBuildEnvironment', 'DockerBuildEnvironment',
 )
 
+MEMORY_UNITS = {'b': 1, 'k': 1024, 'm': 1024 ** 2, 'g': 1024 ** 3}
+
+# Bytes read at once from the output of a command
+OUTPUT_CHUNK_SIZE = 8192
+
+
+def parse_memory_limit(limit):
+    """
+    Return a Docker memory limit in bytes.
+
+    The limit is either a number of bytes or a string with a unit suffix, as
+    in ``512m``. Returns ``None`` when the limit is unset or not valid.
+    """
+    if not limit:
+        return None
+    if isinstance(limit, six.integer_types):
+        return limit
+    match = re.match(r'^(\d+)([bkmg]?)$', str(limit).strip().lower())
+    if match is None:
+        return None
+    number, unit = match.groups()
+    return int(number) * MEMORY_UNITS[unit or 'b']
+
 
 class BuildCommand(BuildCommandResultMixin):
 
@@ -68,11 +93,18 @@ class BuildCommand(BuildCommandResultMixin):
     :param build_env: build environment to use to execute commands
     :param bin_path: binary path to add to PATH resolution
     :param description: a more grokable description of the command being run
+    :param record: the command will be saved, its output can be saved while
+        it runs
+
+    With ``BUILD_COMMAND_OUTPUT_STREAMING`` enabled, the output is read while
+    the command runs, only its end is kept in :py:attr:`output`, see
+    :py:class:`~readthedocs.doc_builder.output.CommandOutput`.
     """
 
     def __init__(self, command, cwd=None, shell=False, environment=None,
                  combine_output=True, input_data=None, build_env=None,
-                 bin_path=None, description=None, record_as_success=False):
+                 bin_path=None, description=None, record_as_success=False,
+                 record=False):
         self.command = command
         self.shell = shell
         if cwd is None:
@@ -96,7 +128,12 @@ class BuildCommand(BuildCommandResultMixin):
         if description is not None:
             self.description = description
         self.record_as_success = record_as_success
+        self.record = record
         self.exit_code = None
+        # Set when the output is streamed
+        self.streamed_output = None
+        # Id of the saved command, once some output was saved
+        self.api_id = None
 
     def __str__(self):
         # TODO do we want to expose the full command here?
@@ -157,16 +194,19 @@ class BuildCommand(BuildCommandResultMixin):
                 cmd_input_bytes = cmd_input.encode('utf-8')
             else:
                 cmd_input_bytes = cmd_input
-            cmd_output = proc.communicate(input=cmd_input_bytes)
-            (cmd_stdout, cmd_stderr) = cmd_output
-            try:
-                self.output = cmd_stdout.decode('utf-8', 'replace')
-            except (TypeError, AttributeError):
-                self.output = None
-            try:
-                self.error = cmd_stderr.decode('utf-8', 'replace')
-            except (TypeError, AttributeError):
-                self.error = None
+            if self.combine_output and self.stream_output:
+                self.read_output(proc, cmd_input_bytes)
+            else:
+                cmd_output = proc.communicate(input=cmd_input_bytes)
+                (cmd_stdout, cmd_stderr) = cmd_output
+                try:
+                    self.output = cmd_stdout.decode('utf-8', 'replace')
+                except (TypeError, AttributeError):
+                    self.output = None
+                try:
+                    self.error = cmd_stderr.decode('utf-8', 'replace')
+                except (TypeError, AttributeError):
+                    self.error = None
             self.exit_code = proc.returncode
         except OSError:
             self.error = traceback.format_exc()
@@ -175,6 +215,33 @@ class BuildCommand(BuildCommandResultMixin):
         finally:
             self.end_time = datetime.utcnow()
 
+    @property
+    def stream_output(self):
+        return getattr(settings, 'BUILD_COMMAND_OUTPUT_STREAMING', False)
+
+    def get_command_output(self):
+        """Return the buffer receiving the streamed output."""
+        on_flush = None
+        if self.record and self.build_env is not None:
+            on_flush = self.save_output
+        self.streamed_output = CommandOutput(on_flush=on_flush)
+        return self.streamed_output
+
+    def read_output(self, proc, input_bytes=None):
+        """Read the combined output of ``proc`` in chunks until it exits."""
+        output = self.get_command_output()
+        if input_bytes is not None:
+            proc.stdin.write(input_bytes)
+            proc.stdin.close()
+        fileno = proc.stdout.fileno()
+        for data in iter(lambda: os.read(fileno, OUTPUT_CHUNK_SIZE), b''):
+            output.write(data)
+        proc.stdout.close()
+        proc.wait()
+        output.close()
+        self.output = output.getvalue()
+        self.error = None
+
     def get_command(self):
         """Flatten command."""
         if hasattr(self.command, '__iter__') and not isinstance(self.command, str):
@@ -199,8 +266,51 @@ class BuildCommand(BuildCommandResultMixin):
             'start_time': self.start_time,
             'end_time': self.end_time,
         }
+        if self.streamed_output is not None and not self.streamed_output.lost:
+            pending = self.streamed_output.pop_pending()
+            if self.api_id is not None:
+                # Part of the output is already saved
+                if pending:
+                    api_v2.command(self.api_id).append.post({'output': pending})
+                del data['output']
+                api_v2.command(self.api_id).patch(data)
+                return
+            # Nothing was saved yet, the pending output is the whole output
+            data['output'] = pending
+        elif self.api_id is not None:
+            # Some output couldn't be saved while running, replace the saved
+            # output with the one kept in memory
+            api_v2.command(self.api_id).patch(data)
+            return
         api_v2.command.post(data)
 
+    def save_output(self, output):
+        """
+        Save output of the running command.
+
+        The command is saved with the first output, following output is
+        appended to it. Failures are logged and reported returning ``False``,
+        the output is then handed again with the next batch.
+        """
+        try:
+            if self.api_id is None:
+                data = {
+                    'build': self.build_env.build.get('id'),
+                    'command': self.get_command(),
+                    'description': self.description,
+                    'output': output,
+                    'exit_code': None,
+                    'start_time': self.start_time,
+                    'end_time': None,
+                }
+                self.api_id = api_v2.command.post(data)['id']
+            else:
+                api_v2.command(self.api_id).append.post({'output': output})
+        except Exception:
+            log.exception('Unable to save command output')
+            return False
+        return True
+
 
 class DockerBuildCommand(BuildCommand):
 
@@ -231,11 +341,18 @@ class DockerBuildCommand(BuildCommand):
                 stderr=True
             )
 
-            output = client.exec_start(exec_id=exec_cmd['Id'], stream=False)
-            try:
-                self.output = output.decode('utf-8', 'replace')
-            except (TypeError, AttributeError):
-                self.output = ''
+            if self.stream_output:
+                output = self.get_command_output()
+                for data in client.exec_start(exec_id=exec_cmd['Id'], stream=True):
+                    output.write(data)
+                output.close()
+                self.output = output.getvalue()
+            else:
+                output = client.exec_start(exec_id=exec_cmd['Id'], stream=False)
+                try:
+                    self.output = output.decode('utf-8', 'replace')
+                except (TypeError, AttributeError):
+                    self.output = ''
             cmd_ret = client.exec_inspect(exec_id=exec_cmd['Id'])
             self.exit_code = cmd_ret['ExitCode']
 
@@ -248,6 +365,8 @@ class DockerBuildCommand(BuildCommand):
             if self.exit_code == DOCKER_OOM_EXIT_CODE or (self.exit_code == 1 and killed_in_output):
                 self.output = _('Command killed due to excessive memory '
                                 'consumption\n')
+                if self.streamed_output is not None:
+                    self.streamed_output.add(six.text_type(self.output))
         except DockerAPIError:
             self.exit_code = -1
             if self.output is None or not self.output:
@@ -333,6 +452,10 @@ class BaseEnvironment(object):
             # ``record_as_success`` is needed to instantiate the BuildCommand
             kwargs.update({'record_as_success': record_as_success})
 
+        if record:
+            # Recorded commands can save their output while running
+            kwargs['record'] = record
+
         # Remove PATH from env, and set it to bin_path if it isn't passed in
         env_path = self.environment.pop('BIN_PATH', None)
         if 'bin_path' not in kwargs and env_path:
@@ -409,6 +532,11 @@ class BuildEnvironment(BaseEnvironment):
                               successful
     """
 
+    @property
+    def max_parallel_builds(self):
+        """Number of documentation formats that can be built at once."""
+        return max(1, getattr(settings, 'DOCS_BUILD_CONCURRENCY', 1))
+
     def __init__(self, project=None, version=None, build=None, config=None,
                  record=True, environment=None, update_on_success=True):
         super(BuildEnvironment, self).__init__(project, environment)
@@ -614,6 +742,8 @@ class DockerBuildEnvironment(BuildEnvironment):
         self.docker_socket = kwargs.pop('docker_socket', DOCKER_SOCKET)
         super(DockerBuildEnvironment, self).__init__(*args, **kwargs)
         self.client = None
+        # Formats may be built from several threads, each gets its own client
+        self._local = threading.local()
         self.container = None
         self.container_name = slugify(
             'build-{build}-project-{project_id}-{project_name}'.format(
@@ -722,15 +852,34 @@ class DockerBuildEnvironment(BuildEnvironment):
                          msg='Build finished'))
         return ret
 
+    @property
+    def max_parallel_builds(self):
+        """
+        Number of formats built at once, bounded by the container memory.
+
+        Each builder is expected to use ``DOCS_BUILD_MEMORY_PER_BUILDER``.
+        """
+        parallel = super(DockerBuildEnvironment, self).max_parallel_builds
+        mem_limit = parse_memory_limit(self.container_mem_limit)
+        per_builder = parse_memory_limit(
+            getattr(settings, 'DOCS_BUILD_MEMORY_PER_BUILDER', None))
+        if mem_limit and per_builder:
+            parallel = min(parallel, mem_limit // per_builder)
+        return max(1, parallel)
+
     def get_client(self):
         """Create Docker client connection."""
         try:
-            if self.client is None:
-                self.client = APIClient(
+            client = getattr(self._local, 'client', None)
+            if client is None:
+                client = APIClient(
                     base_url=self.docker_socket,
                     version=DOCKER_VERSION,
                 )
-            return self.client
+                self._local.client = client
+                if self.client is None:
+                    self.client = client
+            return client
         except DockerException as e:
             log.exception(
                 LOG_TEMPLATE.format(
@@ -755,7 +904,7 @@ class DockerBuildEnvironment(BuildEnvironment):
         It mainly generates the proper path bindings between the Docker
         container and the Host by mounting them with the proper permissions.
         Besides, it mounts the ``GLOBAL_PIP_CACHE`` if it's set and we are under
-        ``DEBUG``.
+        ``DEBUG``, and the ``PYTHON_WHEELHOUSE_PATH`` if it's set.
 
         The object returned is passed to Docker function
         ``client.create_container``.
@@ -782,6 +931,15 @@ class DockerBuildEnvironment(BuildEnvironment):
                     'mode': 'rw',
                 },
             })
+
+        wheelhouse_path = getattr(settings, 'PYTHON_WHEELHOUSE_PATH', None)
+        if wheelhouse_path:
+            binds.update({
+                wheelhouse_path: {
+                    'bind': wheelhouse_path,
+                    'mode': 'rw',
+                },
+            })
         return self.get_client().create_host_config(
             binds=binds,
             mem_limit=self.container_mem_limit,
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+Streamed output of build commands.
+
+Command output is read in chunks while the command runs: only the end of it
+is kept in memory, and the whole output is handed to a callback in batches,
+so it can be persisted while the command is still running.
+
+Django settings that can be defined:
+
+    `BUILD_COMMAND_OUTPUT_MAX_SIZE`: number of characters of output kept in
+                                     memory
+
+    `BUILD_COMMAND_OUTPUT_FLUSH_SIZE`: number of characters buffered before
+                                       calling the callback
+
+    `BUILD_COMMAND_OUTPUT_FLUSH_INTERVAL`: seconds after which buffered output
+                                           is handed to the callback anyway
+"""
+
+from __future__ import (
+    absolute_import, division, print_function, unicode_literals)
+
+import codecs
+import time
+from builtins import object
+from collections import deque
+
+from django.conf import settings
+
+TRUNCATED_NOTICE = '[output truncated]\n'
+
+
+class CommandOutput(object):
+
+    """
+    Output of a running command.
+
+    Bytes written are decoded as UTF-8, invalid sequences are replaced.
+
+    :param on_flush: callable receiving the buffered output, at most every
+        ``flush_interval`` seconds or ``flush_size`` characters, and returning
+        whether it was saved. Output not saved is handed again with the next
+        batch; when more than ``max_size`` characters are waiting they are
+        dropped and :py:attr:`lost` is set. Without it only the end of the
+        output is kept
+    """
+
+    def __init__(self, on_flush=None, max_size=None, flush_size=None,
+                 flush_interval=None):
+        self.on_flush = on_flush
+        self.max_size = max_size or getattr(
+            settings, 'BUILD_COMMAND_OUTPUT_MAX_SIZE', 1024 * 1024)
+        self.flush_size = flush_size or getattr(
+            settings, 'BUILD_COMMAND_OUTPUT_FLUSH_SIZE', 64 * 1024)
+        if flush_interval is None:
+            flush_interval = getattr(
+                settings, 'BUILD_COMMAND_OUTPUT_FLUSH_INTERVAL', 5)
+        self.flush_interval = flush_interval
+
+        self.decoder = codecs.getincrementaldecoder('utf-8')('replace')
+        # Ring buffer of the last ``max_size`` characters
+        self.tail = deque()
+        self.tail_size = 0
+        self.truncated = False
+        # Output not handed to ``on_flush`` yet
+        self.pending = []
+        self.pending_size = 0
+        self.next_flush_size = self.flush_size
+        self.last_flush = time.time()
+        # Set when output couldn't be handed to ``on_flush``
+        self.lost = False
+
+    def write(self, data):
+        """Add ``data``, bytes read from the command."""
+        self.add(self.decoder.decode(data))
+
+    def close(self):
+        """Decode what's left, the pending output is kept for the caller."""
+        self.add(self.decoder.decode(b'', True))
+
+    def add(self, text):
+        if not text:
+            return
+        self.tail.append(text)
+        self.tail_size += len(text)
+        while self.tail_size > self.max_size:
+            extra = self.tail_size - self.max_size
+            first = self.tail[0]
+            if len(first) <= extra:
+                self.tail.popleft()
+                self.tail_size -= len(first)
+            else:
+                self.tail[0] = first[extra:]
+                self.tail_size -= extra
+            self.truncated = True
+
+        if self.on_flush is None or self.lost:
+            return
+        self.pending.append(text)
+        self.pending_size += len(text)
+        if (self.pending_size >= self.next_flush_size or
+                time.time() - self.last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Hand the pending output to ``on_flush``, keep it if not saved."""
+        self.last_flush = time.time()
+        if not self.pending or self.on_flush is None or self.lost:
+            return
+        pending = ''.join(self.pending)
+        if self.on_flush(pending):
+            self.pop_pending()
+            self.next_flush_size = self.flush_size
+            return
+        # Retry with the next batch, without calling back on every write
+        self.pending = [pending]
+        self.next_flush_size = self.pending_size + self.flush_size
+        if self.pending_size > self.max_size:
+            self.pop_pending()
+            self.lost = True
+
+    def pop_pending(self):
+        """Return the output not flushed yet and forget it."""
+        pending = ''.join(self.pending)
+        self.pending = []
+        self.pending_size = 0
+        return pending
+
+    def getvalue(self):
+        """Return the output kept in memory."""
+        value = ''.join(self.tail)
+        if self.truncated:
+            return TRUNCATED_NOTICE + value
+        return value
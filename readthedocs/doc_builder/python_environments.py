@@ -4,11 +4,14 @@
 from __future__ import (
     absolute_import, division, print_function, unicode_literals)
 
+import hashlib
 import itertools
 import json
 import logging
 import os
 import shutil
+import time
+import uuid
 from builtins import object, open
 
 import six
@@ -108,6 +111,21 @@ class PythonEnvironment(object):
             'readthedocs-environment.json',
         )
 
+    def get_build_image(self):
+        """Return the Docker image name and hash, ``None`` for local builds."""
+        if isinstance(self.build_env, DockerBuildEnvironment):
+            build_image = self.config.build_image or DOCKER_IMAGE
+            return build_image, self.build_env.image_hash
+        return None, None
+
+    def read_environment_json(self):
+        """Return the data of ``readthedocs-environment.json``, if readable."""
+        try:
+            with open(self.environment_json_path(), 'r') as fpath:
+                return json.load(fpath)
+        except (IOError, TypeError, ValueError):
+            return {}
+
     @property
     def is_obsolete(self):
         """
@@ -149,13 +167,7 @@ class PythonEnvironment(object):
         env_build_image = env_build.get('image', None)
         env_build_hash = env_build.get('hash', None)
 
-        if isinstance(self.build_env, DockerBuildEnvironment):
-            build_image = self.config.build_image or DOCKER_IMAGE
-            image_hash = self.build_env.image_hash
-        else:
-            # e.g. LocalBuildEnvironment
-            build_image = None
-            image_hash = None
+        build_image, image_hash = self.get_build_image()
 
         # If the user define the Python version just as a major version
         # (e.g. ``2`` or ``3``) we won't know exactly which exact version was
@@ -175,15 +187,25 @@ class PythonEnvironment(object):
             },
         }
 
-        if isinstance(self.build_env, DockerBuildEnvironment):
-            build_image = self.config.build_image or DOCKER_IMAGE
+        build_image, image_hash = self.get_build_image()
+        if build_image is not None:
             data.update({
                 'build': {
                     'image': build_image,
-                    'hash': self.build_env.image_hash,
+                    'hash': image_hash,
                 },
             })
 
+        # The environment is only saved when it isn't obsolete, so the core
+        # requirements installed in it are still valid
+        core_requirements = self.read_environment_json().get(
+            'core_requirements')
+        if core_requirements:
+            data['core_requirements'] = core_requirements
+
+        self.write_environment_json(data)
+
+    def write_environment_json(self, data):
         with open(self.environment_json_path(), 'w') as fpath:
             # Compatibility for Py2 and Py3. ``io.TextIOWrapper`` expects
             # unicode but ``json.dumps`` returns str in Py2.
@@ -215,8 +237,8 @@ class Virtualenv(PythonEnvironment):
             bin_path=None,  # Don't use virtualenv bin that doesn't exist yet
         )
 
-    def install_core_requirements(self):
-        """Install basic Read the Docs requirements into the virtualenv."""
+    def get_core_requirements(self):
+        """Return the basic Read the Docs requirements."""
         requirements = [
             'Pygments==2.2.0',
             # Assume semver for setuptools version, support up to next backwards
@@ -249,6 +271,171 @@ class Virtualenv(PythonEnvironment):
                 'readthedocs-sphinx-ext<0.6',
                 'git+https://github.com/italia/docs-italia-theme@bootstrap-italia',
             ])
+        return requirements
+
+    def get_core_requirements_key(self, requirements):
+        """
+        Return a key identifying the core requirements of this environment.
+
+        Wheels depend on the interpreter and on the build image, so both are
+        part of the key along with the requirements.
+        """
+        build_image, image_hash = self.get_build_image()
+        data = json.dumps({
+            'requirements': requirements,
+            'python': self.config.python_full_version,
+            'image': build_image,
+            'hash': image_hash,
+        }, sort_keys=True)
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    def has_core_requirements(self, key):
+        """
+        Check if the core requirements identified by ``key`` are installed.
+
+        Installed requirements are trusted for
+        ``PYTHON_CORE_REQUIREMENTS_MAX_AGE`` seconds, after that they are
+        installed again to pick up new releases and theme changes.
+        """
+        max_age = getattr(settings, 'PYTHON_CORE_REQUIREMENTS_MAX_AGE', 0)
+        core_requirements = self.read_environment_json().get(
+            'core_requirements', {})
+        return (
+            core_requirements.get('key') == key and
+            time.time() - core_requirements.get('installed', 0) < max_age
+        )
+
+    def save_core_requirements(self, key):
+        """Record the core requirements installed in the environment."""
+        if not os.path.exists(self.environment_json_path()):
+            return
+        data = self.read_environment_json()
+        data['core_requirements'] = {
+            'key': key,
+            'installed': time.time(),
+        }
+        self.write_environment_json(data)
+
+    def get_wheelhouse(self, requirements, key):
+        """
+        Return the directory holding the wheels of ``requirements``.
+
+        The wheels, git requirements included, are built once per key in
+        ``PYTHON_WHEELHOUSE_PATH``. Following builds install them without
+        downloading or cloning anything, until they are built again after
+        ``PYTHON_CORE_REQUIREMENTS_MAX_AGE`` seconds to pick up new releases
+        and theme changes.
+
+        :returns: the wheels directory, or ``None`` when there is no
+            wheelhouse or the wheels couldn't be built
+        """
+        wheelhouse_path = getattr(settings, 'PYTHON_WHEELHOUSE_PATH', None)
+        if not wheelhouse_path:
+            return None
+        max_age = getattr(settings, 'PYTHON_CORE_REQUIREMENTS_MAX_AGE', 0)
+        # Every period of ``max_age`` gets its own directory, the ones of the
+        # previous periods are removed once stale
+        period = int(time.time() // max_age) if max_age else 0
+        wheel_dir = os.path.join(
+            wheelhouse_path, '{0}-{1}'.format(key, period))
+        if os.path.isdir(wheel_dir):
+            return wheel_dir
+        self.remove_stale_wheelhouses(wheelhouse_path, key, period)
+
+        # Build in a private directory, the complete set of wheels is then
+        # renamed into place so other builds never see a partial wheelhouse
+        tmp_dir = '{0}.{1}'.format(wheel_dir, uuid.uuid4().hex)
+        cmd = [
+            'python',
+            self.venv_bin(filename='pip'),
+            'wheel',
+            '--wheel-dir',
+            tmp_dir,
+            '--cache-dir',
+            self.project.pip_cache_path,
+        ]
+        cmd.extend(requirements)
+        result = self.build_env.run(
+            *cmd,
+            bin_path=self.venv_bin(),
+            warn_only=True
+        )
+        if not result.successful:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return None
+        try:
+            os.rename(tmp_dir, wheel_dir)
+        except OSError:
+            # Another build filled the wheelhouse in the meantime
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        return wheel_dir
+
+    def remove_stale_wheelhouses(self, wheelhouse_path, key, period):
+        """
+        Remove the wheels of ``key`` built before the previous period.
+
+        The wheels of the previous period are kept, builds that started
+        before the period changed may still be installing them.
+        """
+        prefix = '{0}-'.format(key)
+        for name in os.listdir(wheelhouse_path):
+            if not name.startswith(prefix):
+                continue
+            try:
+                wheel_period = int(name[len(prefix):])
+            except ValueError:
+                # Private directories of the builds in progress
+                continue
+            if wheel_period < period - 1:
+                shutil.rmtree(
+                    os.path.join(wheelhouse_path, name), ignore_errors=True)
+
+    def install_core_requirements_from_wheelhouse(self, wheel_dir):
+        """Install the wheels of ``wheel_dir``, without using the network."""
+        wheels = sorted(
+            os.path.join(wheel_dir, filename)
+            for filename in os.listdir(wheel_dir)
+            if filename.endswith('.whl')
+        )
+        if not wheels:
+            return False
+        cmd = [
+            'python',
+            self.venv_bin(filename='pip'),
+            'install',
+            '--upgrade',
+            '--no-index',
+            '--find-links',
+            wheel_dir,
+        ]
+        if self.config.use_system_site_packages:
+            cmd.append('-I')
+        cmd.extend(wheels)
+        result = self.build_env.run(
+            *cmd,
+            bin_path=self.venv_bin(),
+            warn_only=True
+        )
+        return result.successful
+
+    def install_core_requirements(self):
+        """
+        Install basic Read the Docs requirements into the virtualenv.
+
+        Nothing is installed if the same requirements were installed recently
+        in this virtualenv. Otherwise they are installed from the shared
+        wheelhouse when available, falling back to PyPI.
+        """
+        requirements = self.get_core_requirements()
+        key = self.get_core_requirements_key(requirements)
+        if self.has_core_requirements(key):
+            self._log('Core requirements already installed')
+            return
+
+        wheel_dir = self.get_wheelhouse(requirements, key)
+        if wheel_dir and self.install_core_requirements_from_wheelhouse(wheel_dir):
+            self.save_core_requirements(key)
+            return
 
         cmd = [
             'python',
@@ -272,6 +459,7 @@ class Virtualenv(PythonEnvironment):
             *cmd,
             bin_path=self.venv_bin()
         )
+        self.save_core_requirements(key)
 
     def install_user_requirements(self):
         requirements_file_path = self.config.requirements_file
@@ -1,13 +1,34 @@
-"""Github related utils"""
+"""
+Github related utils
+
+Metadata files are fetched with a session shared by the process, pooling the
+connections to GitHub. Responses carrying an ``ETag`` are cached, later
+fetches of the same file are conditional requests.
+
+Django settings that can be defined:
+
+    `DOCSITALIA_METADATA_TIMEOUT`: seconds to wait for GitHub
+
+    `DOCSITALIA_METADATA_CACHE_TIMEOUT`: seconds a fetched file and its
+                                         ``ETag`` are kept in the cache
+"""
 
 from __future__ import absolute_import
 
+import hashlib
+import os
+import threading
+from multiprocessing.pool import ThreadPool
+
 import requests
-from django.utils.encoding import force_text
+from django.conf import settings as django_settings
+from django.core.cache import cache
+from django.utils.encoding import force_bytes, force_text
 from future.backports.urllib.parse import urlparse
 
 from readthedocs.docsitalia.metadata import (
-    SETTINGS_VALIDATORS, DOCUMENT_SETTINGS, InvalidMetadata
+    SETTINGS_VALIDATORS, DOCUMENT_SETTINGS, PUBLISHER_SETTINGS,
+    PROJECTS_SETTINGS, InvalidMetadata
 )
 
 
@@ -15,12 +36,57 @@ RAW_GITHUB_BASE_URL = (
     'https://raw.githubusercontent.com/{org}/{repo}/master/{path}'
 )
 
+METADATA_CACHE_KEY = 'docsitalia:metadata:{}'
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session():
+    """Return the session used to fetch metadata in the current process."""
+    pid = os.getpid()
+    session = _sessions.get(pid)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(pid)
+            if session is None:
+                # Sessions inherited from the parent process are dropped
+                _sessions.clear()
+                session = requests.Session()
+                _sessions[pid] = session
+    return session
+
 
 def get_metadata_from_url(url, session=None):
-    """Gets an url via a requests compatible api"""
+    """
+    Gets an url via a requests compatible api
+
+    When a copy of the file with its ``ETag`` is cached, GitHub is asked for
+    it only if it changed.
+    """
     if not session:
-        session = requests
-    response = session.get(url)
+        session = get_session()
+    cache_key = METADATA_CACHE_KEY.format(
+        hashlib.sha1(force_bytes(url)).hexdigest())
+    cached = cache.get(cache_key)
+    headers = {}
+    if cached:
+        headers['If-None-Match'] = cached['etag']
+    response = session.get(
+        url,
+        headers=headers,
+        timeout=getattr(django_settings, 'DOCSITALIA_METADATA_TIMEOUT', 10),
+    )
+    if cached and response.status_code == 304:
+        return cached['text']
+    etag = response.headers.get('ETag')
+    if response.status_code == 200 and etag:
+        cache.set(
+            cache_key,
+            {'etag': etag, 'text': response.text},
+            getattr(django_settings, 'DOCSITALIA_METADATA_CACHE_TIMEOUT',
+                    60 * 60 * 24),
+        )
     return response.text
 
 
@@ -51,6 +117,26 @@ def get_metadata_for_publisher(org, publisher, settings, session=None):
     return parse_metadata(data, org, publisher, settings)
 
 
+def get_all_metadata_for_publisher(org, publisher, session=None):
+    """
+    Fetch and validate the publisher and projects metadata of a publisher
+
+    The two files are fetched at the same time.
+
+    :returns: a tuple with the publisher and the projects metadata
+    """
+    pool = ThreadPool(2)
+    try:
+        publisher_metadata, projects_metadata = pool.map(
+            lambda settings: get_metadata_for_publisher(
+                org, publisher, settings, session),
+            [PUBLISHER_SETTINGS, PROJECTS_SETTINGS],
+        )
+    finally:
+        pool.close()
+    return publisher_metadata, projects_metadata
+
+
 def get_metadata_for_document(document):
     """Fetch and validate document metadata"""
     # get the repo name
@@ -4,13 +4,12 @@ from __future__ import (
 
 from django.db.models import Q
 from django.core.management.base import BaseCommand
-from django.conf import settings
 
-from elasticsearch import Elasticsearch
-from elasticsearch.exceptions import NotFoundError
 from readthedocs.projects.models import Project
 
 from readthedocs.docsitalia.models import PublisherProject
+from readthedocs.docsitalia.utils import (
+    clear_projects_from_index, get_search_routing)
 
 
 class Command(BaseCommand):
@@ -21,29 +20,41 @@ class Command(BaseCommand):
     Removes projects without publisher or inactive publisher or
     inactive publisher project from the ES index.
     Delete projects not linked to a publisher project from the db.
+
+    With ``--dry-run`` only the documents that would be removed are counted.
     """
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            dest='dry_run',
+            default=False,
+            help='Report what would be removed without removing it',
+        )
+
     def handle(self, *args, **options):
         """handle command"""
-        e_s = Elasticsearch(settings.ES_HOSTS)
+        dry_run = options['dry_run']
         inactive_pp = PublisherProject.objects.filter(
             Q(active=False) | Q(publisher__active=False)
         ).values_list('pk', flat=True)
         queryset = Project.objects.filter(
             Q(publisherproject__isnull=True) | Q(publisherproject__in=inactive_pp)
-        )
+        ).distinct().prefetch_related('superprojects__parent')
+        projects = []
+        routing = []
         for p_o in queryset:
             print(p_o.name, p_o.get_absolute_url(), p_o.pk)
-            try:
-                e_s.delete(index='readthedocs', doc_type='project', id=p_o.pk)
-            except NotFoundError:
-                print('Index not found')
-            try:
-                e_s.delete_by_query(
-                    index='readthedocs', doc_type='page',
-                    body={'query': {'term': {'project_id': p_o.pk}}}
-                )
-            except NotFoundError:
-                print('Index not found')
-            print('')
+            projects.append(p_o.pk)
+            routing.append(get_search_routing(p_o))
+
+        removed = clear_projects_from_index(
+            projects, routing=routing, dry_run=dry_run)
+        if dry_run:
+            print('Would remove {projects} projects and {pages} pages '
+                  'from the index'.format(**removed))
+            return
+        print('Removed {projects} projects and {pages} pages '
+              'from the index'.format(**removed))
         Project.objects.filter(publisherproject__isnull=True).delete()
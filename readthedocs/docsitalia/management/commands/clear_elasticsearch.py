@@ -2,10 +2,9 @@
 
 from __future__ import absolute_import
 
-from django.conf import settings
 from django.core.management.base import BaseCommand
 
-from elasticsearch import Elasticsearch
+from readthedocs.search.client import get_es_client
 
 
 class Command(BaseCommand):
@@ -14,5 +13,5 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         """handle command"""
-        e_s = Elasticsearch(settings.ES_HOSTS)
+        e_s = get_es_client()
         e_s.indices.delete(index='readthedocs')
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def forwards_fill_published_documents(apps, schema_editor):
+    """Compute the publication status of the existing documents"""
+    db = schema_editor.connection.alias
+    Project = apps.get_model('projects', 'Project')
+    Version = apps.get_model('builds', 'Version')
+    Build = apps.get_model('builds', 'Build')
+    PublishedDocument = apps.get_model('docsitalia', 'PublishedDocument')
+
+    with_public_version = set(Version.objects.using(db).filter(
+        privacy_level='public',
+        active=True,
+    ).values_list('project', flat=True))
+    with_public_build = set(Build.objects.using(db).filter(
+        success=True,
+        state='finished',
+        version__privacy_level='public',
+        version__active=True,
+    ).values_list('project', flat=True))
+    PublishedDocument.objects.using(db).bulk_create([
+        PublishedDocument(
+            project_id=pk,
+            has_public_version=pk in with_public_version,
+            has_public_build=pk in with_public_build,
+        ) for pk in Project.objects.using(db).values_list('pk', flat=True)
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('builds', '0004_add-apiversion-proxy-model'),
+        ('projects', '0023_migrate-alias-slug'),
+        ('docsitalia', '0013_auto_20181029_1007'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PublishedDocument',
+            fields=[
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='published_document', serialize=False, to='projects.Project', verbose_name='Project')),
+                ('has_public_version', models.BooleanField(default=False, verbose_name='Has public version')),
+                ('has_public_build', models.BooleanField(default=False, verbose_name='Has public build')),
+                ('modified_date', models.DateTimeField(auto_now=True, verbose_name='Modified date')),
+            ],
+        ),
+        migrations.RunPython(
+            forwards_fill_published_documents, migrations.RunPython.noop),
+    ]
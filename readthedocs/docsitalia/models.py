@@ -4,13 +4,15 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 
-from django.db import models
+from django.db import models, transaction
 from django.contrib.postgres.fields import JSONField
+from django.utils import timezone
 from django.utils.encoding import python_2_unicode_compatible
 from django.utils.translation import ugettext_lazy as _
 from django.core.urlresolvers import reverse
 
-from readthedocs.builds.models import Version
+from readthedocs.builds.constants import BUILD_STATE_FINISHED
+from readthedocs.builds.models import Build, Version
 from readthedocs.core.utils import broadcast
 from readthedocs.projects.models import Project
 from readthedocs.projects import tasks
@@ -18,7 +20,7 @@ from readthedocs.oauth.models import RemoteOrganization, RemoteRepository
 
 from readthedocs.core.resolver import resolver
 
-from .utils import get_projects_with_builds
+from .utils import invalidate_listings_cache
 
 
 def update_project_from_metadata(project, metadata):
@@ -128,6 +130,8 @@ class Publisher(models.Model):
         old_pub_projects.update(
             active=False
         )
+        # update() doesn't send the signals invalidating the listings
+        invalidate_listings_cache()
 
         # we need to port to the new PublisherProject any
         # already uploaded document connected to the disabled
@@ -159,16 +163,9 @@ class Publisher(models.Model):
 
     def active_publisher_projects(self):
         """Active publisher projects with active documents"""
-        with_public_version = Version.objects.filter(
-            privacy_level='public',
-            active=True,
-        ).values_list(
-            'project',
-            flat=True
-        )
         return self.publisherproject_set.filter(
             active=True,
-            projects__in=with_public_version
+            projects__published_document__has_public_version=True
         ).order_by(
             '-modified_date', '-pub_date'
         ).distinct()
@@ -227,8 +224,9 @@ class PublisherProject(models.Model):
 
     def active_documents(self):
         """Active documents"""
-        builded_projects = get_projects_with_builds().filter(
-            publisherproject=self
+        builded_projects = Project.objects.filter(
+            publisherproject=self,
+            published_document__has_public_build=True
         )
         return builded_projects.order_by(
             '-modified_date', '-pub_date'
@@ -284,3 +282,91 @@ class PublisherIntegration(models.Model):
         return (
             _('{0} for {1}')
             .format(self.get_integration_type_display(), self.publisher.name))
+
+
+@python_2_unicode_compatible
+class PublishedDocument(models.Model):
+
+    """
+    Publication status of a document (Project)
+
+    The public listings need to know which documents have a public active
+    version and a successful build of it. Computing that from the builds on
+    every request is expensive so the status is stored here and refreshed
+    by signals when builds finish and versions change.
+    """
+
+    project = models.OneToOneField(
+        Project,
+        primary_key=True,
+        related_name='published_document',
+        verbose_name=_('Project')
+    )
+    has_public_version = models.BooleanField(_('Has public version'), default=False)
+    has_public_build = models.BooleanField(_('Has public build'), default=False)
+    modified_date = models.DateTimeField(_('Modified date'), auto_now=True)
+
+    def __str__(self):
+        return '%s' % self.project_id
+
+    @classmethod
+    def refresh(cls, project_pks, create=True):
+        """
+        Recompute the publication status of the given projects
+
+        :param project_pks: primary keys of the projects to refresh
+        :param create: create the missing rows, this must be false while
+            the projects are being deleted
+        """
+        project_pks = set(pk for pk in project_pks if pk is not None)
+        if not project_pks:
+            return
+        with_public_version = set(Version.objects.filter(
+            project__in=project_pks,
+            privacy_level='public',
+            active=True,
+        ).values_list('project', flat=True))
+        with_public_build = set(Build.objects.filter(
+            project__in=project_pks,
+            success=True,
+            state=BUILD_STATE_FINISHED,
+            version__privacy_level='public',
+            version__active=True,
+        ).values_list('project', flat=True))
+
+        with transaction.atomic():
+            current = dict(
+                (row[0], row[1:]) for row in cls.objects.filter(
+                    project__in=project_pks
+                ).select_for_update().values_list(
+                    'project', 'has_public_version', 'has_public_build'
+                )
+            )
+            changed = {}
+            to_create = []
+            for pk in project_pks:
+                status = (pk in with_public_version, pk in with_public_build)
+                if pk in current:
+                    if current[pk] != status:
+                        changed.setdefault(status, []).append(pk)
+                elif create:
+                    to_create.append(pk)
+            for (has_version, has_build), pks in changed.items():
+                cls.objects.filter(project__in=pks).update(
+                    has_public_version=has_version,
+                    has_public_build=has_build,
+                    modified_date=timezone.now(),
+                )
+            if to_create:
+                existing = Project.objects.filter(
+                    pk__in=to_create
+                ).values_list('pk', flat=True)
+                cls.objects.bulk_create([
+                    cls(
+                        project_id=pk,
+                        has_public_version=pk in with_public_version,
+                        has_public_build=pk in with_public_build,
+                    ) for pk in existing
+                ])
+        if changed or to_create:
+            invalidate_listings_cache()
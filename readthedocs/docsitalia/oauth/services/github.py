@@ -2,7 +2,9 @@ from __future__ import absolute_import
 from builtins import str
 import logging
 import json
+from multiprocessing.pool import ThreadPool
 
+from django.db import transaction
 from django.db.models import Q
 from django.conf import settings
 from django.core.urlresolvers import reverse
@@ -12,9 +14,8 @@ from readthedocs.integrations.models import Integration
 from readthedocs.oauth.services.github import GitHubService
 from readthedocs.oauth.models import RemoteOrganization, RemoteRepository
 
-from readthedocs.docsitalia.github import get_metadata_for_publisher
-from readthedocs.docsitalia.metadata import (
-    PUBLISHER_SETTINGS, PROJECTS_SETTINGS, InvalidMetadata)
+from readthedocs.docsitalia.github import get_all_metadata_for_publisher
+from readthedocs.docsitalia.metadata import InvalidMetadata
 from readthedocs.docsitalia.models import (
     Publisher, PublisherIntegration)
 
@@ -27,65 +28,162 @@ class DocsItaliaGithubService(GitHubService):
         self.sync_organizations()
 
     def sync_organizations(self):
-        """Sync organizations from GitHub API."""
+        """
+        Sync organizations from GitHub API.
+
+        Requests to GitHub are sent for ``DOCSITALIA_SYNC_CONCURRENCY``
+        organizations at a time, the database is updated from this thread.
+        """
         try:
-            orgs = self.paginate('https://api.github.com/user/orgs')
-            for org in orgs:
-                org_resp = self.get_session().get(org['url'])
-                org_obj = self.create_organization(org_resp.json())
+            orgs = list(self.iter_paginated(
+                'https://api.github.com/user/orgs?per_page=100'))
+            pool = ThreadPool(
+                getattr(settings, 'DOCSITALIA_SYNC_CONCURRENCY', 4))
+            try:
+                orgs_fields = pool.map(self.get_organization_fields, orgs)
+                publishers = []
+                for org, fields in zip(orgs, orgs_fields):
+                    org_obj = self.create_organization(fields)
 
-                # we ingest only whitelisted organizations
-                if not org_obj:
-                    continue
+                    # we ingest only whitelisted organizations
+                    if not org_obj:
+                        continue
 
-                publisher = Publisher.objects.get(
-                    remote_organization=org_obj, active=True)
-
-                session = self.get_session()
-                try:
-                    publisher_metadata = get_metadata_for_publisher(
-                        org_obj, publisher, PUBLISHER_SETTINGS, session)
-                    projects_metadata = get_metadata_for_publisher(
-                        org_obj, publisher, PROJECTS_SETTINGS, session)
-                except InvalidMetadata as e:
-                    log.error(
-                        'Syncing GitHub organizations: %s', e)
-                    continue
+                    publisher = Publisher.objects.get(
+                        remote_organization=org_obj, active=True)
+                    publishers.append((org, org_obj, publisher))
 
-                publisher.metadata = publisher_metadata
-                publisher.projects_metadata = projects_metadata
-                publisher.save()
-                publisher.create_projects_from_metadata(projects_metadata)
-
-                # FIXME: is this the right place?
-                success, _ = self.setup_metadata_webhook(publisher)
-                publisher.has_valid_webhook = success
-                publisher.save()
-
-                # Add repos
-                # TODO ?per_page=100
-                org_repos = self.paginate(
-                    '{org_url}/repos'.format(org_url=org['url'])
-                )
-                repo_whitelist = set()
-                for project in projects_metadata['projects']:
-                    for document in project['documents']:
-                        repo_whitelist.add(document['repository'])
-                for repo in org_repos:
-                    # create repo only for whitelisted repositories
-                    if repo['name'] not in repo_whitelist:
-                        continue
-                    self.create_repository(repo, organization=org_obj)
-                RemoteRepository.objects.filter(
-                    Q(organization=org_obj),
-                    ~Q(name__in=list(repo_whitelist))
-                ).delete()
+                publishers_data = pool.map(
+                    lambda args: self.get_publisher_data(*args), publishers)
+            finally:
+                pool.close()
+
+            for (_, org_obj, publisher), (metadata, org_repos) in zip(
+                    publishers, publishers_data):
+                if metadata is None:
+                    continue
+                self.sync_publisher(org_obj, publisher, metadata, org_repos)
         except (TypeError, ValueError) as e:
             log.error('Error syncing GitHub organizations: %s',
                       str(e), exc_info=True)
             raise Exception('Could not sync your GitHub organizations, '
                             'try reconnecting your account')
 
+    def get_organization_fields(self, org):
+        """Get the GitHub API response of an organization."""
+        return self.get_session().get(org['url']).json()
+
+    def get_publisher_data(self, org, org_obj, publisher):
+        """
+        Get the metadata and the repositories of a publisher from GitHub.
+
+        :returns: a tuple with the publisher and projects metadata, or
+            ``None`` if they are not valid, and the list of repositories
+        """
+        session = self.get_session()
+        try:
+            metadata = get_all_metadata_for_publisher(
+                org_obj, publisher, session)
+        except InvalidMetadata as e:
+            log.error(
+                'Syncing GitHub organizations: %s', e)
+            return None, []
+
+        org_repos = self.paginate(
+            '{org_url}/repos?per_page=100'.format(org_url=org['url'])
+        )
+        return metadata, org_repos
+
+    def sync_publisher(self, org_obj, publisher, metadata, org_repos):
+        """Update a publisher and its repositories from GitHub data."""
+        publisher_metadata, projects_metadata = metadata
+        publisher.metadata = publisher_metadata
+        publisher.projects_metadata = projects_metadata
+        publisher.save()
+        publisher.create_projects_from_metadata(projects_metadata)
+
+        # FIXME: is this the right place?
+        success, _ = self.setup_metadata_webhook(publisher)
+        publisher.has_valid_webhook = success
+        publisher.save()
+
+        # Add repos
+        repo_whitelist = set()
+        for project in projects_metadata['projects']:
+            for document in project['documents']:
+                repo_whitelist.add(document['repository'])
+        # create repo only for whitelisted repositories
+        self.create_repositories(
+            [repo for repo in org_repos if repo['name'] in repo_whitelist],
+            organization=org_obj,
+        )
+        RemoteRepository.objects.filter(
+            Q(organization=org_obj),
+            ~Q(name__in=list(repo_whitelist))
+        ).delete()
+
+    def create_repositories(self, repos, organization):
+        """
+        Update or create repositories from GitHub API response in bulk.
+
+        This does what :py:meth:`create_repository` does for each repository,
+        with a query for the existing repositories and one for the new ones.
+
+        :param repos: list of dictionary responses of data from API
+        :param organization: remote organization to associate with
+        :type organization: RemoteOrganization
+        """
+        privacy = settings.DEFAULT_PRIVACY_LEVEL
+        repos = [
+            fields for fields in repos
+            if privacy == 'private' or
+            (fields['private'] is False and privacy == 'public')
+        ]
+        existing = dict(
+            (repo.full_name, repo)
+            for repo in RemoteRepository.objects.filter(
+                full_name__in=[fields['full_name'] for fields in repos],
+                users=self.user,
+                account=self.account,
+            )
+        )
+        new_repos = []
+        with transaction.atomic():
+            for fields in repos:
+                repo = existing.get(fields['full_name'])
+                if repo is None:
+                    repo = RemoteRepository(
+                        full_name=fields['full_name'],
+                        organization=organization,
+                    )
+                    self.update_repository_fields(repo, fields)
+                    new_repos.append(repo)
+                    continue
+                if repo.organization and repo.organization != organization:
+                    log.debug('Not importing %s because mismatched orgs',
+                              fields['name'])
+                    continue
+                previous = (repo.organization_id, repo.json)
+                repo.organization = organization
+                self.update_repository_fields(repo, fields)
+                if (repo.organization_id, repo.json) != previous:
+                    repo.save()
+
+            if new_repos:
+                RemoteRepository.objects.bulk_create(new_repos)
+                # bulk_create doesn't set the primary keys, new repositories
+                # are the ones without users
+                created = RemoteRepository.objects.filter(
+                    full_name__in=[repo.full_name for repo in new_repos],
+                    account=self.account,
+                    users=None,
+                ).values_list('pk', flat=True)
+                RemoteRepository.users.through.objects.bulk_create([
+                    RemoteRepository.users.through(
+                        remoterepository_id=pk, user_id=self.user.pk)
+                    for pk in created
+                ])
+
     def create_organization(self, fields):
         """
         Update or create remote organization from GitHub API response.
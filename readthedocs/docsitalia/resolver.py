@@ -1,8 +1,13 @@
 """Override RTD URL resolver"""
 
 from django.conf import settings
+from django.core.cache import cache
 
-from readthedocs.core.resolver import ResolverBase
+from readthedocs.core.resolver import (
+    ResolverBase, get_resolver_cache_timeout, get_superproject_relation)
+
+
+PUBLISHER_CACHE_KEY = 'resolver:publisher:{slug}'
 
 
 class ItaliaResolver(ResolverBase):
@@ -31,12 +36,9 @@ class ItaliaResolver(ResolverBase):
         :param cname: optional subdomain
         :return: string
         """
-        from readthedocs.projects.models import Project
-
-        project = Project.objects.get(slug=project_slug)
-        base_project = project.publisherproject_set.all().first()
+        publisher_data = self.get_publisher_data(project_slug)
 
-        if not base_project or private:
+        if not publisher_data or private:
             return super(ItaliaResolver, self).base_resolve_path(
                 project_slug, filename, version_slug,
                 language, private, single_version,
@@ -55,7 +57,8 @@ class ItaliaResolver(ResolverBase):
 
         return url.format(
             project_slug=project_slug, filename=filename,
-            base_project_slug=base_project.slug, publisher_slug=base_project.publisher.slug,
+            base_project_slug=publisher_data['base_project_slug'],
+            publisher_slug=publisher_data['publisher_slug'],
             version_slug=version_slug, language=language,
             single_version=single_version, subproject_slug=subproject_slug,
         )
@@ -68,12 +71,65 @@ class ItaliaResolver(ResolverBase):
         :param private: if document is private
         :return: string
         """
-        canonical_project = self._get_canonical_project(project)
-        domain = canonical_project.domains.filter(canonical=True).first()
-        if domain:
-            return domain.domain
+        data = self.get_project_data(project)
+        if data['canonical_domain']:
+            return data['canonical_domain']
         return getattr(settings, 'PUBLIC_DOMAIN')
 
+    def get_cache_keys(self, project_pk, project_slug):
+        keys = super(ItaliaResolver, self).get_cache_keys(project_pk, project_slug)
+        keys.append(PUBLISHER_CACHE_KEY.format(slug=project_slug))
+        return keys
+
+    def get_publisher_data(self, project_slug):
+        """
+        Return the cached publisher and publisher project slugs of a project.
+
+        An empty dict is returned for projects without a publisher project.
+        """
+        key = PUBLISHER_CACHE_KEY.format(slug=project_slug)
+        data = cache.get(key)
+        if data is None:
+            from readthedocs.projects.models import Project
+            project = Project.objects.get(slug=project_slug)
+            data = self._build_publisher_data(project)
+            cache.set(key, data, get_resolver_cache_timeout())
+        return data
+
+    def get_prefetch_queryset(self, project_pks):
+        return super(ItaliaResolver, self).get_prefetch_queryset(
+            project_pks
+        ).prefetch_related(
+            'publisherproject_set__publisher',
+            'superprojects__parent__publisherproject_set__publisher',
+            'main_language_project__publisherproject_set__publisher',
+        )
+
+    def _get_prefetch_cache_data(self, project):
+        data = super(ItaliaResolver, self)._get_prefetch_cache_data(project)
+        # The publisher of the project the URL is built from is needed too
+        related = [project]
+        if project.main_language_project:
+            related.append(project.main_language_project)
+        relation = get_superproject_relation(project)
+        if relation:
+            related.append(relation.parent)
+        for related_project in related:
+            key = PUBLISHER_CACHE_KEY.format(slug=related_project.slug)
+            data[key] = self._build_publisher_data(related_project)
+        return data
+
+    @staticmethod
+    def _build_publisher_data(project):
+        publisher_projects = sorted(
+            project.publisherproject_set.all(), key=lambda pp: pp.pk)
+        if not publisher_projects:
+            return {}
+        return {
+            'base_project_slug': publisher_projects[0].slug,
+            'publisher_slug': publisher_projects[0].publisher.slug,
+        }
+
     def resolve(self, project, protocol='http', filename='', private=None, **kwargs):
         """
         Resolve the complete URL to the provided project (document)
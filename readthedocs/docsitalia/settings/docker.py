@@ -133,7 +133,7 @@ class CommunityProdSettings(CommunityBaseSettings):
 
     # Override classes
     CLASS_OVERRIDES = {
-        'readthedocs.builds.syncers.Syncer': 'readthedocs.builds.syncers.LocalSyncer',
+        'readthedocs.builds.syncers.Syncer': 'readthedocs.builds.syncers.LocalDeltaSyncer',
         'readthedocs.core.resolver.Resolver': 'readthedocs.docsitalia.resolver.ItaliaResolver',
         'readthedocs.oauth.services.GitHubService':
             'readthedocs.docsitalia.oauth.services.github.DocsItaliaGithubService',
@@ -6,13 +6,20 @@ from __future__ import absolute_import
 import logging
 
 from django.dispatch import receiver
-from django.db.models.signals import pre_delete
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_save, pre_delete)
 
+from readthedocs.builds.constants import BUILD_STATE_FINISHED
+from readthedocs.builds.models import Build, Version
+from readthedocs.builds.signals import versions_synced
+from readthedocs.core.resolver import invalidate_resolver_cache
 from readthedocs.core.signals import webhook_github
 from readthedocs.doc_builder.signals import finalize_sphinx_context_data
 
-from .github import get_metadata_for_document
-from .models import PublisherProject, update_project_from_metadata
+from readthedocs.projects.models import Project
+
+from .models import Publisher, PublisherProject, PublishedDocument
+from .utils import get_search_routing, invalidate_listings_cache
 
 
 log = logging.getLogger(__name__) # noqa
@@ -36,13 +43,8 @@ def on_webhook_github(sender, project, data, event, **kwargs): # noqa
                  project, branch)
         return
 
-    try:
-        metadata = get_metadata_for_document(project)
-    except Exception as e: # noqa
-        log.error(
-            'Failed to import document metadata: %s', e)
-    else:
-        update_project_from_metadata(project, metadata)
+    from readthedocs.docsitalia.tasks import update_document_metadata
+    update_document_metadata.delay(project.pk)
 
 
 @receiver(finalize_sphinx_context_data)
@@ -85,7 +87,83 @@ def on_publisher_project_delete(sender, instance, **kwargs):  # noqa
         'projects', flat=True
     ))
     projects_pks = list(instance.projects.values_list('pk', flat=True))
+    # The document URLs include the publisher project, drop them while the
+    # relations still exist
+    invalidate_resolver_cache(projects_pks)
     projects_pks = [p for p in projects_pks if p not in reused_projects_pks]
     if projects_pks:
-        instance.projects.filter(pk__in=projects_pks).delete()
-        clear_es_index.delay(projects=projects_pks)
+        projects = instance.projects.filter(
+            pk__in=projects_pks
+        ).prefetch_related('superprojects__parent')
+        # The slugs are needed to route the deletes, get them while the
+        # projects still exist
+        routing = [get_search_routing(project) for project in projects]
+        projects_pks = [project.pk for project in projects]
+        projects.delete()
+        clear_es_index.delay(projects=projects_pks, routing=routing)
+
+
+@receiver(post_save, sender=Publisher)
+def invalidate_publisher_resolver_cache(sender, instance, **kwargs):  # noqa
+    """Publisher slugs are part of the documents URLs"""
+    invalidate_resolver_cache(PublisherProject.objects.filter(
+        publisher=instance
+    ).values_list('projects', flat=True))
+
+
+@receiver(post_save, sender=PublisherProject)
+def invalidate_publisher_project_resolver_cache(sender, instance, **kwargs):  # noqa
+    invalidate_resolver_cache(instance.projects.values_list('pk', flat=True))
+
+
+@receiver(m2m_changed, sender=PublisherProject.projects.through)
+def invalidate_publisher_project_documents_resolver_cache(
+        sender, instance, action, reverse, pk_set, **kwargs):  # noqa
+    """Documents added or removed from a PublisherProject change their URLs"""
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if reverse:
+        # instance is the project
+        invalidate_resolver_cache([instance.pk])
+    elif action == 'pre_clear':
+        invalidate_resolver_cache(instance.projects.values_list('pk', flat=True))
+    else:
+        invalidate_resolver_cache(pk_set or [])
+
+
+@receiver(post_save, sender=Build)
+def refresh_published_document_on_build(sender, instance, **kwargs):  # noqa
+    """A finished build can publish its document"""
+    if instance.state == BUILD_STATE_FINISHED:
+        PublishedDocument.refresh([instance.project_id])
+
+
+@receiver(post_save, sender=Version)
+def refresh_published_document_on_version(sender, instance, **kwargs):  # noqa
+    """Changing the privacy level or the active flag of a version can (un)publish its document"""
+    PublishedDocument.refresh([instance.project_id])
+
+
+@receiver(versions_synced)
+def refresh_published_document_on_sync(sender, project, **kwargs):  # noqa
+    """Versions created by a sync don't send post_save"""
+    PublishedDocument.refresh([project.pk])
+
+
+@receiver(post_delete, sender=Build)
+@receiver(post_delete, sender=Version)
+def refresh_published_document_on_delete(sender, instance, **kwargs):  # noqa
+    # the project may be in the middle of its deletion, don't create rows
+    PublishedDocument.refresh([instance.project_id], create=False)
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=Publisher)
+@receiver(post_delete, sender=Publisher)
+@receiver(post_save, sender=PublisherProject)
+@receiver(post_delete, sender=PublisherProject)
+@receiver(m2m_changed, sender=PublisherProject.projects.through)
+def invalidate_listings(sender, **kwargs):  # noqa
+    """The public listings show documents, publishers and publisher projects"""
+    invalidate_listings_cache()
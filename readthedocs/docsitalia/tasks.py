@@ -3,9 +3,13 @@
 from __future__ import unicode_literals
 import logging
 
-from django.conf import settings
-from elasticsearch import Elasticsearch, exceptions
-
+from readthedocs.docsitalia.github import (
+    get_all_metadata_for_publisher, get_metadata_for_document)
+from readthedocs.docsitalia.metadata import InvalidMetadata
+from readthedocs.docsitalia.models import (
+    Publisher, update_project_from_metadata)
+from readthedocs.docsitalia.utils import clear_projects_from_index
+from readthedocs.projects.models import Project
 from readthedocs.worker import app
 
 
@@ -13,21 +17,57 @@ log = logging.getLogger(__name__)  # noqa
 
 
 @app.task()
-def clear_es_index(projects):
-    """Clearing ES indexes for removed projects"""
+def clear_es_index(projects, routing=None):
+    """
+    Clearing ES indexes for removed projects
+
+    ``routing`` lists the routing values of each project, see
+    :py:func:`readthedocs.docsitalia.utils.get_search_routing`.
+    """
     projects_str = ', '.join([str(p) for p in projects])
     log.info('Clearing indexes for removed projects: %s', projects_str)
-    e_s = Elasticsearch(settings.ES_HOSTS)
-    for p_id in projects:
-        try:
-            e_s.delete(index='readthedocs', doc_type='project', id=p_id)
-        except exceptions.NotFoundError:
-            pass
-
-        try:
-            e_s.delete_by_query(
-                index='readthedocs',
-                doc_type='page',
-                body={'query': {'term': {'project_id': p_id}}})
-        except exceptions.NotFoundError:
-            pass
+    removed = clear_projects_from_index(projects, routing=routing)
+    log.info(
+        'Cleared indexes for removed projects: projects=%s pages=%s',
+        removed['projects'], removed['pages'])
+
+
+@app.task()
+def update_publisher_metadata(publisher_pk):
+    """Fetch the metadata of a publisher and create its projects"""
+    try:
+        publisher = Publisher.objects.get(pk=publisher_pk)
+    except Publisher.DoesNotExist:
+        log.warning('Publisher %s not found, not updating metadata', publisher_pk)
+        return
+
+    try:
+        publisher_metadata, projects_metadata = get_all_metadata_for_publisher(
+            publisher.remote_organization, publisher)
+    except InvalidMetadata as exception:
+        log.debug(
+            'Syncing GitHub organizations metadata from webhook failed: %s', exception)
+        return
+
+    publisher.metadata = publisher_metadata
+    publisher.projects_metadata = projects_metadata
+    publisher.save()
+    publisher.create_projects_from_metadata(projects_metadata)
+
+
+@app.task()
+def update_document_metadata(project_pk):
+    """Fetch the metadata of a document and update its project"""
+    try:
+        project = Project.objects.get(pk=project_pk)
+    except Project.DoesNotExist:
+        log.warning('Project %s not found, not updating metadata', project_pk)
+        return
+
+    try:
+        metadata = get_metadata_for_document(project)
+    except Exception as e: # noqa
+        log.error(
+            'Failed to import document metadata: %s', e)
+    else:
+        update_project_from_metadata(project, metadata)
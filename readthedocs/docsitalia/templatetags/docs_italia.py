@@ -2,7 +2,7 @@
 from __future__ import absolute_import
 
 from django import template
-from readthedocs.core.resolver import resolve
+from readthedocs.core.resolver import resolve, resolve_many
 
 from ..models import PublisherProject
 
@@ -27,3 +27,13 @@ def make_document_url(project, version=None, page=''):
     if url.endswith('/'):
         url = '%sindex.html' % url
     return url
+
+
+@register.simple_tag
+def resolve_docs_urls(projects):
+    """set the ``docs_url`` of the listed projects, resolved in bulk"""
+    projects = list(projects)
+    urls = resolve_many(projects)
+    for project in projects:
+        project.docs_url = urls[project.pk]
+    return projects
@@ -4,11 +4,23 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 
+import logging
+import time
+from itertools import chain
+
 import yaml
+from django.conf import settings
+from django.core.cache import cache
+from elasticsearch import exceptions
 
 from readthedocs.builds.models import Build
+from readthedocs.core.utils import chunks, incr_cache_generation
 from readthedocs.projects.models import Project
 from readthedocs.restapi.client import api as apiv2
+from readthedocs.search.cache import invalidate_search_cache
+from readthedocs.search.indexes import PageIndex, ProjectIndex
+
+log = logging.getLogger(__name__)
 
 
 def load_yaml(txt):
@@ -43,6 +55,28 @@ def get_subprojects(project_pk):
     )
 
 
+LISTINGS_GENERATION_KEY = 'docsitalia:listings:generation'
+
+
+def get_listings_cache_timeout():
+    return getattr(settings, 'DOCSITALIA_LISTINGS_CACHE_TIMEOUT', 60 * 60)
+
+
+def get_listings_cache_generation():
+    """
+    Generation of the cached public listings
+
+    The rendered listings are cached with the generation as part of the key,
+    see :py:func:`invalidate_listings_cache`.
+    """
+    return cache.get(LISTINGS_GENERATION_KEY, 0)
+
+
+def invalidate_listings_cache():
+    """Make all the cached homepage and publisher listings stale"""
+    incr_cache_generation(LISTINGS_GENERATION_KEY)
+
+
 def get_projects_with_builds():
     """Returns a queryset of Projects with active public builds"""
     with_ok_build_and_pub_version = Build.objects.filter(
@@ -57,3 +91,91 @@ def get_projects_with_builds():
     return Project.objects.filter(
         pk__in=with_ok_build_and_pub_version
     )
+
+
+def get_search_routing(project):
+    """
+    Returns the routing values of the pages of a project in the search index
+
+    Pages are indexed once for the project and once for each of its
+    superprojects, see :py:func:`readthedocs.restapi.utils.index_search_request`.
+    """
+    routing = [project.slug]
+    routing.extend(
+        relationship.parent.slug
+        for relationship in project.superprojects.all()
+    )
+    return routing
+
+
+def wait_for_es_task(e_s, task_id):
+    """Polls an Elasticsearch task until it completes and returns its response"""
+    interval = getattr(settings, 'DOCSITALIA_ES_CLEANUP_POLL_INTERVAL', 5)
+    while True:
+        task = e_s.tasks.get(task_id=task_id)
+        status = task['task']['status']
+        if task.get('completed'):
+            return task.get('response', status)
+        log.info(
+            'Removing pages from search index: %s/%s',
+            status['deleted'], status['total'])
+        time.sleep(interval)
+
+
+def clear_projects_from_index(projects, routing=None, dry_run=False):
+    """
+    Removes the projects and their pages from the search index
+
+    The projects are removed in chunks: project documents with a bulk request,
+    pages with a delete by query running as a task in the cluster.
+
+    :param projects: list of project ids
+    :param routing: list with the routing values of each project, see
+        :py:func:`get_search_routing`. Without it the pages are looked up
+        on every shard
+    :param dry_run: only count the documents that would be removed
+    :returns: a dict with the number of ``projects`` and ``pages`` removed
+    """
+    if routing is None:
+        routing = [None] * len(projects)
+    chunk_size = getattr(settings, 'DOCSITALIA_ES_CLEANUP_CHUNK_SIZE', 500)
+    project_index = ProjectIndex()
+    page_index = PageIndex()
+    e_s = page_index.es
+    removed = {'projects': 0, 'pages': 0}
+    for chunk in chunks(zip(projects, routing), chunk_size):
+        project_ids = [project_id for project_id, _ in chunk]
+        kwargs = {
+            'index': page_index._index,
+            'doc_type': page_index._type,
+            'body': {'query': {'terms': {'project_id': project_ids}}},
+        }
+        routes = [project_routing for _, project_routing in chunk]
+        if all(routes):
+            kwargs['routing'] = ','.join(sorted(set(chain(*routes))))
+
+        try:
+            if dry_run:
+                removed['projects'] += e_s.count(
+                    index=project_index._index,
+                    doc_type=project_index._type,
+                    body={'query': {'ids': {'values': project_ids}}},
+                )['count']
+                removed['pages'] += e_s.count(**kwargs)['count']
+                continue
+
+            removed['projects'] += project_index.bulk_delete(project_ids)
+            task = e_s.delete_by_query(
+                wait_for_completion=False, conflicts='proceed', **kwargs)
+        except exceptions.NotFoundError:
+            log.warning('Search index not found, nothing to remove')
+            break
+        response = wait_for_es_task(e_s, task['task'])
+        if response.get('failures'):
+            log.warning(
+                'Failed to remove pages from search index: %s',
+                response['failures'])
+        removed['pages'] += response['deleted']
+    if not dry_run:
+        invalidate_search_cache()
+    return removed
@@ -14,7 +14,11 @@ from readthedocs.projects.models import Project
 from readthedocs.projects.constants import PUBLIC
 from readthedocs.restapi.views.model_views import ProjectViewSet
 from readthedocs.restapi.serializers import VersionSerializer
+from readthedocs.search.cache import cached_search
 from readthedocs.search.indexes import PageIndex
+from readthedocs.search.lib import (
+    InvalidSearchPage, add_result_links, get_highlight_options,
+    get_next_cursor, normalize_query, paginate)
 
 from ..serializers import (
     DocsItaliaProjectSerializer, DocsItaliaProjectAdminSerializer)
@@ -63,7 +67,8 @@ class DocSearch(APIView):
 
     """Search api for documentation builds."""
 
-    def _build_es_query(self, query, project_slug, version_slug):  # noqa
+    def _build_es_query(self, query, project_slug, version_slug,  # noqa
+                        size=None, page=None, cursor=None):
         # c&p straight from search.lib.search_file AMA
         body = {
             # avoid elastic search returning hits with very low score
@@ -97,27 +102,37 @@ class DocSearch(APIView):
             "highlight": {
                 "fields": {
                     "title": {},
-                    "headers": {},
-                    "content": {},
+                    "headers": get_highlight_options(),
+                    "content": get_highlight_options(),
                 }
             },
-            "_source": ["title", "project", "version", "path"],
-            "size": 50  # TODO: Support pagination.
+            "_source": ["title", "project", "version", "path", "base_url"],
         }
         body['query']['bool']['filter'] = [
             {"terms": {"project": [project_slug]}},
             {'term': {'version': version_slug}},
         ]
+        paginate(body, size=size, page=page, cursor=cursor)
         return body
 
     def get(self, request):
-        """Search API: takes project, version and q as mandatory query strings"""
+        """
+        Search API: takes project, version and q as mandatory query strings
+
+        Results are paginated: ``size`` sets the number of results, ``page``
+        selects a page of the first results and ``cursor`` continues from the
+        ``next`` cursor of a previous response.
+        """
         project_slug = self.request.query_params.get('project')
         version_slug = self.request.query_params.get('version')
         query = self.request.query_params.get('q')
+        size = self.request.query_params.get('size')
+        page = self.request.query_params.get('page')
+        cursor = self.request.query_params.get('cursor')
 
         if not all([project_slug, version_slug, query]):
             raise ParseError()
+        query = normalize_query(query)
 
         try:
             project = Project.objects.get(slug=project_slug)
@@ -128,23 +143,25 @@ class DocSearch(APIView):
         except (Project.DoesNotExist, Version.DoesNotExist):
             raise ParseError()
 
-        body = self._build_es_query(query, project_slug, version_slug)
-        results = PageIndex().search(body, routing=project_slug)
+        try:
+            body = self._build_es_query(
+                query, project_slug, version_slug,
+                size=size, page=page, cursor=cursor)
+        except InvalidSearchPage as e:
+            raise ParseError(str(e))
+        results = cached_search(
+            PageIndex(), body, [project_slug], routing=project_slug)
         if results is None:
             return Response({'error': 'No results found'},
                             status=status.HTTP_404_NOT_FOUND)
 
-        # taken from restapi/views/search_views.py
         # Supplement result paths with domain information on project
-        hits = results.get('hits', {}).get('hits', [])
-        for (i, hit) in enumerate(hits):
-            fields = hit.get('_source', {})
-            canonical_url = project.get_docs_url(version_slug=version_slug)
-            results['hits']['hits'][i]['_source']['link'] = (
-                canonical_url + fields.get('path')
-            )
-            # we cannot render attributes starting with an underscore
-            results['hits']['hits'][i]['fields'] = results['hits']['hits'][i]['_source']
-            del results['hits']['hits'][i]['_source']
-
-        return Response({'results': results})
+        add_result_links(
+            results,
+            lambda *_: project.get_docs_url(version_slug=version_slug),
+        )
+
+        return Response({
+            'results': results,
+            'next': get_next_cursor(results, size),
+        })
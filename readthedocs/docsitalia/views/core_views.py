@@ -21,12 +21,23 @@ from readthedocs.projects.views.private import ImportView
 from ..github import get_metadata_for_document
 from ..metadata import InvalidMetadata
 from ..models import PublisherProject, Publisher, update_project_from_metadata
-from ..utils import get_projects_with_builds
+from ..utils import get_listings_cache_generation, get_listings_cache_timeout
 
 log = logging.getLogger(__name__)  # noqa
 
 
-class DocsItaliaHomePage(ListView):  # pylint: disable=too-many-ancestors
+class ListingsCacheMixin(object):
+
+    """Add the cache timeout and generation of the public listings to the context"""
+
+    def get_context_data(self, **kwargs):
+        context = super(ListingsCacheMixin, self).get_context_data(**kwargs)
+        context['listings_cache_timeout'] = get_listings_cache_timeout()
+        context['listings_cache_generation'] = get_listings_cache_generation()
+        return context
+
+
+class DocsItaliaHomePage(ListingsCacheMixin, ListView):  # pylint: disable=too-many-ancestors
 
     """Docs italia Home Page"""
 
@@ -42,20 +53,19 @@ class DocsItaliaHomePage(ListView):  # pylint: disable=too-many-ancestors
         - PublisherProject is active
         - document (Project) has a public build
         - Build is success and finished
+
+        The build status is read from :py:class:`PublishedDocument`.
         """
-        active_pub_projects = PublisherProject.objects.filter(
-            active=True,
-            publisher__active=True
-        )
-        qs = get_projects_with_builds()
-        return qs.filter(
-            publisherproject__in=active_pub_projects
-        ).order_by(
+        return Project.objects.filter(
+            published_document__has_public_build=True,
+            publisherproject__active=True,
+            publisherproject__publisher__active=True
+        ).distinct().order_by(
             '-modified_date', '-pub_date'
         )[:24]
 
 
-class PublisherList(ListView):  # pylint: disable=too-many-ancestors
+class PublisherList(ListingsCacheMixin, ListView):  # pylint: disable=too-many-ancestors
 
     """List view of :py:class:`Publisher` instances."""
 
@@ -69,23 +79,14 @@ class PublisherList(ListView):  # pylint: disable=too-many-ancestors
         - are active
         - have documents with successful public build
         """
-        active_pub_projects = PublisherProject.objects.filter(
-            active=True,
-            publisher__active=True
-        )
-        publishers_with_projects = get_projects_with_builds().filter(
-            publisherproject__in=active_pub_projects
-        ).values_list(
-            'publisherproject__publisher',
-            flat=True
-        )
-
         return Publisher.objects.filter(
-            pk__in=publishers_with_projects
-        )
+            active=True,
+            publisherproject__active=True,
+            publisherproject__projects__published_document__has_public_build=True
+        ).distinct()
 
 
-class PublisherIndex(DetailView):  # pylint: disable=too-many-ancestors
+class PublisherIndex(ListingsCacheMixin, DetailView):  # pylint: disable=too-many-ancestors
 
     """Detail view of :py:class:`Publisher` instances."""
 
@@ -96,7 +97,7 @@ class PublisherIndex(DetailView):  # pylint: disable=too-many-ancestors
         return Publisher.objects.filter(active=True)
 
 
-class PublisherProjectIndex(DetailView):  # pylint: disable=too-many-ancestors
+class PublisherProjectIndex(ListingsCacheMixin, DetailView):  # pylint: disable=too-many-ancestors
 
     """Detail view of :py:class:`PublisherProject` instances."""
 
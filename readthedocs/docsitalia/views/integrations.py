@@ -17,12 +17,9 @@ from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from readthedocs.docsitalia.metadata import (
-    PUBLISHER_SETTINGS, PROJECTS_SETTINGS, InvalidMetadata)
 from readthedocs.docsitalia.models import (
     Publisher, PublisherIntegration)
-
-from readthedocs.docsitalia.github import get_metadata_for_publisher
+from readthedocs.docsitalia.tasks import update_publisher_metadata
 from readthedocs.integrations.models import HttpExchange
 from readthedocs.integrations.utils import normalize_request_payload
 
@@ -115,25 +112,10 @@ class MetadataWebhookMixin(object): # noqa
         # we get metadata only from the master branch
         to_update = [branch for branch in branches if branch == 'master']
         if to_update:
-            # TODO: we should probably do this inside a task as core.utils.trigger_build
-            org_obj = publisher.remote_organization
-            try:
-                publisher_metadata = get_metadata_for_publisher(
-                    org_obj, publisher, PUBLISHER_SETTINGS)
-                projects_metadata = get_metadata_for_publisher(
-                    org_obj, publisher, PROJECTS_SETTINGS)
-            except InvalidMetadata as exception:
-                log.debug(
-                    'Syncing GitHub organizations metadata from webhook failed: %s', exception)
-                # push the failure to the caller
-                to_update = False
-            else:
-                publisher.metadata = publisher_metadata
-                publisher.projects_metadata = projects_metadata
-                publisher.save()
-                publisher.create_projects_from_metadata(projects_metadata)
-
-        if not to_update:
+            # the metadata are fetched by a task, the webhook doesn't wait
+            # for GitHub
+            update_publisher_metadata.delay(publisher.pk)
+        else:
             log.info('Skipping metadata update for publisher: publisher=%s branches=%s',
                      publisher, branches)
         triggered = True if to_update else False
@@ -122,38 +122,72 @@ class Service(object):
 
     def paginate(self, url, **kwargs):
         """
-        Recursively combine results from service's pagination.
+        Combine results from service's pagination.
 
         :param url: start url to get the data from.
         :type url: unicode
         :param kwargs: optional parameters passed to .get() method
         :type kwargs: dict
         """
-        try:
-            resp = self.get_session().get(url, data=kwargs)
-            next_url = self.get_next_url_to_paginate(resp)
-            results = self.get_paginated_results(resp)
-            if next_url:
-                results.extend(self.paginate(next_url))
-            return results
-        # Catch specific exception related to OAuth
-        except InvalidClientIdError:
-            log.warning('access_token or refresh_token failed: %s', url)
-            raise Exception('You should reconnect your account')
-        # Catch exceptions with request or deserializing JSON
-        except (RequestException, ValueError):
-            # Response data should always be JSON, still try to log if not
-            # though
+        return list(self.iter_paginated(url, **kwargs))
+
+    def iter_paginated(self, url, **kwargs):
+        """
+        Yield results from service's pagination, one page at a time.
+
+        Pages are requested as they are consumed, following the next url of
+        each response. When the API rate limit is exhausted, pagination waits
+        for the limit reset or stops, see :py:meth:`wait_for_rate_limit`.
+
+        :param url: start url to get the data from.
+        :type url: unicode
+        :param kwargs: optional parameters passed to .get() method
+        :type kwargs: dict
+        """
+        while url:
+            resp = None
             try:
-                debug_data = resp.json()
-            except ValueError:
-                debug_data = resp.content
-            log.debug(
-                'Paginate failed at %s with response: %s',
-                url,
-                debug_data,
-            )
-            return []
+                resp = self.get_session().get(url, data=kwargs)
+                next_url = self.get_next_url_to_paginate(resp)
+                results = self.get_paginated_results(resp)
+            # Catch specific exception related to OAuth
+            except InvalidClientIdError:
+                log.warning('access_token or refresh_token failed: %s', url)
+                raise Exception('You should reconnect your account')
+            # Catch exceptions with request or deserializing JSON
+            except (RequestException, ValueError):
+                # Response data should always be JSON, still try to log if not
+                # though
+                debug_data = None
+                if resp is not None:
+                    try:
+                        debug_data = resp.json()
+                    except ValueError:
+                        debug_data = resp.content
+                log.debug(
+                    'Paginate failed at %s with response: %s',
+                    url,
+                    debug_data,
+                )
+                return
+            for result in results:
+                yield result
+            if next_url and not self.wait_for_rate_limit(resp):
+                log.warning('Rate limit exceeded, stopping pagination at %s',
+                            next_url)
+                return
+            url = next_url
+            kwargs = {}
+
+    def wait_for_rate_limit(self, response):
+        """
+        Wait until more requests can be sent to the service, if needed.
+
+        :param response: last response of the service
+        :type response: requests.Response
+        :returns: ``False`` if no more requests can be sent for now
+        """
+        return True
 
     def sync(self):
         raise NotImplementedError
@@ -5,6 +5,7 @@ from builtins import str
 import logging
 import json
 import re
+import time
 
 from django.conf import settings
 from django.core.urlresolvers import reverse
@@ -98,28 +99,38 @@ class GitHubService(Service):
                 return None
             else:
                 repo.organization = organization
-            repo.name = fields['name']
-            repo.description = fields['description']
-            repo.ssh_url = fields['ssh_url']
-            repo.html_url = fields['html_url']
-            repo.private = fields['private']
-            if repo.private:
-                repo.clone_url = fields['ssh_url']
-            else:
-                repo.clone_url = fields['clone_url']
-            repo.admin = fields.get('permissions', {}).get('admin', False)
-            repo.vcs = 'git'
-            repo.account = self.account
-            repo.avatar_url = fields.get('owner', {}).get('avatar_url')
-            if not repo.avatar_url:
-                repo.avatar_url = self.default_user_avatar_url
-            repo.json = json.dumps(fields)
+            self.update_repository_fields(repo, fields)
             repo.save()
             return repo
         else:
             log.debug('Not importing %s because mismatched type',
                       fields['name'])
 
+    def update_repository_fields(self, repo, fields):
+        """
+        Update a repository from GitHub API response, without saving it.
+
+        :param repo: repository to update
+        :type repo: RemoteRepository
+        :param fields: dictionary of response data from API
+        """
+        repo.name = fields['name']
+        repo.description = fields['description']
+        repo.ssh_url = fields['ssh_url']
+        repo.html_url = fields['html_url']
+        repo.private = fields['private']
+        if repo.private:
+            repo.clone_url = fields['ssh_url']
+        else:
+            repo.clone_url = fields['clone_url']
+        repo.admin = fields.get('permissions', {}).get('admin', False)
+        repo.vcs = 'git'
+        repo.account = self.account
+        repo.avatar_url = fields.get('owner', {}).get('avatar_url')
+        if not repo.avatar_url:
+            repo.avatar_url = self.default_user_avatar_url
+        repo.json = json.dumps(fields)
+
     def create_organization(self, fields):
         """
         Update or create remote organization from GitHub API response.
@@ -156,6 +167,27 @@ class GitHubService(Service):
     def get_paginated_results(self, response):
         return response.json()
 
+    def wait_for_rate_limit(self, response):
+        """
+        Wait for the reset of the GitHub rate limit once it's exhausted.
+
+        Waits longer than ``OAUTH_RATE_LIMIT_MAX_WAIT`` seconds are not worth
+        holding the sync for: ``False`` is returned instead.
+        """
+        try:
+            remaining = int(response.headers['X-RateLimit-Remaining'])
+            reset = int(response.headers['X-RateLimit-Reset'])
+        except (KeyError, ValueError):
+            return True
+        if remaining > 0:
+            return True
+        delay = max(reset - time.time(), 0)
+        if delay > getattr(settings, 'OAUTH_RATE_LIMIT_MAX_WAIT', 60):
+            return False
+        log.info('GitHub rate limit exceeded, waiting %d seconds', delay)
+        time.sleep(delay)
+        return True
+
     def get_webhook_data(self, project, integration):
         """Get webhook JSON data to post to the API."""
         return json.dumps({
@@ -14,7 +14,9 @@ import logging
 import os
 import shutil
 import socket
+import time
 from collections import defaultdict
+from multiprocessing.pool import ThreadPool
 
 import requests
 from builtins import str
@@ -22,7 +24,8 @@ from celery import Task
 from celery.exceptions import SoftTimeLimitExceeded
 from django.conf import settings
 from django.core.urlresolvers import reverse
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Case, Q, Value, When
 from django.utils.translation import ugettext_lazy as _
 from readthedocs_build.config import ConfigError
 from slumber.exceptions import HttpClientError
@@ -42,7 +45,7 @@ from readthedocs.builds.syncers import Syncer
 from readthedocs.cdn.purge import purge
 from readthedocs.core.resolver import resolve_path
 from readthedocs.core.symlink import PublicSymlink, PrivateSymlink
-from readthedocs.core.utils import send_email, broadcast
+from readthedocs.core.utils import send_email, broadcast, chunks
 from readthedocs.doc_builder.config import load_yaml_config
 from readthedocs.doc_builder.constants import DOCKER_LIMITS
 from readthedocs.doc_builder.environments import (LocalBuildEnvironment,
@@ -53,7 +56,10 @@ from readthedocs.doc_builder.python_environments import Virtualenv, Conda
 from readthedocs.projects.models import APIProject
 from readthedocs.restapi.client import api as api_v2
 from readthedocs.restapi.utils import index_search_request
-from readthedocs.search.parse_json import process_all_json_files
+from readthedocs.restapi.views.footer_views import invalidate_footer_cache
+from readthedocs.search.parse_json import (
+    get_changed_json_files, get_deleted_page_names, iter_all_json_files,
+    iter_processed_files)
 from readthedocs.vcs_support import utils as vcs_support_utils
 from readthedocs.worker import app
 
@@ -266,6 +272,10 @@ class UpdateDocsTaskStep(SyncRepositoryMixin):
             self.config = config
         self.task = task
         self.setup_env = None
+        # Doctrees of the HTML build, reused by the other Sphinx builders
+        self.html_doctrees = None
+        # Outcomes already synced to the web servers during the build
+        self.published_outcomes = ()
 
     def _log(self, msg):
         log.info(LOG_TEMPLATE
@@ -458,12 +468,14 @@ class UpdateDocsTaskStep(SyncRepositoryMixin):
 
             # Finalize build and update web servers
             if build_id:
+                published = self.published_outcomes
                 self.update_app_instances(
-                    html=bool(outcomes['html']),
-                    search=bool(outcomes['search']),
+                    html=bool(outcomes['html']) and 'html' not in published,
+                    search=bool(outcomes['search']) and 'search' not in published,
                     localmedia=bool(outcomes['localmedia']),
                     pdf=bool(outcomes['pdf']),
                     epub=bool(outcomes['epub']),
+                    index='html' not in published,
                 )
             else:
                 log.warning('No build ID, not syncing files')
@@ -554,12 +566,17 @@ class UpdateDocsTaskStep(SyncRepositoryMixin):
         self.version.project.documentation_type = ret
 
     def update_app_instances(self, html=False, localmedia=False, search=False,
-                             pdf=False, epub=False):
+                             pdf=False, epub=False, partial=False, index=True):
         """
         Update application instances with build artifacts.
 
         This triggers updates across application instances for html, pdf, epub,
         downloads, and search. Tasks are broadcast to all web servers from here.
+
+        :param partial: other formats are still building, the artifacts of
+            the formats not synced now are kept
+        :param index: update the imported files and the search index once the
+            files are synced
         """
         # Update version if we have successfully built HTML output
         try:
@@ -590,8 +607,12 @@ class UpdateDocsTaskStep(SyncRepositoryMixin):
                 search=search,
                 pdf=pdf,
                 epub=epub,
+                clear_artifacts=not partial,
+            ),
+            callback=(
+                sync_callback.s(version_pk=self.version.pk, commit=self.build['commit'])
+                if index else None
             ),
-            callback=sync_callback.s(version_pk=self.version.pk, commit=self.build['commit']),
         )
 
     def setup_python_environment(self):
@@ -637,18 +658,56 @@ class UpdateDocsTaskStep(SyncRepositoryMixin):
         before_build.send(sender=self.version)
 
         outcomes = defaultdict(lambda: False)
+        self.published_outcomes = ()
         with self.project.repo_nonblockinglock(
                 version=self.version,
                 max_lock_age=getattr(settings, 'REPO_LOCK_SECONDS', 30)):
             outcomes['html'] = self.build_docs_html()
             outcomes['search'] = self.build_docs_search()
-            outcomes['localmedia'] = self.build_docs_localmedia()
-            outcomes['pdf'] = self.build_docs_pdf()
-            outcomes['epub'] = self.build_docs_epub()
+            outcomes.update(self.build_docs_formats(outcomes))
 
         after_build.send(sender=self.version)
         return outcomes
 
+    def build_docs_formats(self, outcomes):
+        """
+        Build the localmedia, PDF and ePub formats.
+
+        If the build environment allows it, the formats are built at the same
+        time. The HTML and search outputs are then synced to the web servers
+        before starting, so they don't wait for the slower formats.
+
+        :param outcomes: outcomes of the HTML and search builds
+        :returns: outcomes of the formats
+        :rtype: dict
+        """
+        builds = [
+            ('localmedia', self.build_docs_localmedia),
+            ('pdf', self.build_docs_pdf),
+            ('epub', self.build_docs_epub),
+        ]
+        parallel = min(len(builds), self.build_env.max_parallel_builds)
+        requested = set(self.config.formats) & set(['htmlzip', 'pdf', 'epub'])
+        if parallel <= 1 or not requested:
+            return dict((name, build()) for name, build in builds)
+
+        if outcomes['html'] and self.build.get('id'):
+            self.update_app_instances(
+                html=True,
+                search=bool(outcomes['search']),
+                partial=True,
+            )
+            self.published_outcomes = ('html', 'search')
+
+        pool = ThreadPool(parallel)
+        try:
+            results = pool.map(lambda build: build[1](), builds)
+        finally:
+            pool.close()
+            pool.join()
+        return dict(
+            (name, result) for (name, _), result in zip(builds, results))
+
     def build_docs_html(self):
         """Build HTML docs."""
         html_builder = get_builder_class(self.project.documentation_type)(
@@ -661,6 +720,8 @@ class UpdateDocsTaskStep(SyncRepositoryMixin):
         success = html_builder.build()
         if success:
             html_builder.move()
+            if hasattr(html_builder, 'get_doctrees_path'):
+                self.html_doctrees = html_builder.get_doctrees_path()
 
         # Gracefully attempt to move files via task on web workers.
         try:
@@ -714,6 +775,15 @@ class UpdateDocsTaskStep(SyncRepositoryMixin):
         process.
         """
         builder = get_builder_class(builder_class)(self.build_env, python_env=self.python_env)
+        if self.html_doctrees and hasattr(builder, 'seed_doctrees'):
+            try:
+                builder.seed_doctrees(self.html_doctrees)
+            except (IOError, OSError):
+                log.warning(
+                    'Could not reuse the HTML doctrees: builder=%s',
+                    builder_class,
+                    exc_info=True,
+                )
         success = builder.build()
         builder.move()
         return success
@@ -726,17 +796,21 @@ class UpdateDocsTaskStep(SyncRepositoryMixin):
 # Web tasks
 @app.task(queue='web')
 def sync_files(project_pk, version_pk, hostname=None, html=False,
-               localmedia=False, search=False, pdf=False, epub=False):
+               localmedia=False, search=False, pdf=False, epub=False,
+               clear_artifacts=True):
     """
     Sync build artifacts to application instances.
 
     This task broadcasts from a build instance on build completion and performs
     synchronization of build artifacts on each application instance.
+
+    :param clear_artifacts: remove the PDF and ePub artifacts that aren't
+        synced, ``False`` when the formats are still being built
     """
     # Clean up unused artifacts
-    if not pdf:
+    if clear_artifacts and not pdf:
         clear_pdf_artifacts(version_pk)
-    if not epub:
+    if clear_artifacts and not epub:
         clear_epub_artifacts(version_pk)
 
     # Sync files to the web servers
@@ -756,6 +830,10 @@ def sync_files(project_pk, version_pk, hostname=None, html=False,
     # Update metadata
     update_static_metadata(project_pk)
 
+    # Footers show the downloads and versions just built
+    invalidate_footer_cache(
+        Project.objects.filter(pk=project_pk).values_list('slug', flat=True))
+
 
 @app.task(queue='web')
 def move_files(version_pk, hostname, html=False, localmedia=False, search=False,
@@ -817,26 +895,52 @@ def move_files(version_pk, hostname, html=False, localmedia=False, search=False,
 
 
 @app.task(queue='web')
-def update_search(version_pk, commit, delete_non_commit_files=True):
+def update_search(version_pk, commit, delete_non_commit_files=True,
+                  changed_files=None, deleted_files=None):
     """
     Task to update search indexes.
 
+    When ``changed_files`` is given only the pages built from those HTML
+    files are parsed and indexed, and the pages built from ``deleted_files``
+    are removed from the index by id. Otherwise all the pages are reindexed.
+
     :param version_pk: Version id to update
     :param commit: Commit that updated index
     :param delete_non_commit_files: Delete files not in commit from index
+    :param changed_files: HTML files whose content changed in this build
+    :param deleted_files: HTML files that are gone since the previous build
     """
     version = Version.objects.get(pk=version_pk)
 
-    if version.project.is_type_sphinx:
-        page_list = process_all_json_files(version, build_dir=False)
-    else:
+    if not version.project.is_type_sphinx:
         log.debug('Unknown documentation type: %s',
                   version.project.documentation_type)
         return
 
-    log_msg = ' '.join([page['path'] for page in page_list])
-    log.info("(Search Index) Sending Data: %s [%s]", version.project.slug,
-             log_msg)
+    if changed_files is None:
+        # Pages are parsed in parallel and streamed to the index in chunks
+        page_list = iter_all_json_files(version, build_dir=False)
+        delete_pages = None
+    else:
+        json_path = version.project.get_production_media_path(
+            type_='json', version_slug=version.slug, include_file=False)
+        page_list = iter_processed_files(
+            get_changed_json_files(json_path, changed_files))
+        delete_pages = get_deleted_page_names(json_path, deleted_files or [])
+        # Unchanged pages keep the commit they were indexed with
+        delete_non_commit_files = False
+        log.info(
+            LOG_TEMPLATE.format(
+                project=version.project.slug,
+                version=version.slug,
+                msg='Updating search index for {changed} changed and {deleted} '
+                    'deleted files'.format(
+                        changed=len(changed_files),
+                        deleted=len(deleted_files or []),
+                    ),
+            ))
+
+    log.info("(Search Index) Sending Data: %s", version.project.slug)
     index_search_request(
         version=version,
         page_list=page_list,
@@ -847,6 +951,7 @@ def update_search(version_pk, commit, delete_non_commit_files=True):
         # They aren't currently exposed anywhere.
         section=False,
         delete=delete_non_commit_files,
+        delete_pages=delete_pages,
     )
 
 
@@ -912,6 +1017,10 @@ def fileify(version_pk, commit):
     Create ImportedFile objects for all of a version's files.
 
     This is so we have an idea of what files we have in the database.
+
+    :returns: a ``(changed_files, deleted_files)`` tuple with the paths of
+        the files that changed or disappeared since the previous build, or
+        ``None`` when the previous state of the version is unknown
     """
     version = Version.objects.get(pk=version_pk)
     project = version.project
@@ -921,63 +1030,155 @@ def fileify(version_pk, commit):
                  .format(project=project.slug, version=version.slug,
                          msg=('Imported File not being built because no commit '
                               'information')))
-        return
+        return None
 
     path = project.rtd_build_path(version.slug)
     if path:
         log.info(LOG_TEMPLATE
                  .format(project=version.project.slug, version=version.slug,
                          msg='Creating ImportedFiles'))
-        _manage_imported_files(version, path, commit)
+        has_previous = ImportedFile.objects.filter(version=version).exists()
+        changes = _manage_imported_files(version, path, commit)
+        if has_previous:
+            return changes
     else:
         log.info(LOG_TEMPLATE
                  .format(project=project.slug, version=version.slug,
                          msg='No ImportedFile files'))
+    return None
+
+
+def _hash_file(full_path, chunk_size=64 * 1024):
+    """Return the md5 of ``full_path`` reading it in chunks."""
+    md5 = hashlib.md5()
+    with open(full_path, 'rb') as fd:
+        for chunk in iter(lambda: fd.read(chunk_size), b''):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+def _hash_imported_files(path):
+    """
+    Walk ``path`` and hash every file in a thread pool.
+
+    :returns: a dict mapping each file path, relative to ``path``, to a
+        ``(filename, md5)`` tuple
+    """
+    files = []
+    for root, __, filenames in os.walk(path):
+        for filename in filenames:
+            dirpath = os.path.join(root.replace(path, '').lstrip('/'),
+                                   filename.lstrip('/'))
+            files.append((dirpath, filename, os.path.join(root, filename)))
+
+    pool = ThreadPool(getattr(settings, 'IMPORTED_FILES_HASH_THREADS', 8))
+    try:
+        hashes = pool.map(_hash_file, [full_path for __, __, full_path in files])
+    finally:
+        pool.close()
+        pool.join()
+    return {
+        dirpath: (filename, md5)
+        for (dirpath, filename, __), md5 in zip(files, hashes)
+    }
 
 
 def _manage_imported_files(version, path, commit):
     """
     Update imported files for version.
 
+    Existing rows are loaded with one query and reconciled with the files on
+    disk in batches: new files are bulk created, files with a new commit are
+    updated with one query per batch and files that are gone are deleted
+    with a single query.
+
     :param version: Version instance
     :param path: Path to search
     :param commit: Commit that updated path
+    :returns: a ``(changed_files, deleted_files)`` tuple of sets of paths
     """
+    start = time.time()
+    batch_size = getattr(settings, 'IMPORTED_FILES_BATCH_SIZE', 500)
+    files = _hash_imported_files(path)
+
+    existing = defaultdict(list)
+    queryset = ImportedFile.objects.filter(project=version.project,
+                                           version=version)
+    for pk, dirpath, md5, obj_commit in queryset.values_list(
+            'pk', 'path', 'md5', 'commit'):
+        existing[dirpath].append((pk, md5, obj_commit))
+
     changed_files = set()
-    for root, __, filenames in os.walk(path):
-        for filename in filenames:
-            dirpath = os.path.join(root.replace(path, '').lstrip('/'),
-                                   filename.lstrip('/'))
-            full_path = os.path.join(root, filename)
-            md5 = hashlib.md5(open(full_path, 'rb').read()).hexdigest()
-            try:
-                obj, __ = ImportedFile.objects.get_or_create(
-                    project=version.project,
-                    version=version,
-                    path=dirpath,
-                    name=filename,
+    to_create = []
+    to_update_md5 = []
+    to_update_commit = []
+    for dirpath, (filename, md5) in files.items():
+        rows = existing.get(dirpath)
+        if not rows:
+            to_create.append(ImportedFile(
+                project=version.project,
+                version=version,
+                path=dirpath,
+                name=filename,
+                md5=md5,
+                commit=commit,
+            ))
+            changed_files.add(dirpath)
+            continue
+        if len(rows) > 1:
+            log.warning('Error creating ImportedFile')
+            continue
+        pk, obj_md5, obj_commit = rows[0]
+        if obj_md5 != md5:
+            to_update_md5.append((pk, md5))
+            changed_files.add(dirpath)
+        elif obj_commit != commit:
+            to_update_commit.append(pk)
+
+    with transaction.atomic():
+        ImportedFile.objects.bulk_create(to_create, batch_size=batch_size)
+        # Files with new content get their own md5 with a CASE expression,
+        # the others only need the commit to be bumped
+        for batch in chunks(to_update_md5, batch_size):
+            ImportedFile.objects.filter(pk__in=[pk for pk, __ in batch]).update(
+                md5=Case(*[
+                    When(pk=pk, then=Value(md5))
+                    for pk, md5 in batch
+                ]),
+                commit=commit,
+            )
+        for pks in chunks(to_update_commit, batch_size):
+            ImportedFile.objects.filter(pk__in=pks).update(commit=commit)
+
+        # Delete ImportedFiles from previous versions
+        deleted_qs = queryset.exclude(commit=commit)
+        deleted_files = set(deleted_qs.values_list('path', flat=True))
+        deleted_count = deleted_qs.delete()[0]
+
+    log.info(
+        LOG_TEMPLATE.format(
+            project=version.project.slug,
+            version=version.slug,
+            msg=(
+                'ImportedFiles updated in {elapsed:.2f}s: {created} created, '
+                '{updated} updated, {deleted} deleted'.format(
+                    elapsed=time.time() - start,
+                    created=len(to_create),
+                    updated=len(to_update_md5) + len(to_update_commit),
+                    deleted=deleted_count,
                 )
-            except ImportedFile.MultipleObjectsReturned:
-                log.warning('Error creating ImportedFile')
-                continue
-            if obj.md5 != md5:
-                obj.md5 = md5
-                changed_files.add(dirpath)
-            if obj.commit != commit:
-                obj.commit = commit
-            obj.save()
-    # Delete ImportedFiles from previous versions
-    ImportedFile.objects.filter(project=version.project,
-                                version=version
-                                ).exclude(commit=commit).delete()
+            ),
+        ))
+
     # Purge Cache
     cdn_ids = getattr(settings, 'CDN_IDS', None)
     if cdn_ids:
         if version.project.slug in cdn_ids:
-            changed_files = [resolve_path(
+            changed_urls = [resolve_path(
                 version.project, filename=fname, version_slug=version.slug,
             ) for fname in changed_files]
-            purge(cdn_ids[version.project.slug], changed_files)
+            purge(cdn_ids[version.project.slug], changed_urls)
+    return changed_files, deleted_files
 
 
 @app.task(queue='web')
@@ -1122,9 +1323,15 @@ def remove_dir(path):
     Remove a directory on the build/celery server.
 
     This is mainly a wrapper around shutil.rmtree so that app servers can kill
-    things on the build server.
+    things on the build server. Trees published by
+    :py:class:`readthedocs.builds.syncers.LocalDeltaSyncer` are symlinks, the
+    link and the tree it points to are removed.
     """
     log.info("Removing %s", path)
+    if os.path.islink(path):
+        real_path = os.path.realpath(path)
+        os.unlink(path)
+        path = real_path
     shutil.rmtree(path, ignore_errors=True)
 
 
@@ -1176,8 +1383,17 @@ def sync_callback(_, version_pk, commit, *args, **kwargs):
 
     The first argument is the result from previous tasks, which we discard.
     """
-    fileify(version_pk, commit=commit)
-    update_search(version_pk, commit=commit)
+    changes = fileify(version_pk, commit=commit)
+    if changes is None:
+        update_search(version_pk, commit=commit)
+    else:
+        changed_files, deleted_files = changes
+        update_search(
+            version_pk,
+            commit=commit,
+            changed_files=changed_files,
+            deleted_files=deleted_files,
+        )
 
 
 @app.task()
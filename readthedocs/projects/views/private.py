@@ -25,6 +25,7 @@ from readthedocs.builds.forms import AliasForm, VersionForm
 from readthedocs.builds.models import Version, VersionAlias
 from readthedocs.core.mixins import ListViewWithForm, LoginRequiredMixin
 from readthedocs.core.permissions import AdminPermission
+from readthedocs.core.resolver import invalidate_resolver_cache
 from readthedocs.core.utils import broadcast, trigger_build
 from readthedocs.integrations.models import HttpExchange, Integration
 from readthedocs.oauth.services import registry
@@ -583,6 +584,8 @@ def project_translations_delete(request, project_slug, child_slug):
         slug=child_slug,
     )
     project.translations.remove(subproj)
+    # ``remove`` doesn't send ``post_save`` for the translation
+    invalidate_resolver_cache([project.pk, subproj.pk])
     project_dashboard = reverse('projects_translations', args=[project.slug])
     return HttpResponseRedirect(project_dashboard)
 
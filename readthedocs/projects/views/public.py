@@ -28,6 +28,7 @@ from readthedocs.builds.constants import LATEST
 from readthedocs.builds.models import Version
 from readthedocs.builds.views import BuildTriggerMixin
 from readthedocs.projects.models import ImportedFile, Project
+from readthedocs.search import lib as search_lib
 from readthedocs.search.indexes import PageIndex
 from readthedocs.search.views import LOG_TEMPLATE
 
@@ -292,6 +293,12 @@ def elastic_project_search(request, project_slug):
                 msg=query or '',
             ))
 
+    try:
+        page_number = int(request.GET.get('page', 1))
+    except ValueError:
+        page_number = 1
+    page = None
+
     if query:
 
         kwargs = {}
@@ -312,22 +319,30 @@ def elastic_project_search(request, project_slug):
             'highlight': {
                 'fields': {
                     'title': {},
-                    'headers': {},
-                    'content': {},
+                    'headers': search_lib.get_highlight_options(),
+                    'content': search_lib.get_highlight_options(),
                 }
             },
             '_source': ['title', 'project', 'version', 'path'],
-            'size': 50,  # TODO: Support pagination.
         }
 
         # Add routing to optimize search by hitting the right shard.
         kwargs['routing'] = project_slug
 
-        results = PageIndex().search(body, **kwargs)
+        try:
+            search_lib.paginate(body, page=page_number)
+            results = PageIndex().search(body, **kwargs)
+        except search_lib.InvalidSearchPage:
+            results = {}
     else:
         results = {}
 
     if results:
+        page = search_lib.SearchPage(
+            number=page_number,
+            size=search_lib.get_page_size(),
+            total=results['hits'].get('total', 0),
+        )
         # pre and post 1.0 compat
         for num, hit in enumerate(results['hits']['hits']):
             for key, val in list(hit['_source'].items()):
@@ -344,6 +359,7 @@ def elastic_project_search(request, project_slug):
             'project': project,
             'query': query,
             'results': results,
+            'page': page,
         },
     )
 
@@ -4,14 +4,29 @@ from __future__ import absolute_import
 from django.db.models import Manager
 from django.db.models.query import QuerySet
 
+from .matcher import RedirectMatcher
+
 
 class RedirectQuerySet(QuerySet):
+
+    def get_matcher(self):
+        """Compile the redirects of the queryset, see :py:class:`RedirectMatcher`."""
+        return RedirectMatcher(self)
+
     def get_redirect_path(self, path, language=None, version_slug=None):
-        for redirect in self.select_related('project'):
-            new_path = redirect.get_redirect_path(
-                path=path, language=language, version_slug=version_slug)
-            if new_path:
-                return new_path
+        redirects = list(self.select_related('project'))
+        if len(set(redirect.project_id for redirect in redirects)) > 1:
+            # Paths are resolved differently for each project
+            for redirect in redirects:
+                new_path = redirect.get_redirect_path(
+                    path=path, language=language, version_slug=version_slug)
+                if new_path:
+                    return new_path
+            return None
+        matcher = RedirectMatcher(redirects)
+        return matcher.get_redirect_path(
+            lambda: redirects[0].project, path=path, language=language,
+            version_slug=version_slug)
 
 
 RedirectManager = Manager.from_queryset(RedirectQuerySet)
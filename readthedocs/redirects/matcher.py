@@ -0,0 +1,194 @@
+"""
+Compiled redirect tables.
+
+Instead of trying every :py:class:`Redirect` of a project against a path,
+the redirects are compiled once in a :py:class:`RedirectMatcher`:
+
+* ``prefix`` redirects and ``exact`` redirects using ``$rest`` go in prefix
+  tries, walked once per lookup;
+* ``page`` and ``exact`` redirects go in hash maps keyed by their URL;
+* the ``sphinx_html`` and ``sphinx_htmldir`` redirects only need their
+  position, as they match on the path ending.
+
+The matcher holds plain data only, so it can be pickled into the cache.
+Redirects keep the priority of the queryset they are compiled from: when
+more than one matches, the first one wins.
+"""
+
+from __future__ import absolute_import
+
+import logging
+import re
+
+from readthedocs.core.resolver import resolve_path
+
+log = logging.getLogger(__name__)
+
+REST_MARKER = '$rest'
+SPHINX_HTML_ENDINGS = ('/', '/index.html')
+
+
+def get_full_path(project, filename, language=None, version_slug=None):
+    """
+    Return a full path for a given filename.
+
+    This will include version and language information. No protocol/domain
+    is returned.
+    """
+    # Handle explicit http redirects
+    if re.match('^https?://', filename):
+        return filename
+
+    return resolve_path(
+        project=project, language=language,
+        version_slug=version_slug, filename=filename
+    )
+
+
+class PrefixTrie(object):
+
+    """Character trie returning every value whose prefix matches a path."""
+
+    # Marks the values stored at a node, characters are never empty
+    VALUES = ''
+
+    def __init__(self):
+        self.root = {}
+
+    def __bool__(self):
+        return bool(self.root)
+
+    __nonzero__ = __bool__
+
+    def add(self, prefix, value):
+        node = self.root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node.setdefault(self.VALUES, []).append(value)
+
+    def match(self, path):
+        """Return the values of all the prefixes of ``path``."""
+        matches = []
+        node = self.root
+        matches.extend(node.get(self.VALUES, ()))
+        for char in path:
+            node = node.get(char)
+            if node is None:
+                break
+            matches.extend(node.get(self.VALUES, ()))
+        return matches
+
+
+class RedirectMatcher(object):
+
+    """Compiled redirects of a project."""
+
+    def __init__(self, redirects=()):
+        self.prefix = PrefixTrie()
+        self.rest = PrefixTrie()
+        self.page = {}
+        self.exact = {}
+        self.sphinx_html = None
+        self.sphinx_htmldir = None
+        for index, redirect in enumerate(redirects):
+            self.add(index, redirect)
+
+    def __bool__(self):
+        return bool(
+            self.prefix or self.rest or self.page or self.exact or
+            self.sphinx_html is not None or self.sphinx_htmldir is not None
+        )
+
+    __nonzero__ = __bool__
+
+    def add(self, index, redirect):
+        """Compile ``redirect``, ``index`` is its priority."""
+        redirect_type = redirect.redirect_type
+        entry = (index, redirect_type, redirect.from_url, redirect.to_url)
+        if redirect_type == 'prefix':
+            self.prefix.add(redirect.from_url, entry)
+        elif redirect_type == 'page':
+            self.page.setdefault(redirect.from_url, []).append(entry)
+        elif redirect_type == 'exact':
+            self.exact.setdefault(redirect.from_url, []).append(entry)
+            if REST_MARKER in redirect.from_url:
+                self.rest.add(redirect.from_url.split(REST_MARKER)[0], entry)
+        elif redirect_type == 'sphinx_html':
+            if self.sphinx_html is None:
+                self.sphinx_html = entry
+        elif redirect_type == 'sphinx_htmldir':
+            if self.sphinx_htmldir is None:
+                self.sphinx_htmldir = entry
+        else:
+            log.warning('Unknown redirect type: %s', redirect_type)
+
+    def get_candidates(self, path, full_path=None):
+        """
+        Return the redirects that may match ``path``, by priority.
+
+        :param full_path: path including language and version, used by the
+            ``exact`` redirects
+        """
+        candidates = set(self.prefix.match(path))
+        candidates.update(self.page.get(path, ()))
+        candidates.update(self.exact.get(full_path or path, ()))
+        candidates.update(self.rest.match(path))
+        if self.sphinx_html is not None and path.endswith(SPHINX_HTML_ENDINGS):
+            candidates.add(self.sphinx_html)
+        if self.sphinx_htmldir is not None and path.endswith('.html'):
+            candidates.add(self.sphinx_htmldir)
+        return sorted(candidates)
+
+    def get_redirect_path(self, get_project, path, language=None,
+                          version_slug=None):
+        """
+        Return the path ``path`` redirects to, or ``None``.
+
+        :param get_project: callable returning the project, it's only called
+            when a redirect needs to resolve a path
+        """
+        if not self:
+            return None
+
+        full_path = None
+        if self.exact and language and version_slug:
+            # reconstruct the full path for an exact redirect
+            full_path = get_full_path(get_project(), path, language, version_slug)
+
+        for entry in self.get_candidates(path, full_path):
+            new_path = self.apply(
+                entry, get_project, path, full_path, language, version_slug)
+            if new_path:
+                return new_path
+        return None
+
+    def apply(self, entry, get_project, path, full_path, language, version_slug):  # noqa
+        """Return the new path of a candidate redirect."""
+        _, redirect_type, from_url, to_url = entry
+        log.debug('Redirecting %s: %s -> %s', redirect_type, from_url, to_url)
+        if redirect_type == 'prefix':
+            return get_full_path(
+                get_project(), path[len(from_url):], language, version_slug)
+        if redirect_type == 'page':
+            return get_full_path(
+                get_project(), to_url.lstrip('/'), language, version_slug)
+        if redirect_type == 'exact':
+            if (full_path or path) == from_url:
+                return to_url
+            # Handle full sub-level redirects
+            match = from_url.split(REST_MARKER)[0]
+            return to_url + path[len(match):]
+        # Strip leading slash.
+        filename = path[1:]
+        if redirect_type == 'sphinx_html':
+            for ending in SPHINX_HTML_ENDINGS:
+                if path.endswith(ending):
+                    if filename.endswith(ending):
+                        filename = filename[:-len(ending)] + '.html'
+                    return get_full_path(
+                        get_project(), filename, language, version_slug)
+        if redirect_type == 'sphinx_htmldir':
+            return get_full_path(
+                get_project(), filename[:-len('.html')] + '/', language,
+                version_slug)
+        return None
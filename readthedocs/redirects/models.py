@@ -9,9 +9,9 @@ from django.utils.translation import ugettext_lazy as _
 import logging
 import re
 
-from readthedocs.core.resolver import resolve_path
 from readthedocs.projects.models import Project
 from .managers import RedirectManager
+from .matcher import get_full_path
 
 
 log = logging.getLogger(__name__)
@@ -110,14 +110,9 @@ class Redirect(models.Model):
         This will include version and language information. No protocol/domain
         is returned.
         """
-        # Handle explicit http redirects
-        if re.match('^https?://', filename):
-            return filename
-
-        return resolve_path(
-            project=self.project, language=language,
-            version_slug=version_slug, filename=filename
-        )
+        return get_full_path(
+            self.project, filename, language=language,
+            version_slug=version_slug)
 
     def get_redirect_path(self, path, language=None, version_slug=None):
         method = getattr(self, 'redirect_{type}'.format(
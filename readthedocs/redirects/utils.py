@@ -6,11 +6,19 @@ with it in the database, and generating a redirect response.
 
 These are not used directly as views; they are instead included into 404
 handlers, so that redirects only take effect if no other view matches.
+
+The redirects of each project are compiled in a
+:py:class:`~readthedocs.redirects.matcher.RedirectMatcher` and cached, in the
+Django cache and for a few seconds in the process memory, so a 404 doesn't
+query the database unless a redirect matches.
 """
 from __future__ import absolute_import
+from django.conf import settings
+from django.core.cache import cache
 from django.http import HttpResponseRedirect
 import logging
 import re
+import time
 
 from readthedocs.constants import LANGUAGES_REGEX
 from readthedocs.projects.models import Project
@@ -18,17 +26,80 @@ from readthedocs.projects.models import Project
 
 log = logging.getLogger(__name__)
 
+REDIRECTS_CACHE_KEY = 'redirects:project:{slug}'
+
+# Process memory copy of the compiled redirects: slug -> (expiry, data)
+_local_redirects = {}
+LOCAL_REDIRECTS_MAX_SIZE = 1000
+
+
+def get_redirects_cache_timeout():
+    return getattr(settings, 'REDIRECTS_CACHE_TIMEOUT', 60 * 60)
+
+
+def get_redirects_local_cache_timeout():
+    return getattr(settings, 'REDIRECTS_LOCAL_CACHE_TIMEOUT', 10)
+
+
+def build_project_redirects(project_slug):
+    """Load and compile the redirects of a project."""
+    try:
+        project = Project.objects.get(slug=project_slug)
+    except Project.DoesNotExist:
+        return {}
+    return {
+        'project_pk': project.pk,
+        'single_version': project.single_version,
+        'matcher': project.redirects.get_matcher(),
+    }
+
+
+def get_project_redirects(project_slug):
+    """
+    Return the compiled redirects of a project.
+
+    This is a dict with the project primary key, its ``single_version`` flag
+    and the matcher. Unknown projects are cached as an empty dict.
+    """
+    now = time.time()
+    local = _local_redirects.get(project_slug)
+    if local is not None and local[0] > now:
+        return local[1]
+
+    key = REDIRECTS_CACHE_KEY.format(slug=project_slug)
+    data = cache.get(key)
+    if data is None:
+        data = build_project_redirects(project_slug)
+        cache.set(key, data, get_redirects_cache_timeout())
+
+    local_timeout = get_redirects_local_cache_timeout()
+    if local_timeout:
+        if len(_local_redirects) >= LOCAL_REDIRECTS_MAX_SIZE:
+            _local_redirects.clear()
+        _local_redirects[project_slug] = (now + local_timeout, data)
+    return data
+
+
+def invalidate_redirects_cache(project_slugs):
+    """
+    Drop the compiled redirects of the given projects.
 
-def project_and_path_from_request(request, path):
+    Other processes may keep using their memory copy for up to
+    ``REDIRECTS_LOCAL_CACHE_TIMEOUT`` seconds.
     """
-    Parse the project from a request path.
+    cache.delete_many([
+        REDIRECTS_CACHE_KEY.format(slug=slug) for slug in project_slugs
+    ])
+    for slug in project_slugs:
+        _local_redirects.pop(slug, None)
 
-    Return a tuple (project, path) where `project` is a projects.Project if
-    a matching project exists, and `path` is the unmatched remainder of the
-    path.
 
-    If the path does not match, or no matching project is found, then `project`
-    will be ``None``.
+def project_slug_and_path_from_request(request, path):
+    """
+    Parse the project slug from a request path.
+
+    Return a tuple (project_slug, path), `project_slug` is ``None`` if the
+    path does not match.
     """
     if hasattr(request, 'slug'):
         project_slug = request.slug
@@ -45,12 +116,7 @@ def project_and_path_from_request(request, path):
             return None, path
     else:
         return None, path
-
-    try:
-        project = Project.objects.get(slug=project_slug)
-    except Project.DoesNotExist:
-        return None, path
-    return project, path
+    return project_slug, path
 
 
 def language_and_version_from_path(path):
@@ -66,17 +132,29 @@ def language_and_version_from_path(path):
 
 
 def get_redirect_response(request, path):
-    project, path = project_and_path_from_request(request, path)
-    if not project:
+    project_slug, path = project_slug_and_path_from_request(request, path)
+    if not project_slug:
+        return None
+
+    redirects = get_project_redirects(project_slug)
+    if not redirects or not redirects['matcher']:
         return None
 
     language = None
     version_slug = None
-    if not project.single_version:
+    if not redirects['single_version']:
         language, version_slug, path = language_and_version_from_path(path)
 
-    new_path = project.redirects.get_redirect_path(
-        path=path, language=language, version_slug=version_slug)
+    projects = []
+
+    def get_project():
+        # Only loaded when a redirect needs to resolve a path
+        if not projects:
+            projects.append(Project.objects.get(pk=redirects['project_pk']))
+        return projects[0]
+
+    new_path = redirects['matcher'].get_redirect_path(
+        get_project, path=path, language=language, version_slug=version_slug)
 
     if new_path is None:
         return None
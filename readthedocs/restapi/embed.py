@@ -0,0 +1,165 @@
+"""
+Sections of the documentation pages, served by the embed API.
+
+The sections of each page are stored in the cache when the page is indexed,
+see :py:func:`readthedocs.restapi.utils.index_search_request`, one entry per
+project, version and page. Pages missing from the cache are parsed again
+from the JSON output of the build.
+
+The entries of a version carry a generation in their key, a full reindex of
+the version bumps it so the pages gone since the previous build disappear.
+
+Django settings that can be defined:
+
+    `EMBED_CACHE_TIMEOUT`: seconds the sections of a page are cached
+"""
+
+from __future__ import absolute_import
+
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.encoding import force_bytes
+from django.utils.text import slugify
+
+from readthedocs.core.utils import incr_cache_generation
+from readthedocs.search.parse_json import IGNORED_JSON_FILES, process_file
+
+SECTIONS_CACHE_KEY = 'embed:{project}:{version}:{generation}:{page}'
+SECTIONS_GENERATION_KEY = 'embed:{project}:{version}:generation'
+
+
+def get_sections_cache_timeout():
+    return getattr(settings, 'EMBED_CACHE_TIMEOUT', 60 * 60 * 24 * 7)
+
+
+def get_sections_generation(project_slug, version_slug):
+    """Generation of the cached sections of a version"""
+    return cache.get(
+        SECTIONS_GENERATION_KEY.format(
+            project=project_slug, version=version_slug),
+        0,
+    )
+
+
+def invalidate_sections(project_slug, version_slug):
+    """Make all the cached sections of a version stale"""
+    incr_cache_generation(SECTIONS_GENERATION_KEY.format(
+        project=project_slug, version=version_slug))
+
+
+def get_sections_cache_key(project_slug, version_slug, page, generation=None):
+    if generation is None:
+        generation = get_sections_generation(project_slug, version_slug)
+    return SECTIONS_CACHE_KEY.format(
+        project=project_slug,
+        version=version_slug,
+        generation=generation,
+        # Page paths can be longer than the cache keys allow
+        page=hashlib.md5(force_bytes(page)).hexdigest(),
+    )
+
+
+def get_page_sections(page):
+    """Return what's stored for a page parsed by ``process_file``."""
+    return {
+        'title': page['title'],
+        'sections': [
+            {
+                'id': section['id'],
+                'title': section['title'],
+                'content': section['content'],
+            }
+            for section in page['sections']
+        ],
+    }
+
+
+def store_sections(project_slug, version_slug, pages):
+    """
+    Cache the sections of ``pages``, parsed by ``process_file``.
+
+    Pages without sections, e.g. sent through the API, are left to be parsed
+    on the first request.
+    """
+    generation = get_sections_generation(project_slug, version_slug)
+    cache.set_many(
+        dict(
+            (
+                get_sections_cache_key(
+                    project_slug, version_slug, page['path'], generation),
+                get_page_sections(page),
+            )
+            for page in pages
+            if 'sections' in page
+        ),
+        get_sections_cache_timeout(),
+    )
+
+
+def delete_sections(project_slug, version_slug, paths):
+    generation = get_sections_generation(project_slug, version_slug)
+    cache.delete_many([
+        get_sections_cache_key(project_slug, version_slug, path, generation)
+        for path in paths
+    ])
+
+
+def get_json_filename(version, page):
+    """
+    Return the JSON output of ``page``, or ``None`` if it's not a page.
+
+    ``page`` comes from the request, it can't point outside of the output of
+    the version.
+    """
+    json_path = os.path.realpath(version.project.get_production_media_path(
+        type_='json', version_slug=version.slug, include_file=False))
+    filename = os.path.realpath(
+        os.path.join(json_path, '{0}.fjson'.format(page)))
+    if not filename.startswith(json_path + os.sep):
+        return None
+    if os.path.basename(filename) in IGNORED_JSON_FILES:
+        return None
+    return filename
+
+
+def get_sections(version, page):
+    """
+    Return the title and the sections of a page of ``version``.
+
+    :returns: a dict with the ``title`` of the page and its ``sections``, or
+        ``None`` if the page doesn't exist
+    """
+    project_slug = version.project.slug
+    key = get_sections_cache_key(project_slug, version.slug, page)
+    data = cache.get(key)
+    if data is not None:
+        return data
+
+    filename = get_json_filename(version, page)
+    if filename is None or not os.path.exists(filename):
+        return None
+    processed = process_file(filename)
+    if processed is None:
+        return None
+    data = get_page_sections(processed)
+    cache.set(key, data, get_sections_cache_timeout())
+    return data
+
+
+def find_section(sections, section):
+    """
+    Return the section matching ``section``, or ``None``.
+
+    ``section`` is either the id of the section or its title.
+    """
+    section_id = slugify(section)
+    for candidate in sections:
+        if candidate['id'] in (section, section_id):
+            return candidate
+    for candidate in sections:
+        if candidate['title'] == section:
+            return candidate
+    return None
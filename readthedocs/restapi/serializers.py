@@ -92,7 +92,7 @@ class BuildCommandSerializer(serializers.ModelSerializer):
 
     class Meta(object):
         model = BuildCommandResult
-        exclude = ('')
+        exclude = ('output_compressed',)
 
 
 class BuildSerializer(serializers.ModelSerializer):
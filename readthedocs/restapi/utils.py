@@ -6,61 +6,123 @@ from __future__ import (
 
 import hashlib
 import logging
+from collections import OrderedDict
 
+from django.conf import settings
+from django.contrib.auth.models import Permission
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Case, Value, When
+from django.utils.encoding import force_text
+from guardian.models import UserObjectPermission
 from rest_framework.pagination import PageNumberPagination
 
 from readthedocs.builds.constants import NON_REPOSITORY_VERSIONS
 from readthedocs.builds.models import Version
+from readthedocs.core.utils import chunks
+from readthedocs.restapi.embed import (
+    delete_sections, invalidate_sections, store_sections)
+from readthedocs.search.cache import invalidate_search_cache
 from readthedocs.search.indexes import PageIndex, ProjectIndex, SectionIndex
 
 log = logging.getLogger(__name__)
 
+SYNC_VERSIONS_CHUNK_SIZE = 500
+
 
 def sync_versions(project, versions, type):  # pylint: disable=redefined-builtin
-    """Update the database with the current versions from the repository."""
+    """
+    Update the database with the current versions from the repository.
+
+    Changes are computed in memory and applied in bulk: one query updates the
+    changed identifiers, new versions are created together with unique slugs
+    allocated against the slugs already in use.
+
+    :returns: the slugs of the added versions
+    """
     old_versions = {}
     old_version_values = project.versions.filter(type=type).values(
         'identifier', 'verbose_name')
     for version in old_version_values:
         old_versions[version['verbose_name']] = version['identifier']
 
-    added = set()
-    # Add new versions
+    updated = {}
+    new_versions = OrderedDict()
     for version in versions:
         version_id = version['identifier']
         version_name = version['verbose_name']
         if version_name in old_versions:
-            if version_id == old_versions[version_name]:
-                # Version is correct
-                continue
-            else:
-                # Update slug with new identifier
-                Version.objects.filter(
-                    project=project, verbose_name=version_name).update(
-                        identifier=version_id,
-                        type=type,
-                        machine=False,
-                    )  # noqa
-
-                log.info(
-                    '(Sync Versions) Updated Version: [%s=%s] ',
-                    version['verbose_name'],
-                    version['identifier'],
-                )
-        else:
-            # New Version
-            created_version = Version.objects.create(
-                project=project,
+            if version_id != old_versions[version_name]:
+                updated[version_name] = version_id
+        elif version_name not in new_versions:
+            new_versions[version_name] = version_id
+
+    for names in chunks(sorted(updated), SYNC_VERSIONS_CHUNK_SIZE):
+        # Update slug with new identifier
+        Version.objects.filter(
+            project=project, verbose_name__in=names).update(
+                identifier=Case(*[
+                    When(verbose_name=name, then=Value(updated[name]))
+                    for name in names
+                ]),
                 type=type,
-                identifier=version['identifier'],
-                verbose_name=version['verbose_name'],
+                machine=False,
+            )
+        for name in names:
+            log.info(
+                '(Sync Versions) Updated Version: [%s=%s] ',
+                name,
+                updated[name],
             )
-            added.add(created_version.slug)
-    if added:
+
+    added = set()
+    if new_versions:
+        slug_field = Version._meta.get_field('slug')
+        taken = set(Version.objects.filter(project=project).values_list(
+            'slug', flat=True))
+        created = []
+        for version_name, version_id in new_versions.items():
+            slug = slug_field.uniquify(version_name, taken.__contains__)
+            taken.add(slug)
+            created.append(Version(
+                project=project,
+                type=type,
+                identifier=version_id,
+                verbose_name=version_name,
+                slug=slug,
+            ))
+        Version.objects.bulk_create(created, batch_size=SYNC_VERSIONS_CHUNK_SIZE)
+        added = set(version.slug for version in created)
+        assign_version_permissions(project, added)
         log.info('(Sync Versions) Added Versions: [%s] ', ' '.join(added))
     return added
 
 
+def assign_version_permissions(project, slugs):
+    """
+    Give the owners of ``project`` the view permission on versions ``slugs``.
+
+    This is what ``Version.save`` does for a single version.
+    """
+    owners = list(project.users.all())
+    if not owners:
+        return
+    content_type = ContentType.objects.get_for_model(Version)
+    permission = Permission.objects.get(
+        content_type=content_type, codename='view_version')
+    version_pks = Version.objects.filter(
+        project=project, slug__in=slugs).values_list('pk', flat=True)
+    UserObjectPermission.objects.bulk_create([
+        UserObjectPermission(
+            user=owner,
+            permission=permission,
+            content_type=content_type,
+            object_pk=force_text(pk),
+        )
+        for pk in version_pks
+        for owner in owners
+    ], batch_size=SYNC_VERSIONS_CHUNK_SIZE)
+
+
 def delete_versions(project, version_data):
     """Delete all versions not in the current repo."""
     current_versions = []
@@ -76,22 +138,36 @@ def delete_versions(project, version_data):
     to_delete_qs = to_delete_qs.exclude(active=True)
     to_delete_qs = to_delete_qs.exclude(slug__in=NON_REPOSITORY_VERSIONS)
 
-    if to_delete_qs.count():
-        ret_val = {obj.slug for obj in to_delete_qs}
+    ret_val = set(to_delete_qs.values_list('slug', flat=True))
+    if ret_val:
         log.info('(Sync Versions) Deleted Versions: [%s]', ' '.join(ret_val))
+        # The versions are deleted in one go, related rows are collected
+        # for all of them together
         to_delete_qs.delete()
-        return ret_val
-    return set()
+    return ret_val
+
+
+def get_page_id(project_slug, version_slug, path):
+    """Return the id of the page at ``path`` in the search index."""
+    to_hash = '-'.join([project_slug, version_slug, path])
+    return hashlib.md5(to_hash.encode('utf-8')).hexdigest()
 
 
 def index_search_request(
         version, page_list, commit, project_scale, page_scale, section=True,
-        delete=True):
+        delete=True, delete_pages=None, index=None):
     """
     Update search indexes with build output JSON.
 
     In order to keep sub-projects all indexed on the same shard, indexes will be
     updated using the parent project's slug as the routing value.
+
+    ``delete_pages`` is a list of page paths to remove from the index by id,
+    ``delete`` removes instead every page of the version not indexed with
+    ``commit``.
+
+    ``index`` is the name of the index to update, the live one by default.
+    Returns the number of pages indexed.
     """
     # TODO refactor this function
     # pylint: disable=too-many-locals
@@ -103,15 +179,11 @@ def index_search_request(
     else:
         publisher_name, publisher_project_slug = None, None
 
-    log_msg = ' '.join([page['path'] for page in page_list])
-    log.info(
-        'Updating search index: project=%s pages=[%s]',
-        project.slug,
-        log_msg,
-    )
+    log.info('Updating search index: project=%s', project.slug)
 
     project_obj = ProjectIndex()
     project_obj.index_document(
+        index=index,
         data={
             'id': project.pk,
             'name': project.name,
@@ -126,57 +198,91 @@ def index_search_request(
             'publisher': publisher_name,
         })
 
+    if delete and not delete_pages:
+        # Sections of the pages gone since the previous build are dropped
+        invalidate_sections(project.slug, version.slug)
+
+    # Links to the search results are built from it, see
+    # readthedocs.search.lib.add_result_links
+    base_url = project.get_docs_url(version_slug=version.slug)
     page_obj = PageIndex()
     section_obj = SectionIndex()
-    index_list = []
-    section_index_list = []
     routes = [project.slug]
     routes.extend([p.parent.slug for p in project.superprojects.all()])
-    for page in page_list:
-        log.debug('Indexing page: %s:%s', project.slug, page['path'])
-        to_hash = '-'.join([project.slug, version.slug, page['path']])
-        page_id = hashlib.md5(to_hash.encode('utf-8')).hexdigest()
-        index_list.append({
-            'id': page_id,
-            'project': project.slug,
-            'project_id': project.pk,
-            'version': version.slug,
-            'path': page['path'],
-            'title': page['title'],
-            'headers': page['headers'],
-            'content': page['content'],
-            'taxonomy': None,
-            'commit': commit,
-            'weight': page_scale + project_scale,
-            'progetto': publisher_project_slug,
-            'publisher': publisher_name,
-        })
-        if section:
-            for sect in page['sections']:
-                id_to_hash = '-'.join([
-                    project.slug,
-                    version.slug,
-                    page['path'],
-                    sect['id'],
-                ])
-                section_index_list.append({
-                    'id': (hashlib.md5(id_to_hash.encode('utf-8')).hexdigest()),
-                    'project': project.slug,
-                    'version': version.slug,
-                    'path': page['path'],
-                    'page_id': sect['id'],
-                    'title': sect['title'],
-                    'content': sect['content'],
-                    'weight': page_scale,
-                })
-            for route in routes:
+    chunk_size = getattr(settings, 'SEARCH_INDEX_CHUNK_SIZE', 500)
+    indexed = 0
+    # ``page_list`` may be a generator: pages are consumed and sent to
+    # Elasticsearch in bounded chunks to keep memory usage flat
+    for pages in chunks(page_list, chunk_size):
+        index_list = []
+        section_index_list = []
+        for page in pages:
+            log.debug('Indexing page: %s:%s', project.slug, page['path'])
+            page_id = get_page_id(project.slug, version.slug, page['path'])
+            index_list.append({
+                'id': page_id,
+                'project': project.slug,
+                'project_id': project.pk,
+                'version': version.slug,
+                'path': page['path'],
+                'title': page['title'],
+                'headers': page['headers'],
+                'content': page['content'],
+                'taxonomy': None,
+                'commit': commit,
+                'weight': page_scale + project_scale,
+                'progetto': publisher_project_slug,
+                'publisher': publisher_name,
+                'base_url': base_url,
+            })
+            if section:
+                for sect in page['sections']:
+                    id_to_hash = '-'.join([
+                        project.slug,
+                        version.slug,
+                        page['path'],
+                        sect['id'],
+                    ])
+                    section_index_list.append({
+                        'id': (hashlib.md5(id_to_hash.encode('utf-8')).hexdigest()),
+                        'project': project.slug,
+                        'version': version.slug,
+                        'path': page['path'],
+                        'page_id': sect['id'],
+                        'title': sect['title'],
+                        'content': sect['content'],
+                        'weight': page_scale,
+                    })
+
+        for route in routes:
+            if section_index_list:
                 section_obj.bulk_index(
-                    section_index_list,
-                    routing=route,
-                )
+                    section_index_list, index=index, routing=route)
+            page_obj.bulk_index(index_list, index=index, routing=route)
+        indexed += len(index_list)
+        store_sections(project.slug, version.slug, pages)
 
-    for route in routes:
-        page_obj.bulk_index(index_list, routing=route)
+    log.info(
+        'Updated search index: project=%s version=%s pages=%s',
+        project.slug,
+        version.slug,
+        indexed,
+    )
+
+    if delete_pages:
+        log.info(
+            'Deleting pages from search index: project=%s version=%s pages=%s',
+            project.slug,
+            version.slug,
+            len(delete_pages),
+        )
+        page_ids = [
+            get_page_id(project.slug, version.slug, path)
+            for path in delete_pages
+        ]
+        for route in routes:
+            page_obj.bulk_delete(page_ids, index=index, routing=route)
+        delete_sections(project.slug, version.slug, delete_pages)
 
     if delete:
         log.info('Deleting files not in commit: %s', commit)
@@ -204,7 +310,13 @@ def index_search_request(
                 },
             },
         }
-        page_obj.delete_document(body=delete_query)
+        page_obj.delete_document(body=delete_query, index=index)
+
+    if index is None:
+        # A full reindex invalidates everything once the new index is live
+        invalidate_search_cache(project.slug)
+
+    return indexed
 
 
 class RemoteOrganizationPagination(PageNumberPagination):
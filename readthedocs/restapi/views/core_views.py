@@ -6,11 +6,6 @@ from rest_framework import decorators, permissions, status
 from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 
-import json
-import requests
-
-from django.conf import settings
-from django.core.cache import cache
 from django.shortcuts import get_object_or_404
 
 from readthedocs.core.utils import clean_url, cname_to_slug
@@ -18,6 +13,7 @@ from readthedocs.builds.constants import LATEST
 from readthedocs.builds.models import Version
 from readthedocs.projects.models import Project
 from readthedocs.core.templatetags.core_tags import make_document_url
+from readthedocs.restapi.embed import find_section, get_sections
 
 
 @decorators.api_view(['GET'])
@@ -81,7 +77,8 @@ def embed(request):
     """
     Embed a section of content from any Read the Docs page.
 
-    Returns headers and content that matches the queried section.
+    Returns headers and content that matches the queried section. Sections
+    are stored when pages are indexed, see :py:mod:`readthedocs.restapi.embed`.
 
     ### Arguments
 
@@ -104,18 +101,33 @@ def embed(request):
     if project is None or doc is None:
         return Response({'error': 'Need project and doc'}, status=status.HTTP_400_BAD_REQUEST)
 
-    embed_cache = cache.get('embed:%s' % project)
-    if embed_cache:
-        embed = json.loads(embed_cache)
+    project = get_object_or_404(Project, slug=project)
+    version = get_object_or_404(
+        Version.objects.public(request.user, project=project, only_active=False),
+        slug=version)
+
+    page = get_sections(version, doc)
+    if page is None:
+        return Response({'error': 'Doc not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    sections = page['sections']
+    if section:
+        match = find_section(sections, section)
+        if match is None:
+            return Response(
+                {'error': 'Section not found'}, status=status.HTTP_404_NOT_FOUND)
+        content = [match['content']]
     else:
-        try:
-            resp = requests.get(
-                '{host}/api/v1/embed/'.format(host=settings.GROK_API_HOST),
-                params={'project': project, 'version': version, 'doc': doc, 'section': section}
-            )
-            embed = resp.json()
-            cache.set('embed:%s' % project, resp.content, 1800)
-        except Exception as e:
-            return Response({'error': '%s' % e.msg}, status=status.HTTP_400_BAD_REQUEST)
-
-    return Response(embed)
+        content = [sect['content'] for sect in sections]
+
+    return Response({
+        'content': content,
+        'headers': [{sect['title']: '#%s' % sect['id']} for sect in sections],
+        'url': make_document_url(project=project, version=version.slug, page=doc),
+        'meta': {
+            'project': project.slug,
+            'version': version.slug,
+            'doc': doc,
+            'section': section,
+        },
+    })
@@ -4,10 +4,14 @@
 from __future__ import (
     absolute_import, division, print_function, unicode_literals)
 
+import hashlib
+
 import six
 from django.conf import settings
+from django.core.cache import cache
 from django.shortcuts import get_object_or_404
 from django.template import loader as template_loader
+from django.utils.html import escape
 from rest_framework import decorators, permissions
 from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
@@ -15,6 +19,7 @@ from rest_framework_jsonp.renderers import JSONPRenderer
 
 from readthedocs.builds.constants import LATEST, TAG
 from readthedocs.builds.models import Version
+from readthedocs.core.utils import incr_cache_generation
 from readthedocs.projects.models import Project
 from readthedocs.projects.version_handling import (
     highest_version, parse_version_failsafe)
@@ -60,11 +65,83 @@ def get_version_compare_data(project, base_version=None):
     return ret_val
 
 
+FOOTER_CACHE_KEY = 'footer:{generation}:{project}:{version}:{params}'
+FOOTER_GENERATION_KEY = 'footer:generation:{project}'
+
+# Page specific values are rendered as these placeholders in the cached
+# footer and replaced on every request
+FOOTER_PATH_PLACEHOLDER = '__rtd_footer_path__'
+FOOTER_PAGE_PLACEHOLDER = '__rtd_footer_page__'
+
+
+def get_footer_cache_timeout():
+    return getattr(settings, 'FOOTER_CACHE_TIMEOUT', 60 * 60)
+
+
+def invalidate_footer_cache(project_slugs):
+    """
+    Drop the cached footers of the given projects.
+
+    Footers are cached under a per-project generation number, bumping it
+    makes all the footers of the project stale at once.
+    """
+    for project_slug in project_slugs:
+        incr_cache_generation(
+            FOOTER_GENERATION_KEY.format(project=project_slug))
+
+
+def get_footer_cache_key(project_slug, version_slug, **params):
+    """Cache key of the footer of a version rendered with ``params``."""
+    generation = cache.get(
+        FOOTER_GENERATION_KEY.format(project=project_slug), 0)
+    return FOOTER_CACHE_KEY.format(
+        generation=generation,
+        project=project_slug,
+        version=version_slug.lower(),
+        params=hashlib.md5(
+            repr(sorted(params.items())).encode('utf-8')
+        ).hexdigest(),
+    )
+
+
+def get_footer_path(documentation_type, page_slug):
+    """Return the path of ``page_slug`` relative to the version root."""
+    if page_slug and page_slug != 'index':
+        if (documentation_type == 'sphinx_htmldir' or
+                documentation_type == 'mkdocs'):
+            path = page_slug + '/'
+        elif documentation_type == 'sphinx_singlehtml':
+            path = 'index.html#document-' + page_slug
+        else:
+            path = page_slug + '.html'
+    else:
+        path = ''
+    return path
+
+
+def render_cached_footer(cached, page_slug):
+    """Fill the page specific parts of a cached footer payload."""
+    path = get_footer_path(cached['documentation_type'], page_slug)
+    resp_data = dict(cached['resp_data'])
+    resp_data['html'] = resp_data['html'].replace(
+        FOOTER_PATH_PLACEHOLDER, escape(path),
+    ).replace(
+        FOOTER_PAGE_PLACEHOLDER, escape(six.text_type(page_slug)),
+    )
+    return resp_data
+
+
 @decorators.api_view(['GET'])
 @decorators.permission_classes((permissions.AllowAny,))
 @decorators.renderer_classes((JSONRenderer, JSONPRenderer))
 def footer_html(request):
-    """Render and return footer markup."""
+    """
+    Render and return footer markup.
+
+    Footers of anonymous requests are cached per project, version and
+    rendering options with placeholders in place of the page specific
+    links, so a cache hit costs no queries and no template rendering.
+    """
     # TODO refactor this function
     # pylint: disable=too-many-locals
     project_slug = request.GET.get('project', None)
@@ -79,6 +156,20 @@ def footer_html(request):
     if version_slug == '':
         version_slug = LATEST
 
+    # Users may see private versions and signal receivers expect the full
+    # rendering context, only cache what is the same for everybody
+    cache_key = None
+    if (project_slug and version_slug and
+            not request.user.is_authenticated() and
+            not footer_response.has_listeners()):
+        cache_key = get_footer_cache_key(
+            project_slug, version_slug, theme=theme, docroot=docroot,
+            subproject=subproject, source_suffix=source_suffix,
+        )
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return Response(render_cached_footer(cached, page_slug))
+
     new_theme = (theme == 'sphinx_rtd_theme')
     using_theme = (theme == 'default')
     project = get_object_or_404(Project, slug=project_slug)
@@ -88,16 +179,13 @@ def footer_html(request):
         slug__iexact=version_slug)
     main_project = project.main_language_project or project
 
-    if page_slug and page_slug != 'index':
-        if (main_project.documentation_type == 'sphinx_htmldir' or
-                main_project.documentation_type == 'mkdocs'):
-            path = page_slug + '/'
-        elif main_project.documentation_type == 'sphinx_singlehtml':
-            path = 'index.html#document-' + page_slug
-        else:
-            path = page_slug + '.html'
+    if cache_key is not None:
+        # Render the footer once with placeholders and fill them
+        path = FOOTER_PATH_PLACEHOLDER
+        vcs_page_slug = FOOTER_PAGE_PLACEHOLDER
     else:
-        path = ''
+        path = get_footer_path(main_project.documentation_type, page_slug)
+        vcs_page_slug = page_slug
 
     version_compare_data = get_version_compare_data(project, version)
 
@@ -117,31 +205,31 @@ def footer_html(request):
         'subproject': subproject,
         'github_edit_url': version.get_github_url(
             docroot,
-            page_slug,
+            vcs_page_slug,
             source_suffix,
             'edit',
         ),
         'github_view_url': version.get_github_url(
             docroot,
-            page_slug,
+            vcs_page_slug,
             source_suffix,
             'view',
         ),
         'gitlab_edit_url': version.get_gitlab_url(
             docroot,
-            page_slug,
+            vcs_page_slug,
             source_suffix,
             'edit',
         ),
         'gitlab_view_url': version.get_gitlab_url(
             docroot,
-            page_slug,
+            vcs_page_slug,
             source_suffix,
             'view',
         ),
         'bitbucket_url': version.get_bitbucket_url(
             docroot,
-            page_slug,
+            vcs_page_slug,
             source_suffix,
         ),
         'theme': theme,
@@ -158,6 +246,14 @@ def footer_html(request):
         'version_supported': version.supported,
     }
 
+    if cache_key is not None:
+        cached = {
+            'documentation_type': main_project.documentation_type,
+            'resp_data': resp_data,
+        }
+        cache.set(cache_key, cached, get_footer_cache_timeout())
+        return Response(render_cached_footer(cached, page_slug))
+
     # Allow folks to hook onto the footer response for various information
     # collection, or to modify the resp_data.
     footer_response.send(
@@ -7,6 +7,9 @@ from __future__ import (
 import logging
 
 from allauth.socialaccount.models import SocialAccount
+from django.db import transaction
+from django.db.models import TextField, Value
+from django.db.models.functions import Concat
 from django.shortcuts import get_object_or_404
 from rest_framework import decorators, permissions, status, viewsets
 from rest_framework.decorators import detail_route
@@ -15,7 +18,8 @@ from rest_framework.response import Response
 
 from readthedocs.builds.constants import BRANCH, TAG
 from readthedocs.builds.models import Build, BuildCommandResult, Version
-from readthedocs.core.utils import trigger_build
+from readthedocs.builds.signals import versions_synced
+from readthedocs.core.utils import broadcast, trigger_build
 from readthedocs.core.utils.extend import SettingsOverrideObject
 from readthedocs.oauth.models import RemoteOrganization, RemoteRepository
 from readthedocs.oauth.services import GitHubService, registry
@@ -150,6 +154,7 @@ class ProjectViewSet(UserSelectViewSet):
 
         :returns: the identifiers for the versions that have been deleted.
         """
+        from readthedocs.projects import tasks
         project = self.get_project_for_user_or_404(
             kwargs[self.lookup_field])
 
@@ -165,15 +170,24 @@ class ProjectViewSet(UserSelectViewSet):
             # Update All Versions
             data = request.data
             added_versions = set()
-            if 'tags' in data:
-                ret_set = api_utils.sync_versions(
-                    project=project, versions=data['tags'], type=TAG)
-                added_versions.update(ret_set)
-            if 'branches' in data:
-                ret_set = api_utils.sync_versions(
-                    project=project, versions=data['branches'], type=BRANCH)
-                added_versions.update(ret_set)
-            deleted_versions = api_utils.delete_versions(project, data)
+            with transaction.atomic():
+                if 'tags' in data:
+                    ret_set = api_utils.sync_versions(
+                        project=project, versions=data['tags'], type=TAG)
+                    added_versions.update(ret_set)
+                if 'branches' in data:
+                    ret_set = api_utils.sync_versions(
+                        project=project, versions=data['branches'], type=BRANCH)
+                    added_versions.update(ret_set)
+                deleted_versions = api_utils.delete_versions(project, data)
+                if added_versions:
+                    # Done by ``Version.save`` when versions are created
+                    # one by one
+                    project.sync_supported_versions()
+            if added_versions:
+                broadcast(
+                    type='app', task=tasks.symlink_project, args=[project.pk])
+            versions_synced.send(sender=Project, project=project)
         except Exception as e:
             log.exception('Sync Versions Error')
             return Response(
@@ -237,6 +251,18 @@ class BuildCommandViewSet(UserSelectViewSet):
     serializer_class = BuildCommandSerializer
     model = BuildCommandResult
 
+    @detail_route(methods=['post'])
+    def append(self, request, **kwargs):
+        """Append output to a command still running on a builder."""
+        command = self.get_object()
+        output = request.data.get('output')
+        if output:
+            BuildCommandResult.objects.filter(pk=command.pk).update(
+                output=Concat(
+                    'output', Value(output), output_field=TextField()),
+            )
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
 
 class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = (permissions.IsAuthenticated, RelatedProjectIsOwner)
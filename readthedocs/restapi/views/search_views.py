@@ -10,7 +10,9 @@ from rest_framework.response import Response
 from readthedocs.builds.constants import LATEST
 from readthedocs.builds.models import Version
 from readthedocs.projects.models import Project, ProjectRelationship
-from readthedocs.search.lib import search_file, search_project, search_section
+from readthedocs.search.lib import (
+    InvalidSearchPage, add_result_links, get_next_cursor, search_file,
+    search_project, search_section)
 from readthedocs.restapi import utils
 
 
@@ -41,10 +43,16 @@ def index_search(request):
 @decorators.permission_classes((permissions.AllowAny,))
 @decorators.renderer_classes((JSONRenderer,))
 def search(request):
-    """Perform search, supplement links by resolving project domains."""
+    """
+    Perform search, supplement links by resolving project domains.
+
+    Results are paginated with the ``size``, ``page`` and ``cursor`` GET
+    arguments, the response includes the ``next`` cursor.
+    """
     project_slug = request.GET.get('project', None)
     version_slug = request.GET.get('version', LATEST)
     query = request.GET.get('q', None)
+    size = request.GET.get('size', None)
     if project_slug is None or query is None:
         return Response({'error': 'Need project and q'},
                         status=status.HTTP_400_BAD_REQUEST)
@@ -54,37 +62,37 @@ def search(request):
         return Response({'error': 'Project not found'},
                         status=status.HTTP_404_NOT_FOUND)
     log.debug("(API Search) %s", query)
-    results = search_file(request=request, project_slug=project_slug,
-                          version_slug=version_slug, query=query)
+    try:
+        results = search_file(request=request, project_slug=project_slug,
+                              version_slug=version_slug, query=query,
+                              size=size, page=request.GET.get('page', None),
+                              cursor=request.GET.get('cursor', None))
+    except InvalidSearchPage as e:
+        return Response({'error': str(e)},
+                        status=status.HTTP_400_BAD_REQUEST)
 
     if results is None:
         return Response({'error': 'Project not found'},
                         status=status.HTTP_404_NOT_FOUND)
 
-    # Supplement result paths with domain information on project
-    hits = results.get('hits', {}).get('hits', [])
-    for (n, hit) in enumerate(hits):
-        fields = hit.get('_source', {})
-        search_project = fields.get('project')[0]
-        search_version = fields.get('version')[0]
-        path = fields.get('path')[0]
-        canonical_url = project.get_docs_url(version_slug=version_slug)
+    def get_base_url(search_project, search_version):
         if search_project != project_slug:
             try:
-                subproject = project.subprojects.get(child__slug=search_project)
-                canonical_url = subproject.child.get_docs_url(
-                    version_slug=search_version
-                )
+                subproject = project.subprojects.select_related('child').get(
+                    child__slug=search_project)
+                return subproject.child.get_docs_url(
+                    version_slug=search_version)
             except ProjectRelationship.DoesNotExist:
                 pass
-        results['hits']['hits'][n]['_source']['link'] = (
-            canonical_url + path
-        )
-        # we cannot render attributes starting with an underscore
-        results['hits']['hits'][n]['fields'] = results['hits']['hits'][n]['_source']
-        del results['hits']['hits'][n]['_source']
+        return project.get_docs_url(version_slug=version_slug)
 
-    return Response({'results': results})
+    # Supplement result paths with domain information on project
+    add_result_links(results, get_base_url)
+
+    return Response({
+        'results': results,
+        'next': get_next_cursor(results, size),
+    })
 
 
 @decorators.api_view(['GET'])
@@ -95,8 +103,17 @@ def project_search(request):
     if query is None:
         return Response({'error': 'Need project and q'}, status=status.HTTP_400_BAD_REQUEST)
     log.debug("(API Project Search) %s", (query))
-    results = search_project(request=request, query=query)
-    return Response({'results': results})
+    size = request.GET.get('size', None)
+    try:
+        results = search_project(request=request, query=query, size=size,
+                                 page=request.GET.get('page', None),
+                                 cursor=request.GET.get('cursor', None))
+    except InvalidSearchPage as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({
+        'results': results,
+        'next': get_next_cursor(results, size),
+    })
 
 
 @decorators.api_view(['GET'])
@@ -5,19 +5,23 @@ from __future__ import (
 import base64
 import datetime
 import json
+import os
+import shutil
+import tempfile
 from builtins import str
 
 import mock
 from allauth.socialaccount.models import SocialAccount
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils import six
 from django_dynamic_fixture import get
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from readthedocs.builds.models import Build, Version
+from readthedocs.builds.models import Build, BuildCommandResult, Version
 from readthedocs.integrations.models import Integration
 from readthedocs.oauth.models import RemoteOrganization, RemoteRepository
 from readthedocs.projects.models import Feature, Project
@@ -278,6 +282,47 @@ class APIBuildTests(TestCase):
         self.assertEqual(build['commands'][0]['run_time'], 5)
         self.assertEqual(build['commands'][0]['description'], 'foo')
 
+    @override_settings(BUILD_COMMAND_OUTPUT_COMPRESS_SIZE=10)
+    def test_append_build_command_output(self):
+        """Output of a running command is appended, then compressed."""
+        client = APIClient()
+        client.login(username='super', password='test')
+        build = get(Build, project_id=1, version_id=1)
+        now = datetime.datetime.utcnow()
+        resp = client.post(
+            '/api/v2/command/',
+            {
+                'build': build.pk,
+                'command': 'echo test',
+                'output': 'first ',
+                'exit_code': None,
+                'start_time': str(now),
+                'end_time': None,
+            },
+            format='json',
+        )
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        command_id = resp.data['id']
+        resp = client.post(
+            '/api/v2/command/{}/append/'.format(command_id),
+            {'output': 'second'},
+            format='json',
+        )
+        self.assertEqual(resp.status_code, status.HTTP_204_NO_CONTENT)
+        resp = client.patch(
+            '/api/v2/command/{}/'.format(command_id),
+            {'exit_code': 0, 'end_time': str(now)},
+            format='json',
+        )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+
+        command = BuildCommandResult.objects.get(pk=command_id)
+        self.assertEqual(command.output, 'first second')
+        self.assertEqual(command.exit_code, 0)
+        raw_output = BuildCommandResult.objects.filter(
+            pk=command_id).values_list('output', flat=True)[0]
+        self.assertEqual(raw_output, '')
+
 
 class APITests(TestCase):
     fixtures = ['eric.json', 'test_data.json']
@@ -429,6 +474,59 @@ class APITests(TestCase):
         self.assertEqual(len(resp.data['results']), 25)  # page_size
         self.assertIn('?page=2', resp.data['next'])
 
+    def test_embed(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        json_path = os.path.join(media_root, 'json', 'pip', 'latest')
+        os.makedirs(json_path)
+        with open(os.path.join(json_path, 'guide.fjson'), 'w') as f:
+            json.dump({
+                'current_page_name': 'guide',
+                'title': 'Guide',
+                'body': (
+                    '<div class="section" id="guide"><h1>Guide</h1>'
+                    '<p>Intro</p>'
+                    '<div class="section" id="install"><h2>Install</h2>'
+                    '<p>pip install</p></div></div>'
+                ),
+            }, f)
+        cache.clear()
+
+        with override_settings(MEDIA_ROOT=media_root,
+                               DEFAULT_PRIVACY_LEVEL='public'):
+            resp = self.client.get(
+                '/api/v2/embed/',
+                {'project': 'pip', 'doc': 'guide', 'section': 'Install'},
+            )
+            self.assertEqual(resp.status_code, 200)
+            self.assertEqual(len(resp.data['content']), 1)
+            self.assertIn('pip install', resp.data['content'][0])
+            self.assertEqual(
+                resp.data['headers'],
+                [{'Guide': '#guide'}, {'Install': '#install'}],
+            )
+
+            # Served from the cache once parsed
+            os.remove(os.path.join(json_path, 'guide.fjson'))
+            resp = self.client.get(
+                '/api/v2/embed/',
+                {'project': 'pip', 'doc': 'guide', 'section': 'install'},
+            )
+            self.assertEqual(resp.status_code, 200)
+            self.assertIn('pip install', resp.data['content'][0])
+
+            resp = self.client.get(
+                '/api/v2/embed/',
+                {'project': 'pip', 'doc': 'guide', 'section': 'missing'},
+            )
+            self.assertEqual(resp.status_code, 404)
+            resp = self.client.get(
+                '/api/v2/embed/',
+                {'project': 'pip', 'doc': '../../../other'},
+            )
+            self.assertEqual(resp.status_code, 404)
+        cache.clear()
+
 
 class APIImportTests(TestCase):
 
@@ -509,14 +607,16 @@ class IntegrationsTests(TestCase):
             format='json',
         )
         trigger_build.assert_has_calls(
-            [mock.call(force=True, version=mock.ANY, project=self.project)])
+            [mock.call(force=True, version=mock.ANY, project=self.project,
+                       coalesce=True)])
         client.post(
             '/api/v2/webhook/github/{0}/'.format(self.project.slug),
             {'ref': 'non-existent'},
             format='json',
         )
         trigger_build.assert_has_calls(
-            [mock.call(force=True, version=mock.ANY, project=self.project)])
+            [mock.call(force=True, version=mock.ANY, project=self.project,
+                       coalesce=True)])
 
     def test_github_invalid_webhook(self, trigger_build):
         """GitHub webhook unhandled event."""
@@ -539,14 +639,16 @@ class IntegrationsTests(TestCase):
             format='json',
         )
         trigger_build.assert_has_calls(
-            [mock.call(force=True, version=mock.ANY, project=self.project)])
+            [mock.call(force=True, version=mock.ANY, project=self.project,
+                       coalesce=True)])
         client.post(
             '/api/v2/webhook/gitlab/{0}/'.format(self.project.slug),
             {'object_kind': 'push', 'ref': 'non-existent'},
             format='json',
         )
         trigger_build.assert_has_calls(
-            [mock.call(force=True, version=mock.ANY, project=self.project)])
+            [mock.call(force=True, version=mock.ANY, project=self.project,
+                       coalesce=True)])
 
     def test_gitlab_invalid_webhook(self, trigger_build):
         """GitLab webhook unhandled event."""
@@ -576,7 +678,8 @@ class IntegrationsTests(TestCase):
             format='json',
         )
         trigger_build.assert_has_calls(
-            [mock.call(force=True, version=mock.ANY, project=self.project)])
+            [mock.call(force=True, version=mock.ANY, project=self.project,
+                       coalesce=True)])
         client.post(
             '/api/v2/webhook/bitbucket/{0}/'.format(self.project.slug),
             {
@@ -591,7 +694,8 @@ class IntegrationsTests(TestCase):
             format='json',
         )
         trigger_build.assert_has_calls(
-            [mock.call(force=True, version=mock.ANY, project=self.project)])
+            [mock.call(force=True, version=mock.ANY, project=self.project,
+                       coalesce=True)])
 
         trigger_build_call_count = trigger_build.call_count
         client.post(
@@ -1,8 +1,11 @@
 from __future__ import absolute_import
+import os
+import tempfile
 from os.path import exists
 
 import pytest
 from django.contrib.auth.models import User
+from django.test import override_settings
 import django_dynamic_fixture as fixture
 
 from readthedocs.projects.exceptions import RepositoryError
@@ -10,6 +13,7 @@ from readthedocs.projects.models import Project, Feature
 from readthedocs.rtd_tests.base import RTDTestCase
 
 from readthedocs.rtd_tests.utils import make_test_git, make_test_hg
+from readthedocs.vcs_support.backends.git import RefIndex
 
 
 class TestGitBackend(RTDTestCase):
@@ -81,6 +85,83 @@ class TestGitBackend(RTDTestCase):
                      self.project.vcs_repo().parse_tags(data)]
         self.assertEqual(expected_tags, given_ids)
 
+    def test_ref_index(self):
+        git_dir = tempfile.mkdtemp()
+        with open(os.path.join(git_dir, 'packed-refs'), 'w') as packed_refs:
+            packed_refs.write(
+                '# pack-refs with: peeled fully-peeled sorted\n'
+                '1111111111111111111111111111111111111111 refs/remotes/origin/master\n'
+                '2222222222222222222222222222222222222222 refs/tags/2.0.0\n'
+                '^3333333333333333333333333333333333333333\n'
+            )
+        os.makedirs(os.path.join(git_dir, 'refs', 'remotes', 'origin', 'release'))
+        with open(os.path.join(git_dir, 'refs', 'remotes', 'origin', 'master'), 'w') as ref:
+            ref.write('4444444444444444444444444444444444444444\n')
+        with open(os.path.join(git_dir, 'refs', 'remotes', 'origin', 'release', '1.0'), 'w') as ref:
+            ref.write('5555555555555555555555555555555555555555\n')
+        with open(os.path.join(git_dir, 'refs', 'remotes', 'origin', 'HEAD'), 'w') as ref:
+            ref.write('ref: refs/remotes/origin/master\n')
+
+        index = RefIndex(git_dir)
+        # Loose refs win over packed refs
+        self.assertEqual(
+            index.get('refs/remotes/origin/master'),
+            '4444444444444444444444444444444444444444')
+        self.assertEqual(
+            index.with_prefix('refs/remotes/origin/'),
+            [('master', '4444444444444444444444444444444444444444'),
+             ('release/1.0', '5555555555555555555555555555555555555555')])
+        self.assertEqual(
+            index.with_prefix('refs/tags/'),
+            [('2.0.0', '2222222222222222222222222222222222222222')])
+        self.assertIsNone(index.get('refs/tags/missing'))
+
+    def test_git_tags_and_branches(self):
+        repo = self.project.vcs_repo()
+        repo.checkout()
+        branches = [branch.identifier for branch in repo.branches]
+        self.assertIn('origin/master', branches)
+        self.assertIn('origin/submodule', branches)
+        self.assertNotIn('origin/HEAD', branches)
+        self.assertTrue(repo.ref_exists('remotes/origin/master'))
+        self.assertFalse(repo.ref_exists('remotes/origin/missing'))
+
+    def test_parse_remote_refs(self):
+        data = (
+            'bd533a768ff661991a689d3758fcfe72f455435d\trefs/heads/master\n'
+            '3b32886c8d3cb815df3793b3937b2e91d0fb00f1\trefs/tags/2.0.0\n'
+            'c0288a17899b2c6818f74e3a90b77e2a1779f96a\trefs/tags/2.0.0^{}\n'
+        )
+        expected_refs = [
+            ('refs/heads/master', 'bd533a768ff661991a689d3758fcfe72f455435d'),
+            ('refs/tags/2.0.0', '3b32886c8d3cb815df3793b3937b2e91d0fb00f1'),
+        ]
+        self.assertEqual(
+            self.project.vcs_repo().parse_remote_refs(data), expected_refs)
+
+    @override_settings(GIT_CLONE_STRATEGY='shallow', GIT_CLONE_DEPTH=1)
+    def test_git_checkout_shallow(self):
+        repo = self.project.vcs_repo()
+        code, _, _ = repo.checkout()
+        self.assertEqual(code, 0)
+        self.assertTrue(repo.ref_exists('remotes/origin/master'))
+        # Other branches are only fetched when needed
+        self.assertFalse(repo.ref_exists('remotes/origin/submodule'))
+        repo.fetch_ref('submodule')
+        self.assertTrue(repo.ref_exists('remotes/origin/submodule'))
+        branches = [branch.verbose_name for branch in repo.branches]
+        self.assertIn('master', branches)
+        self.assertIn('submodule', branches)
+
+    def test_fetch_ref_fallback_complete_checkout(self):
+        repo = self.project.vcs_repo()
+        code, _, _ = repo.checkout()
+        self.assertEqual(code, 0)
+        # A checkout made before switching to shallow clones
+        repo.clone_strategy = 'shallow'
+        repo.fetch_ref('missing')
+        self.assertTrue(repo.ref_exists('remotes/origin/submodule'))
+
     def test_check_for_submodules(self):
         repo = self.project.vcs_repo()
 
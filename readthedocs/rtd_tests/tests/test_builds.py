@@ -3,7 +3,7 @@ from __future__ import absolute_import
 import mock
 import six
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django_dynamic_fixture import get
 from django_dynamic_fixture import fixture
 
@@ -103,6 +103,40 @@ class BuildEnvironmentTests(TestCase):
         # PDF however was disabled and therefore not built.
         self.assertFalse(self.mocks.pdf_build.called)
 
+    @override_settings(DOCS_BUILD_CONCURRENCY=3)
+    def test_build_formats_in_parallel(self):
+        """Formats are built concurrently once HTML is published."""
+        project = get(Project,
+                      slug='project-1',
+                      documentation_type='sphinx',
+                      conf_py_file='test_conf.py',
+                      enable_pdf_build=True,
+                      enable_epub_build=True,
+                      versions=[fixture()])
+        version = project.versions.all()[0]
+
+        build_env = LocalBuildEnvironment(project=project, version=version, build={})
+        python_env = Virtualenv(version=version, build_env=build_env)
+        config = ConfigWrapper(version=version, yaml_config=create_load({
+            'formats': ['pdf', 'epub']
+        })()[0])
+        task = UpdateDocsTaskStep(build_env=build_env, project=project, python_env=python_env,
+                              version=version, search=False, localmedia=False, config=config,
+                              build={'id': 1, 'commit': 'abc'})
+        with mock.patch.object(task, 'update_app_instances') as update_app_instances:
+            outcomes = task.build_docs()
+
+        self.mocks.html_build.assert_called_once_with()
+        self.mocks.pdf_build.assert_called_once_with()
+        self.mocks.epub_build.assert_called_once_with()
+        self.assertTrue(outcomes['pdf'])
+        self.assertTrue(outcomes['epub'])
+        self.assertFalse(outcomes['localmedia'])
+        # HTML was published before the other formats were built
+        update_app_instances.assert_called_once_with(
+            html=True, search=False, partial=True)
+        self.assertEqual(task.published_outcomes, ('html', 'search'))
+
     def test_build_respects_yaml(self):
         '''Test YAML build options'''
         project = get(Project,
@@ -2,13 +2,17 @@
 
 from __future__ import absolute_import
 import mock
+from datetime import timedelta
 
 from django_dynamic_fixture import get
 from django.test import TestCase
 from django.test.utils import override_settings
+from django.utils import timezone
 
 from readthedocs.projects.models import Project
-from readthedocs.builds.models import Version
+from readthedocs.builds.constants import (
+    BUILD_STATE_BUILDING, BUILD_STATE_TRIGGERED)
+from readthedocs.builds.models import Build, Version
 from readthedocs.core.utils import trigger_build, slugify
 
 
@@ -59,6 +63,42 @@ class CoreUtilTests(TestCase):
             )
         ])
 
+    @mock.patch('readthedocs.projects.tasks.UpdateDocsTask')
+    def test_trigger_build_coalesce(self, update_docs):
+        """Builds waiting to start absorb new triggers"""
+        build = trigger_build(
+            project=self.project, version=self.version, coalesce=True)
+        self.assertEqual(build.state, BUILD_STATE_TRIGGERED)
+        self.assertEqual(update_docs().apply_async.call_count, 1)
+
+        same_build = trigger_build(
+            project=self.project, version=self.version, coalesce=True)
+        self.assertEqual(same_build, build)
+        self.assertEqual(update_docs().apply_async.call_count, 1)
+        self.assertEqual(Build.objects.filter(version=self.version).count(), 1)
+
+        # Without coalescing, or once the build started, a new one is queued
+        trigger_build(project=self.project, version=self.version)
+        self.assertEqual(update_docs().apply_async.call_count, 2)
+        Build.objects.filter(version=self.version).update(
+            state=BUILD_STATE_BUILDING)
+        new_build = trigger_build(
+            project=self.project, version=self.version, coalesce=True)
+        self.assertNotEqual(new_build, build)
+        self.assertEqual(update_docs().apply_async.call_count, 3)
+
+    @mock.patch('readthedocs.projects.tasks.UpdateDocsTask')
+    def test_trigger_build_coalesce_ignores_lost_builds(self, update_docs):
+        """Builds waiting for too long are not reused"""
+        build = trigger_build(
+            project=self.project, version=self.version, coalesce=True)
+        Build.objects.filter(pk=build.pk).update(
+            date=timezone.now() - timedelta(hours=2))
+        new_build = trigger_build(
+            project=self.project, version=self.version, coalesce=True)
+        self.assertNotEqual(new_build, build)
+        self.assertEqual(update_docs().apply_async.call_count, 2)
+
     @mock.patch('readthedocs.projects.tasks.UpdateDocsTask')
     def test_trigger_build_rounded_time_limit(self, update_docs):
         """Time limit should round down"""
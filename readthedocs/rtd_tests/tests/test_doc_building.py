@@ -17,7 +17,7 @@ from builtins import str
 
 import mock
 import pytest
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from docker.errors import APIError as DockerAPIError
 from docker.errors import DockerException
 from mock import Mock, PropertyMock, mock_open, patch
@@ -27,8 +27,10 @@ from readthedocs.builds.constants import BUILD_STATE_CLONING
 from readthedocs.builds.models import Version
 from readthedocs.doc_builder.config import ConfigWrapper
 from readthedocs.doc_builder.environments import (
-    BuildCommand, DockerBuildCommand, DockerBuildEnvironment, LocalBuildEnvironment)
+    BuildCommand, DockerBuildCommand, DockerBuildEnvironment, LocalBuildEnvironment,
+    parse_memory_limit)
 from readthedocs.doc_builder.exceptions import BuildEnvironmentError
+from readthedocs.doc_builder.output import TRUNCATED_NOTICE, CommandOutput
 from readthedocs.doc_builder.python_environments import Conda, Virtualenv
 from readthedocs.projects.models import Project
 from readthedocs.rtd_tests.mocks.environment import EnvironmentMockGroup
@@ -259,6 +261,28 @@ class TestDockerBuildEnvironment(TestCase):
         )
         self.assertEqual(docker.container_id, 'build-123-project-6-pip')
 
+    def test_parse_memory_limit(self):
+        self.assertEqual(parse_memory_limit('200m'), 200 * 1024 ** 2)
+        self.assertEqual(parse_memory_limit('2G'), 2 * 1024 ** 3)
+        self.assertEqual(parse_memory_limit(1024), 1024)
+        self.assertIsNone(parse_memory_limit(None))
+        self.assertIsNone(parse_memory_limit('lots'))
+
+    @override_settings(
+        DOCS_BUILD_CONCURRENCY=4, DOCS_BUILD_MEMORY_PER_BUILDER='512m')
+    def test_max_parallel_builds_bounded_by_memory(self):
+        build_env = DockerBuildEnvironment(
+            version=self.version,
+            project=self.project,
+            build={'id': DUMMY_BUILD_ID},
+        )
+        build_env.container_mem_limit = '1g'
+        self.assertEqual(build_env.max_parallel_builds, 2)
+        build_env.container_mem_limit = '200m'
+        self.assertEqual(build_env.max_parallel_builds, 1)
+        build_env.container_mem_limit = '8g'
+        self.assertEqual(build_env.max_parallel_builds, 4)
+
     def test_environment_successful_build(self):
         """A successful build exits cleanly and reports the build output."""
         build_env = DockerBuildEnvironment(
@@ -772,6 +796,124 @@ class TestBuildCommand(TestCase):
             u'H\xe9r\xc9 \xee\xdf s\xf6m\xea \xfcn\xef\xe7\xf3\u2202\xe9')
 
 
+@override_settings(BUILD_COMMAND_OUTPUT_STREAMING=True)
+class TestStreamedBuildCommand(TestCase):
+
+    """Test build commands reading their output while running."""
+
+    def test_output(self):
+        cmd = BuildCommand(['/bin/bash', '-c', 'echo -n FOOBAR 1>&2'])
+        cmd.run()
+        self.assertEqual(cmd.output, 'FOOBAR')
+        self.assertIsNone(cmd.error)
+        self.assertTrue(cmd.successful)
+
+    def test_input(self):
+        cmd = BuildCommand('/bin/cat', input_data='FOOBAR')
+        cmd.run()
+        self.assertEqual(cmd.output, 'FOOBAR')
+
+    @override_settings(BUILD_COMMAND_OUTPUT_MAX_SIZE=4)
+    def test_output_tail(self):
+        cmd = BuildCommand(['/bin/bash', '-c', 'echo -n FOOBAR'])
+        cmd.run()
+        self.assertEqual(cmd.output, TRUNCATED_NOTICE + 'OBAR')
+
+    def test_output_split_characters(self):
+        output = CommandOutput()
+        # Multibyte characters split across reads
+        for position in range(len(SAMPLE_UTF8_BYTES)):
+            output.write(SAMPLE_UTF8_BYTES[position:position + 1])
+        output.close()
+        self.assertEqual(output.getvalue(), SAMPLE_UNICODE)
+
+    def test_output_not_flushed(self):
+        output = CommandOutput(max_size=4)
+        output.write(b'FOOBAR')
+        output.close()
+        self.assertEqual(output.getvalue(), TRUNCATED_NOTICE + 'OBAR')
+        # Without a callback the output is not buffered for it
+        self.assertEqual(output.pop_pending(), '')
+
+    @override_settings(BUILD_COMMAND_OUTPUT_FLUSH_SIZE=3)
+    @patch('readthedocs.doc_builder.environments.api_v2')
+    def test_output_saved_while_running(self, api_v2):
+        api_v2.command.post.return_value = {'id': 42}
+        build_env = Mock(**{
+            'build': {'id': DUMMY_BUILD_ID},
+            'version.slug': 'latest',
+            'project.slug': 'pip',
+        })
+        cmd = BuildCommand(
+            ['/bin/bash', '-c', 'echo -n FOO; sleep 0.1; echo -n BAR'],
+            build_env=build_env,
+            record=True,
+        )
+        cmd.run()
+        cmd.save()
+
+        self.assertEqual(cmd.output, 'FOOBAR')
+        first_post = api_v2.command.post.call_args[0][0]
+        self.assertEqual(first_post['output'], 'FOO')
+        self.assertIsNone(first_post['exit_code'])
+        api_v2.command.assert_called_with(42)
+        api_v2.command(42).append.post.assert_called_with({'output': 'BAR'})
+        final = api_v2.command(42).patch.call_args[0][0]
+        self.assertEqual(final['exit_code'], 0)
+        self.assertNotIn('output', final)
+
+    @override_settings(BUILD_COMMAND_OUTPUT_FLUSH_SIZE=3)
+    @patch('readthedocs.doc_builder.environments.api_v2')
+    def test_output_saved_after_failed_flush(self, api_v2):
+        api_v2.command.post.side_effect = [Exception, {'id': 42}]
+        build_env = Mock(**{
+            'build': {'id': DUMMY_BUILD_ID},
+            'version.slug': 'latest',
+            'project.slug': 'pip',
+        })
+        cmd = BuildCommand(
+            ['/bin/bash', '-c', 'echo -n FOO; sleep 0.1; echo -n BAR'],
+            build_env=build_env,
+            record=True,
+        )
+        cmd.run()
+        cmd.save()
+
+        # The output of the failed call is saved with the next batch
+        self.assertEqual(api_v2.command.post.call_count, 2)
+        self.assertEqual(
+            api_v2.command.post.call_args[0][0]['output'], 'FOOBAR')
+        self.assertFalse(api_v2.command(42).append.post.called)
+        final = api_v2.command(42).patch.call_args[0][0]
+        self.assertEqual(final['exit_code'], 0)
+        self.assertNotIn('output', final)
+
+    @override_settings(
+        BUILD_COMMAND_OUTPUT_FLUSH_SIZE=3, BUILD_COMMAND_OUTPUT_MAX_SIZE=4)
+    @patch('readthedocs.doc_builder.environments.api_v2')
+    def test_output_replaced_when_lost(self, api_v2):
+        api_v2.command.post.return_value = {'id': 42}
+        api_v2.command(42).append.post.side_effect = Exception
+        build_env = Mock(**{
+            'build': {'id': DUMMY_BUILD_ID},
+            'version.slug': 'latest',
+            'project.slug': 'pip',
+        })
+        cmd = BuildCommand(
+            ['/bin/bash', '-c',
+             'echo -n FOO; sleep 0.1; echo -n BAR; sleep 0.1; echo -n BAZ'],
+            build_env=build_env,
+            record=True,
+        )
+        cmd.run()
+        cmd.save()
+
+        self.assertTrue(cmd.streamed_output.lost)
+        final = api_v2.command(42).patch.call_args[0][0]
+        self.assertEqual(final['output'], TRUNCATED_NOTICE + 'RBAZ')
+        self.assertEqual(final['exit_code'], 0)
+
+
 class TestDockerBuildCommand(TestCase):
 
     """Test docker build commands."""
@@ -823,6 +965,34 @@ class TestDockerBuildCommand(TestCase):
         self.assertEqual(self.mocks.docker_client.exec_create.call_count, 1)
         self.assertEqual(self.mocks.docker_client.exec_inspect.call_count, 1)
 
+    @override_settings(
+        BUILD_COMMAND_OUTPUT_STREAMING=True, BUILD_COMMAND_OUTPUT_FLUSH_SIZE=3)
+    @patch('readthedocs.doc_builder.environments.api_v2')
+    def test_streamed_output(self, api_v2):
+        """Output is saved while the command runs."""
+        api_v2.command.post.return_value = {'id': 42}
+        self.mocks.configure_mock(
+            'docker_client', {
+                'exec_create.return_value': {'Id': b'container-foobar'},
+                'exec_start.return_value': iter([b'FOO', b'BAR']),
+                'exec_inspect.return_value': {'ExitCode': 0},
+            })
+        cmd = DockerBuildCommand(
+            ['echo', 'test'], cwd='/tmp/foobar', record=True)
+        cmd.build_env = Mock(**{'build': {'id': DUMMY_BUILD_ID}})
+        cmd.build_env.get_client.return_value = self.mocks.docker_client
+        type(cmd.build_env).container_id = PropertyMock(return_value='foo')
+        cmd.run()
+        cmd.save()
+
+        self.mocks.docker_client.exec_start.assert_called_with(
+            exec_id=b'container-foobar', stream=True)
+        self.assertEqual(cmd.output, 'FOOBAR')
+        self.assertEqual(api_v2.command.post.call_args[0][0]['output'], 'FOO')
+        api_v2.command(42).append.post.assert_called_with({'output': 'BAR'})
+        final = api_v2.command(42).patch.call_args[0][0]
+        self.assertEqual(final['exit_code'], 0)
+
     def test_command_oom_kill(self):
         """Command is OOM killed."""
         self.mocks.configure_mock(
@@ -895,6 +1065,101 @@ class TestPythonEnvironment(TestCase):
             *args, bin_path=mock.ANY
         )
 
+    @override_settings(PYTHON_CORE_REQUIREMENTS_MAX_AGE=60)
+    def test_install_core_requirements_reuses_environment(self):
+        python_env = Virtualenv(
+            version=self.version_sphinx,
+            build_env=self.build_env_mock,
+        )
+        env_json_path = tempfile.mktemp(suffix='envjson')
+        with open(env_json_path, 'w') as env_json:
+            env_json.write('{}')
+        with patch.object(python_env, 'environment_json_path',
+                          return_value=env_json_path):
+            python_env.install_core_requirements()
+            self.assertEqual(self.build_env_mock.run.call_count, 1)
+            python_env.install_core_requirements()
+            self.assertEqual(self.build_env_mock.run.call_count, 1)
+
+            # Changing the requirements installs them again
+            with patch.object(python_env, 'get_core_requirements',
+                              return_value=['sphinx']):
+                python_env.install_core_requirements()
+            self.assertEqual(self.build_env_mock.run.call_count, 2)
+
+    @override_settings(PYTHON_CORE_REQUIREMENTS_MAX_AGE=60)
+    @patch('readthedocs.doc_builder.python_environments.time.time',
+           return_value=6000)
+    def test_install_core_requirements_from_wheelhouse(self, _):
+        wheelhouse = tempfile.mkdtemp()
+        python_env = Virtualenv(
+            version=self.version_sphinx,
+            build_env=self.build_env_mock,
+        )
+        requirements = python_env.get_core_requirements()
+        wheel_dir = os.path.join(wheelhouse, '{0}-100'.format(
+            python_env.get_core_requirements_key(requirements)))
+        os.mkdir(wheel_dir)
+        wheel = os.path.join(wheel_dir, 'Sphinx-1.7.4-py2.py3-none-any.whl')
+        open(wheel, 'w').close()
+
+        with override_settings(PYTHON_WHEELHOUSE_PATH=wheelhouse):
+            python_env.install_core_requirements()
+        args = [
+            'python',
+            mock.ANY,  # pip path
+            'install',
+            '--upgrade',
+            '--no-index',
+            '--find-links',
+            wheel_dir,
+            wheel,
+        ]
+        self.build_env_mock.run.assert_called_once_with(
+            *args, bin_path=mock.ANY, warn_only=True
+        )
+
+    @override_settings(PYTHON_CORE_REQUIREMENTS_MAX_AGE=60)
+    @patch('readthedocs.doc_builder.python_environments.time.time',
+           return_value=6000)
+    def test_install_core_requirements_wheelhouse_expired(self, _):
+        wheelhouse = tempfile.mkdtemp()
+        python_env = Virtualenv(
+            version=self.version_sphinx,
+            build_env=self.build_env_mock,
+        )
+        requirements = python_env.get_core_requirements()
+        key = python_env.get_core_requirements_key(requirements)
+        # Wheels of the previous periods, the older ones are removed
+        for period in (98, 99):
+            os.mkdir(os.path.join(wheelhouse, '{0}-{1}'.format(key, period)))
+
+        def build_wheels(*cmd, **kwargs):
+            if 'wheel' in cmd:
+                wheel_dir = cmd[cmd.index('--wheel-dir') + 1]
+                os.mkdir(wheel_dir)
+                open(os.path.join(
+                    wheel_dir, 'Sphinx-1.8.0-py2.py3-none-any.whl'), 'w').close()
+            return mock.Mock(successful=True)
+
+        self.build_env_mock.run.side_effect = build_wheels
+        with override_settings(PYTHON_WHEELHOUSE_PATH=wheelhouse):
+            python_env.install_core_requirements()
+
+        wheel_dir = os.path.join(wheelhouse, '{0}-100'.format(key))
+        self.assertEqual(
+            sorted(os.listdir(wheelhouse)),
+            sorted(['{0}-99'.format(key), '{0}-100'.format(key)]),
+        )
+        build_args = self.build_env_mock.run.call_args_list[0][0]
+        self.assertEqual(build_args[2], 'wheel')
+        self.assertEqual(build_args[-len(requirements):], tuple(requirements))
+        install_args = self.build_env_mock.run.call_args_list[1][0]
+        self.assertEqual(
+            install_args[-1],
+            os.path.join(wheel_dir, 'Sphinx-1.8.0-py2.py3-none-any.whl'),
+        )
+
     def test_install_core_requirements_mkdocs(self):
         python_env = Virtualenv(
             version=self.version_mkdocs,
@@ -4,10 +4,11 @@ import requests
 import requests_mock
 from django.test.utils import override_settings
 
-from mock import patch
+from mock import call, patch
 import pytest
 
 from django import forms
+from django.core.cache import cache
 from django.core.management import call_command
 from django.conf import settings
 from django.db import IntegrityError
@@ -25,6 +26,8 @@ from readthedocs.oauth.models import RemoteOrganization, RemoteRepository
 from readthedocs.projects.models import Project
 
 from readthedocs.docsitalia.forms import PublisherAdminForm
+from readthedocs.docsitalia.github import (
+    get_all_metadata_for_publisher, get_metadata_from_url)
 from readthedocs.docsitalia.oauth.services.github import DocsItaliaGithubService
 from readthedocs.docsitalia.metadata import (
     validate_publisher_metadata, validate_projects_metadata,
@@ -32,8 +35,10 @@ from readthedocs.docsitalia.metadata import (
 from readthedocs.docsitalia.models import (
     Publisher, PublisherProject, PublisherIntegration,
     update_project_from_metadata)
+from readthedocs.docsitalia.templatetags.docs_italia import resolve_docs_urls
 from readthedocs.docsitalia.serializers import (
     DocsItaliaProjectSerializer, DocsItaliaProjectAdminSerializer)
+from readthedocs.docsitalia.utils import clear_projects_from_index
 
 
 PUBLISHER_METADATA = """publisher:
@@ -95,6 +100,10 @@ DOCUMENT_METADATA = """document:
 IT_RESOLVER_IN_SETTINGS = 'readthedocs.docsitalia.resolver.ItaliaResolver'\
 in getattr(settings, 'CLASS_OVERRIDES', {}).values()
 
+CLEAR_PROJECTS_FROM_INDEX = (
+    'readthedocs.docsitalia.management.commands.clean_es_index.'
+    'clear_projects_from_index')
+
 class DocsItaliaTest(TestCase):
     fixtures = ['eric', 'test_data']
 
@@ -657,6 +666,16 @@ class DocsItaliaTest(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'docsitalia/docsitalia_homepage.html')
 
+    def test_resolve_docs_urls(self):
+        project = Project.objects.create(
+            name='my project',
+            slug='myprojectslug',
+            repo='https://github.com/testorg/myrepourl.git'
+        )
+        projects = resolve_docs_urls(Project.objects.filter(pk=project.pk))
+        self.assertEqual(projects, [project])
+        self.assertEqual(projects[0].docs_url, project.get_docs_url())
+
     def test_update_project_from_metadata_use_it_as_default_language(self):
         project = Project.objects.create(
             name='my project',
@@ -752,6 +771,64 @@ class DocsItaliaTest(TestCase):
         response = self.client.post(url, {})
         self.assertEqual(response.status_code, 404)
 
+    def test_get_metadata_from_url_sends_conditional_requests(self):
+        url = (
+            'https://raw.githubusercontent.com/testorg/'
+            'italia-conf/master/publisher_settings.yml'
+        )
+        cache.clear()
+        with requests_mock.Mocker() as rm:
+            rm.get(url, text=PUBLISHER_METADATA, headers={'ETag': '"abc"'})
+            self.assertEqual(get_metadata_from_url(url), PUBLISHER_METADATA)
+            self.assertNotIn('If-None-Match', rm.last_request.headers)
+
+            rm.get(url, status_code=304, text='')
+            self.assertEqual(get_metadata_from_url(url), PUBLISHER_METADATA)
+            self.assertEqual(rm.last_request.headers['If-None-Match'], '"abc"')
+            self.assertEqual(rm.call_count, 2)
+        cache.clear()
+
+    def test_get_all_metadata_for_publisher(self):
+        organization = RemoteOrganization.objects.create(
+            slug='testorg',
+            json='{}',
+        )
+        publisher = Publisher.objects.create(
+            name='Test Org',
+            slug='testorg',
+            metadata={},
+            projects_metadata={},
+            remote_organization=organization,
+            active=True,
+        )
+        with requests_mock.Mocker() as rm:
+            rm.get(
+                'https://raw.githubusercontent.com/testorg/'
+                'italia-conf/master/publisher_settings.yml',
+                text=PUBLISHER_METADATA)
+            rm.get(
+                'https://raw.githubusercontent.com/testorg/'
+                'italia-conf/master/projects_settings.yml',
+                text=PROJECTS_METADATA)
+            publisher_metadata, projects_metadata = (
+                get_all_metadata_for_publisher(organization, publisher))
+        self.assertIn('publisher', publisher_metadata)
+        self.assertIn('projects', projects_metadata)
+
+    @patch('readthedocs.docsitalia.tasks.update_publisher_metadata.delay')
+    def test_metadata_webhook_github_does_not_fetch_metadata(self, update):
+        publisher = Publisher.objects.create(
+            name='Test Org',
+            slug='testorg',
+            metadata={},
+            projects_metadata={},
+            active=True,
+        )
+        url = reverse('metadata_webhook_github', args=[publisher.slug])
+        response = self.client.post(url, {'ref': 'refs/heads/master'})
+        self.assertEqual(response.status_code, 200)
+        update.assert_called_once_with(publisher.pk)
+
     def test_on_webhook_github_signal_works(self):
         project = Project.objects.create(
             name='my project',
@@ -1158,11 +1235,11 @@ class DocsItaliaTest(TestCase):
             repo='https://github.com/testorg/mysecondrepourl.git'
         )
         pub_project.projects.add(second_project)
-        with patch('elasticsearch.Elasticsearch.delete') as d, patch('elasticsearch.Elasticsearch.delete_by_query') as f :
-            d.return_value = True
+        with patch(CLEAR_PROJECTS_FROM_INDEX) as clear_mock:
+            clear_mock.return_value = {'projects': 1, 'pages': 0}
             call_command('clean_es_index')
-            self.assertNotIn(second_project.pk, [e[1]['id'] for e in d.call_args_list])
-            self.assertIn(project.pk, [e[1]['id'] for e in d.call_args_list])
+            clear_mock.assert_called_once_with(
+                [project.pk], routing=[['myprojectslug']], dry_run=False)
         self.assertEqual(Project.objects.all().count(), 1)
         self.assertTrue(Project.objects.filter(slug='mysecondprojectslug').exists())
 
@@ -1192,10 +1269,11 @@ class DocsItaliaTest(TestCase):
             repo='https://github.com/testorg/myrepourl.git'
         )
         pub_project.projects.add(project)
-        with patch('elasticsearch.Elasticsearch.delete') as d, patch('elasticsearch.Elasticsearch.delete_by_query') as f :
-            d.return_value = True
+        with patch(CLEAR_PROJECTS_FROM_INDEX) as clear_mock:
+            clear_mock.return_value = {'projects': 1, 'pages': 0}
             call_command('clean_es_index')
-            self.assertIn(project.pk, [e[1]['id'] for e in d.call_args_list])
+            clear_mock.assert_called_once_with(
+                [project.pk], routing=[['myprojectslug']], dry_run=False)
 
     def test_clean_es_index_inactive_publisher(self):
         publisher = Publisher.objects.create(
@@ -1223,10 +1301,62 @@ class DocsItaliaTest(TestCase):
             repo='https://github.com/testorg/myrepourl.git'
         )
         pub_project.projects.add(project)
-        with patch('elasticsearch.Elasticsearch.delete') as d,  patch('elasticsearch.Elasticsearch.delete_by_query') as f :
-            d.return_value = True
+        with patch(CLEAR_PROJECTS_FROM_INDEX) as clear_mock:
+            clear_mock.return_value = {'projects': 1, 'pages': 0}
             call_command('clean_es_index')
-            self.assertIn(project.pk, [e[1]['id'] for e in d.call_args_list])
+            clear_mock.assert_called_once_with(
+                [project.pk], routing=[['myprojectslug']], dry_run=False)
+
+    def test_clean_es_index_dry_run(self):
+        project = Project.objects.create(
+            name='my project',
+            slug='myprojectslug',
+            repo='https://github.com/testorg/myrepourl.git'
+        )
+        with patch(CLEAR_PROJECTS_FROM_INDEX) as clear_mock:
+            clear_mock.return_value = {'projects': 1, 'pages': 10}
+            call_command('clean_es_index', dry_run=True)
+            clear_mock.assert_called_once_with(
+                [project.pk], routing=[['myprojectslug']], dry_run=True)
+        self.assertTrue(Project.objects.filter(pk=project.pk).exists())
+
+    @override_settings(DOCSITALIA_ES_CLEANUP_CHUNK_SIZE=2)
+    def test_clear_projects_from_index(self):
+        with patch('readthedocs.docsitalia.utils.PageIndex') as page_index, \
+                patch('readthedocs.docsitalia.utils.ProjectIndex') as project_index, \
+                patch('readthedocs.docsitalia.utils.time.sleep') as sleep:
+            page_index.return_value._index = 'readthedocs'
+            page_index.return_value._type = 'page'
+            project_index.return_value.bulk_delete.return_value = 2
+            e_s = page_index.return_value.es
+            e_s.delete_by_query.return_value = {'task': 'node:1'}
+            e_s.tasks.get.side_effect = [
+                {'completed': False,
+                 'task': {'status': {'deleted': 1, 'total': 3}}},
+                {'completed': True,
+                 'task': {'status': {'deleted': 3, 'total': 3}},
+                 'response': {'deleted': 3, 'failures': []}},
+                {'completed': True,
+                 'task': {'status': {'deleted': 1, 'total': 1}},
+                 'response': {'deleted': 1, 'failures': []}},
+            ]
+            removed = clear_projects_from_index(
+                [1, 2, 3], routing=[['a'], ['b', 'parent'], None])
+        self.assertEqual(removed, {'projects': 4, 'pages': 4})
+        project_index.return_value.bulk_delete.assert_has_calls([
+            call([1, 2]), call([3])])
+        self.assertEqual(e_s.delete_by_query.call_args_list, [
+            call(index='readthedocs', doc_type='page',
+                 body={'query': {'terms': {'project_id': [1, 2]}}},
+                 routing='a,b,parent',
+                 wait_for_completion=False, conflicts='proceed'),
+            # without the routing of every project all shards are searched
+            call(index='readthedocs', doc_type='page',
+                 body={'query': {'terms': {'project_id': [3]}}},
+                 wait_for_completion=False, conflicts='proceed'),
+        ])
+        e_s.tasks.get.assert_called_with(task_id='node:1')
+        self.assertEqual(sleep.call_count, 1)
 
     @patch('readthedocs.docsitalia.tasks.clear_es_index')
     def test_when_i_remove_the_publisher_project_the_projects_get_removed(self, clear_index):
@@ -1274,6 +1404,45 @@ class DocsItaliaTest(TestCase):
         self.assertFalse(pubproj.exists())
         proj = Project.objects.filter(pk=project.pk)
         self.assertFalse(proj.exists())
-        self.assertEqual(len(clear_index.mock_calls), 1)
+        clear_index.delay.assert_called_once_with(
+            projects=[project.pk], routing=[['myprojectslug']])
         proj2 = Project.objects.filter(pk=project2.pk)
         self.assertTrue(proj2.exists())
+
+    @patch('readthedocs.docsitalia.tasks.clear_es_index')
+    @patch('readthedocs.docsitalia.signals.invalidate_resolver_cache')
+    def test_publisher_project_delete_invalidates_resolver_cache(
+            self, invalidate_resolver_cache, clear_index):
+        publisher = Publisher.objects.create(
+            name='Test Org',
+            slug='testorg',
+            metadata={},
+            projects_metadata={},
+            active=True
+        )
+        pub_project = PublisherProject.objects.create(
+            name='Test Project',
+            slug='testproject',
+            metadata={},
+            publisher=publisher,
+            active=True
+        )
+        other_pub_project = PublisherProject.objects.create(
+            name='Other Project',
+            slug='otherproject',
+            metadata={},
+            publisher=publisher,
+            active=True
+        )
+        project = Project.objects.create(
+            name='my project',
+            slug='myprojectslug',
+            repo='https://github.com/testorg/myrepourl.git'
+        )
+        pub_project.projects.add(project)
+        other_pub_project.projects.add(project)
+        invalidate_resolver_cache.reset_mock()
+        pub_project.delete()
+        # the project is kept, its URLs change with the publisher project
+        self.assertTrue(Project.objects.filter(pk=project.pk).exists())
+        invalidate_resolver_cache.assert_called_once_with([project.pk])
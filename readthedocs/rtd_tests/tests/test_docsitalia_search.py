@@ -109,5 +109,22 @@ class TestSearch(TestCase):
               'commit': None, 'progetto': 'testproject', 'path': 'path',
               'weight': 2, 'version': 'verbose-name', 'headers': 'headers',
               'id': 'b3129830187e487e332bb2eab1b7a9c3', 'title': 'title',
-              'content': 'content', 'project_id': self.pip.pk}], routing='pip'
+              'content': 'content', 'project_id': self.pip.pk,
+              'base_url': self.pip.get_docs_url(version_slug=self.version.slug)}],
+            index=None, routing='pip'
         )
+
+    @patch(
+        'elasticsearch.connection.http_urllib3.Urllib3HttpConnection.perform_request',
+        side_effect=perform_request_project_mock
+    )
+    def test_index_search_request_deletes_pages_by_id(self, perform_request_mock):
+        with patch.object(PageIndex, 'bulk_delete') as delete_mock, \
+                patch.object(PageIndex, 'delete_document') as delete_query_mock:
+            index_search_request(
+                version=self.version, page_list=[], commit=None,
+                project_scale=1, page_scale=1, section=False, delete=False,
+                delete_pages=['path'])
+        delete_mock.assert_called_with(
+            ['b3129830187e487e332bb2eab1b7a9c3'], index=None, routing='pip')
+        delete_query_mock.assert_not_called()
@@ -8,12 +8,14 @@ from requests.exceptions import ConnectionError
 import pytest
 
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
 from django.test import TestCase
 from django.test.utils import override_settings
 from readthedocs.builds.models import Build, Version
 from readthedocs.docsitalia.github import InvalidMetadata
-from readthedocs.docsitalia.models import Publisher, PublisherProject
+from readthedocs.docsitalia.models import (
+    Publisher, PublisherProject, PublishedDocument)
 from readthedocs.docsitalia.views.core_views import (
     DocsItaliaHomePage, PublisherIndex, PublisherProjectIndex, PublisherList)
 from readthedocs.oauth.models import RemoteRepository
@@ -149,6 +151,87 @@ class DocsItaliaViewsTest(TestCase):
         build.save()
         self.assertTrue(list(qs), [project.pk])
 
+    def test_published_document_follows_builds_and_versions(self):
+        project = Project.objects.create(
+            name='my project',
+            slug='projectslug',
+            repo='https://github.com/testorg/myrepourl.git'
+        )
+        version = project.versions.first()
+        status = PublishedDocument.objects.get(project=project)
+        self.assertTrue(status.has_public_version)
+        self.assertFalse(status.has_public_build)
+
+        build = Build.objects.create(
+            project=project,
+            version=version,
+            type='html',
+            state='finished',
+            success=True
+        )
+        status = PublishedDocument.objects.get(project=project)
+        self.assertTrue(status.has_public_build)
+
+        version.privacy_level = PRIVATE
+        version.save()
+        status = PublishedDocument.objects.get(project=project)
+        self.assertFalse(status.has_public_version)
+        self.assertFalse(status.has_public_build)
+
+        version.privacy_level = PUBLIC
+        version.save()
+        build.delete()
+        status = PublishedDocument.objects.get(project=project)
+        self.assertTrue(status.has_public_version)
+        self.assertFalse(status.has_public_build)
+
+        project.delete()
+        self.assertFalse(PublishedDocument.objects.exists())
+
+    @override_settings(DOCSITALIA_LISTINGS_CACHE_TIMEOUT=60)
+    def test_docsitalia_homepage_listing_is_cached(self):
+        cache.clear()
+        publisher = Publisher.objects.create(
+            name='Test Org',
+            slug='testorg',
+            metadata={},
+            projects_metadata={},
+            active=True
+        )
+        pub_project = PublisherProject.objects.create(
+            name='Test Project',
+            slug='testproject',
+            publisher=publisher,
+            active=True
+        )
+        project = Project.objects.create(
+            name='my cached project',
+            slug='projectslug',
+            repo='https://github.com/testorg/myrepourl.git'
+        )
+        pub_project.projects.add(project)
+        Build.objects.create(
+            project=project,
+            version=project.versions.first(),
+            type='html',
+            state='finished',
+            success=True
+        )
+
+        response = self.client.get('/')
+        self.assertContains(response, 'my cached project')
+
+        # update() doesn't send signals, the cached listing is served
+        PublisherProject.objects.filter(pk=pub_project.pk).update(active=False)
+        response = self.client.get('/')
+        self.assertContains(response, 'my cached project')
+
+        # saving the publisher invalidates the listings
+        publisher.save()
+        response = self.client.get('/')
+        self.assertNotContains(response, 'my cached project')
+        cache.clear()
+
     def test_docsitalia_publisher_index_get_queryset_filter_active(self):
         index = PublisherIndex()
 
@@ -530,7 +613,7 @@ class DocsItaliaViewsTest(TestCase):
         )
         response = self.client.get('/api/v2/docsearch/?q=query&project=projectslug&version=latest')
         self.assertEqual(response.status_code, 200)
-        self.assertJSONEqual(response.content.decode('utf-8'), {'results': {}})
+        self.assertJSONEqual(response.content.decode('utf-8'), {'results': {}, 'next': None})
 
     def test_docsitalia_api_active_versions_do_not_return_private_documents(self):
         project = Project.objects.create(
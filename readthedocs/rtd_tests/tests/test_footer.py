@@ -3,7 +3,8 @@ from __future__ import (
     absolute_import, division, print_function, unicode_literals)
 
 import mock
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from rest_framework.test import APIRequestFactory, APITestCase
 
 from readthedocs.builds.constants import BRANCH, LATEST, TAG
@@ -79,6 +80,25 @@ class Testmaker(APITestCase):
             response = self.render()
         self.assertNotIn('epub', response.data['html'])
 
+    @override_settings(FOOTER_CACHE_TIMEOUT=60)
+    def test_footer_cached(self):
+        cache.clear()
+        self.render()
+        request = self.factory.get(
+            '/api/v2/footer_html/?project=pip&version=latest&page=foo')
+        with self.assertNumQueries(0):
+            response = footer_html(request)
+        response.render()
+        self.assertIn('latest/foo.html', response.data['html'])
+        self.assertNotIn('__rtd_footer', response.data['html'])
+        self.assertTrue(response.data['version_active'])
+
+        self.latest.active = False
+        self.latest.save()
+        response = self.render()
+        self.assertFalse(response.data['version_active'])
+        cache.clear()
+
     def test_no_session_logged_out(self):
         mid = FooterNoSessionMiddleware()
 
@@ -1,6 +1,7 @@
 from __future__ import absolute_import
+import hashlib
 import os
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from readthedocs.projects.tasks import _manage_imported_files
 from readthedocs.projects.models import Project, ImportedFile
@@ -48,3 +49,49 @@ class ImportedFileTests(TestCase):
         self.assertNotEqual(ImportedFile.objects.get(name='test.html').md5, 'c7532f22a052d716f7b2310fb52ad981')
 
         self.assertEqual(ImportedFile.objects.count(), 3)
+
+    @override_settings(IMPORTED_FILES_BATCH_SIZE=2)
+    def test_update_content_in_batches(self):
+        test_dir = os.path.join(base_dir, 'files')
+        _manage_imported_files(self.version, test_dir, 'commit01')
+        ImportedFile.objects.update(md5='outdated')
+
+        changed, __ = _manage_imported_files(self.version, test_dir, 'commit02')
+        self.assertEqual(changed, {'api.fjson', 'conf.py', 'test.html'})
+        for imported_file in ImportedFile.objects.all():
+            with open(os.path.join(test_dir, imported_file.path), 'rb') as f:
+                md5 = hashlib.md5(f.read()).hexdigest()
+            self.assertEqual(imported_file.md5, md5)
+            self.assertEqual(imported_file.commit, 'commit02')
+
+    def test_changed_and_deleted_files(self):
+        test_dir = os.path.join(base_dir, 'files')
+        self.assertEqual(ImportedFile.objects.count(), 0)
+
+        with open(os.path.join(test_dir, 'test.html'), 'w+') as f:
+            f.write('Woo')
+
+        changed, deleted = _manage_imported_files(self.version, test_dir, 'commit01')
+        self.assertEqual(changed, {'api.fjson', 'conf.py', 'test.html'})
+        self.assertEqual(deleted, set())
+
+        ImportedFile.objects.create(
+            project=self.project, version=self.version, path='old.html',
+            name='old.html', commit='commit01')
+        with open(os.path.join(test_dir, 'test.html'), 'w+') as f:
+            f.write('Something Else')
+
+        changed, deleted = _manage_imported_files(self.version, test_dir, 'commit02')
+        self.assertEqual(changed, {'test.html'})
+        self.assertEqual(deleted, {'old.html'})
+
+    def test_unchanged_files(self):
+        test_dir = os.path.join(base_dir, 'files')
+        _manage_imported_files(self.version, test_dir, 'commit01')
+        changed, deleted = _manage_imported_files(self.version, test_dir, 'commit02')
+        self.assertEqual(changed, set())
+        self.assertEqual(deleted, set())
+        self.assertEqual(
+            set(ImportedFile.objects.values_list('commit', flat=True)),
+            {'commit02'},
+        )
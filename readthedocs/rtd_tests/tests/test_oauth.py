@@ -3,6 +3,8 @@ from __future__ import (
     absolute_import, division, print_function, unicode_literals)
 
 import mock
+import requests
+import requests_mock
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.test import TestCase
@@ -150,6 +152,51 @@ class GitHubOAuthTests(TestCase):
         repo = self.service.create_repository(repo_json, organization=self.org)
         self.assertIsNotNone(repo)
 
+    def test_paginate(self):
+        """Pages are followed with the ``Link`` header."""
+        self.service.session = requests.Session()
+        with requests_mock.Mocker() as rm:
+            rm.get(
+                'https://api.github.com/user/repos?page=1',
+                json=[{'id': 1}, {'id': 2}],
+                headers={
+                    'Link': '<https://api.github.com/user/repos?page=2>; '
+                            'rel="next"',
+                },
+            )
+            rm.get('https://api.github.com/user/repos?page=2', json=[{'id': 3}])
+            results = self.service.paginate(
+                'https://api.github.com/user/repos?page=1')
+        self.assertEqual(results, [{'id': 1}, {'id': 2}, {'id': 3}])
+
+    @override_settings(OAUTH_RATE_LIMIT_MAX_WAIT=60)
+    @mock.patch('readthedocs.oauth.services.github.time')
+    def test_paginate_rate_limit(self, time):
+        """Pagination waits for the rate limit reset, if it's soon enough."""
+        time.time.return_value = 1000
+        self.service.session = requests.Session()
+        with requests_mock.Mocker() as rm:
+            rm.get(
+                'https://api.github.com/user/repos?page=1',
+                json=[{'id': 1}],
+                headers={
+                    'Link': '<https://api.github.com/user/repos?page=2>; '
+                            'rel="next"',
+                    'X-RateLimit-Remaining': '0',
+                    'X-RateLimit-Reset': '1030',
+                },
+            )
+            rm.get('https://api.github.com/user/repos?page=2', json=[{'id': 2}])
+            results = self.service.paginate(
+                'https://api.github.com/user/repos?page=1')
+            self.assertEqual(results, [{'id': 1}, {'id': 2}])
+            time.sleep.assert_called_once_with(30)
+
+            time.time.return_value = 900
+            results = self.service.paginate(
+                'https://api.github.com/user/repos?page=1')
+            self.assertEqual(results, [{'id': 1}])
+
 
 class BitbucketOAuthTests(TestCase):
 
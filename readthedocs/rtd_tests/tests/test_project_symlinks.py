@@ -15,7 +15,7 @@ from django_dynamic_fixture import get
 from readthedocs.builds.models import Version
 from readthedocs.projects.models import Project, Domain
 from readthedocs.projects.tasks import broadcast_remove_orphan_symlinks, remove_orphan_symlinks, symlink_project
-from readthedocs.core.symlink import PublicSymlink, PrivateSymlink
+from readthedocs.core.symlink import PublicSymlink, PrivateSymlink, atomic_symlink
 
 
 def get_filesystem(path, top_level_path=None):
@@ -1190,3 +1190,26 @@ class TestPublicPrivateSymlink(TempSiterootCase, TestCase):
         self.subproject.refresh_from_db()
         self.assertEqual(self.subproject.privacy_level, 'private')
         self.assertFilesystem(filesystem_after)
+
+
+class TestAtomicSymlink(TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.link = os.path.join(self.root, 'link')
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_create_and_replace(self):
+        self.assertTrue(atomic_symlink('/first', self.link))
+        self.assertEqual(os.readlink(self.link), '/first')
+        self.assertTrue(atomic_symlink('/second', self.link))
+        self.assertEqual(os.readlink(self.link), '/second')
+        self.assertEqual(os.listdir(self.root), ['link'])
+
+    def test_unchanged_link_is_untouched(self):
+        atomic_symlink('/first', self.link)
+        with mock.patch('readthedocs.core.symlink.os.symlink') as symlink:
+            self.assertFalse(atomic_symlink('/first', self.link))
+        symlink.assert_not_called()
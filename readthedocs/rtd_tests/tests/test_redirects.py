@@ -1,9 +1,10 @@
 from __future__ import absolute_import
 
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
 from django.http import Http404, HttpResponse
-from django.test import TestCase
+from django.test import RequestFactory, TestCase
 from django.test.utils import override_settings
 
 from django_dynamic_fixture import get
@@ -13,6 +14,7 @@ from mock import patch
 from readthedocs.builds.constants import LATEST
 from readthedocs.projects.models import Project
 from readthedocs.redirects.models import Redirect
+from readthedocs.redirects.utils import get_redirect_response
 
 import logging
 import pytest
@@ -275,6 +277,84 @@ class CustomRedirectTests(TestCase):
         self.assertEqual(path, expected_path)
 
 
+@override_settings(PUBLIC_DOMAIN='readthedocs.org', USE_SUBDOMAIN=True)
+class RedirectMatcherTests(TestCase):
+
+    def setUp(self):
+        self.pip = Project.objects.create(
+            name='Pip',
+            slug='pip',
+            repo='https://github.com/fail/sauce',
+            documentation_type='sphinx',
+        )
+        self.pip.versions.create_latest()
+        self.factory = RequestFactory()
+
+    def get_redirect_path(self, path):
+        return self.pip.redirects.get_redirect_path(
+            path=path, language='en', version_slug='latest')
+
+    def test_latest_redirect_wins(self):
+        Redirect.objects.create(
+            project=self.pip, redirect_type='prefix', from_url='/old/')
+        Redirect.objects.create(
+            project=self.pip, redirect_type='page',
+            from_url='/old/install.html', to_url='/install.html')
+        self.assertEqual(
+            self.get_redirect_path('/old/install.html'), '/en/latest/install.html')
+        self.assertEqual(
+            self.get_redirect_path('/old/faq.html'), '/en/latest/faq.html')
+        self.assertIsNone(self.get_redirect_path('/faq.html'))
+
+    def test_exact_rest(self):
+        Redirect.objects.create(
+            project=self.pip, redirect_type='exact',
+            from_url='/en/latest/old/$rest', to_url='/en/latest/new/')
+        self.assertEqual(
+            self.pip.redirects.get_redirect_path('/en/latest/old/faq.html'),
+            '/en/latest/new/faq.html')
+        self.assertIsNone(
+            self.pip.redirects.get_redirect_path('/en/latest/faq.html'))
+
+    def test_empty_target_is_skipped(self):
+        Redirect.objects.create(
+            project=self.pip, redirect_type='sphinx_htmldir')
+        Redirect.objects.create(
+            project=self.pip, redirect_type='exact',
+            from_url='/en/latest/faq.html', to_url='')
+        self.assertEqual(self.get_redirect_path('/faq.html'), '/en/latest/faq/')
+
+    @override_settings(REDIRECTS_CACHE_TIMEOUT=60, REDIRECTS_LOCAL_CACHE_TIMEOUT=60)
+    def test_cached_redirects(self):
+        cache.clear()
+        Redirect.objects.create(
+            project=self.pip, redirect_type='page',
+            from_url='/install.html', to_url='/tutorial/install.html')
+        request = self.factory.get('/en/latest/missing.html')
+        request.slug = 'pip'
+        self.assertIsNone(get_redirect_response(request, '/en/latest/missing.html'))
+        with self.assertNumQueries(0):
+            self.assertIsNone(
+                get_redirect_response(request, '/en/latest/missing.html'))
+            self.assertIsNone(
+                get_redirect_response(request, '/en/latest/other.html'))
+
+        # saving a redirect drops the compiled redirects of the project
+        Redirect.objects.create(
+            project=self.pip, redirect_type='page',
+            from_url='/missing.html', to_url='/found.html')
+        response = get_redirect_response(request, '/en/latest/missing.html')
+        self.assertEqual(
+            response['Location'], 'http://testserver/en/latest/found.html')
+
+        # unknown projects are cached as well
+        request.slug = 'unknown'
+        self.assertIsNone(get_redirect_response(request, '/install.html'))
+        with self.assertNumQueries(0):
+            self.assertIsNone(get_redirect_response(request, '/install.html'))
+        cache.clear()
+
+
 @override_settings(PUBLIC_DOMAIN='readthedocs.org', USE_SUBDOMAIN=False)
 class RedirectBuildTests(TestCase):
     fixtures = ["eric", "test_data"]
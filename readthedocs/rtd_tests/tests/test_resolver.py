@@ -4,7 +4,10 @@ from __future__ import (
 
 import django_dynamic_fixture as fixture
 import mock
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 
 from readthedocs.core.resolver import (
     Resolver, resolve, resolve_domain, resolve_path
@@ -769,3 +772,61 @@ class TestSubprojectsWithTranslations(TestCase):
             ),
         )
         # yapf: enable
+
+
+@override_settings(PUBLIC_DOMAIN='readthedocs.org', RESOLVER_CACHE_TIMEOUT=60)
+class ResolverCacheTests(ResolverBase):
+
+    def setUp(self):
+        super(ResolverCacheTests, self).setUp()
+        cache.clear()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_resolve_path_is_cached(self):
+        with override_settings(USE_SUBDOMAIN=False):
+            url = resolve_path(project=self.subproject, version_slug='latest',
+                               private=False)
+            self.assertEqual(url, '/docs/pip/projects/sub/ja/latest/')
+            with self.assertNumQueries(0):
+                url = resolve_path(project=self.subproject,
+                                   version_slug='latest', private=False)
+            self.assertEqual(url, '/docs/pip/projects/sub/ja/latest/')
+
+    def test_domain_save_invalidates_cache(self):
+        with override_settings(USE_SUBDOMAIN=False):
+            self.assertEqual(resolve_domain(project=self.subproject),
+                             'readthedocs.org')
+            fixture.get(Domain, domain='docs.foobar.com', project=self.pip,
+                        canonical=True)
+            self.assertEqual(resolve_domain(project=self.subproject),
+                             'docs.foobar.com')
+
+    def test_resolve_many(self):
+        with override_settings(USE_SUBDOMAIN=True):
+            projects = [self.pip, self.subproject, self.translation]
+            expected = [resolve(project) for project in projects]
+            cache.clear()
+            urls = Resolver().resolve_many(projects)
+            self.assertEqual(list(urls.values()), expected)
+            self.assertEqual(
+                list(urls.keys()),
+                [project.pk for project in projects],
+            )
+
+    def test_resolve_many_constant_queries(self):
+        with override_settings(USE_SUBDOMAIN=True):
+            with mock.patch('readthedocs.projects.models.broadcast'):
+                extra = [
+                    fixture.get(Project, slug='extra-{0}'.format(num),
+                                main_language_project=None)
+                    for num in range(5)
+                ]
+            r = Resolver()
+            with CaptureQueriesContext(connection) as few_queries:
+                r.resolve_many([self.pip, self.subproject])
+            cache.clear()
+            with CaptureQueriesContext(connection) as many_queries:
+                r.resolve_many([self.pip, self.subproject] + extra)
+            self.assertEqual(len(few_queries), len(many_queries))
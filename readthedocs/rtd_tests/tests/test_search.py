@@ -3,16 +3,25 @@ from __future__ import (
     absolute_import, division, print_function, unicode_literals)
 
 import json
+import re
 
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
-from django.test import TestCase, RequestFactory
-from mock import patch
+from django.http import QueryDict
+from django.test import TestCase, RequestFactory, override_settings
+from elasticsearch import exceptions
+from mock import Mock, patch
 from urllib3._collections import HTTPHeaderDict
 
 from readthedocs.projects.models import Project
 from readthedocs.rtd_tests.mocks.search_mock_responses import (
     search_project_response, search_file_response
 )
+from readthedocs.search.cache import cached_search, invalidate_search_cache
+from readthedocs.search.indexes import Index
+from readthedocs.search.lib import (
+    InvalidSearchPage, add_result_links, decode_cursor, encode_cursor,
+    get_next_cursor, paginate)
 
 
 class TestSearch(TestCase):
@@ -150,3 +159,222 @@ class TestSearch(TestCase):
         self.assertEqual(main_hit['_type'], 'page')
         self.assertEqual(main_hit['fields']['project'], 'prova')
         self.assertEqual(main_hit['fields']['path'], '_docs/cap2')
+
+    @patch(
+        'elasticsearch.connection.http_urllib3.Urllib3HttpConnection.perform_request',
+        side_effect=perform_request_file_mock
+    )
+    def test_search_file_paginated(self, perform_request_mock):
+        r = self.client.get(
+            reverse('search'),
+            {'q': 'capitolo', 'type': 'file', 'page': 2}
+        )
+        self.assertEqual(r.status_code, 200)
+        response = perform_request_mock.call_args_list[0][0][3]
+        query_dict = json.loads(response)
+        self.assertEqual(query_dict['size'], 20)
+        self.assertEqual(query_dict['from'], 20)
+        self.assertEqual(
+            query_dict['highlight']['fields']['content'],
+            {'fragment_size': 150, 'number_of_fragments': 3}
+        )
+        self.assertEqual(r.context['page'].number, 2)
+        self.assertTrue(r.context['page'].has_previous())
+
+    @override_settings(SEARCH_PAGE_SIZE=1)
+    @patch(
+        'elasticsearch.connection.http_urllib3.Urllib3HttpConnection.perform_request',
+        side_effect=perform_request_file_mock
+    )
+    def test_search_file_next_page(self, perform_request_mock):
+        r = self.client.get(
+            reverse('search'),
+            {'q': 'capitolo & co', 'type': 'file', 'project': 'pip',
+             'taxonomy': 'foo bar'}
+        )
+        self.assertEqual(r.status_code, 200)
+        link = re.search(
+            r'class="next" href="\?([^"]+)"', r.content.decode('utf-8'))
+        querystring = link.group(1).replace('&amp;', '&')
+        self.assertEqual(
+            QueryDict(querystring).dict(),
+            {'q': 'capitolo & co', 'type': 'file', 'project': 'pip',
+             'taxonomy': 'foo bar', 'page': '2'}
+        )
+
+        r = self.client.get(reverse('search') + '?' + querystring)
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.context['page'].number, 2)
+        self.assertEqual(r.context['query'], 'capitolo & co')
+        self.assertEqual(r.context['project'], 'pip')
+        self.assertEqual(r.context['taxonomy'], 'foo bar')
+        query_dict = json.loads(perform_request_mock.call_args_list[-1][0][3])
+        self.assertEqual(query_dict['from'], 1)
+
+    @patch(
+        'elasticsearch.connection.http_urllib3.Urllib3HttpConnection.perform_request',
+        side_effect=perform_request_file_mock
+    )
+    def test_api_search_cursor(self, perform_request_mock):
+        cursor = encode_cursor([1.5, 'page#42'])
+        r = self.client.get(
+            reverse('api_search'),
+            {'q': 'capitolo', 'project': 'pip', 'size': 3, 'cursor': cursor}
+        )
+        self.assertEqual(r.status_code, 200)
+        response = perform_request_mock.call_args_list[0][0][3]
+        query_dict = json.loads(response)
+        self.assertEqual(query_dict['size'], 3)
+        self.assertEqual(query_dict['search_after'], [1.5, 'page#42'])
+        self.assertNotIn('from', query_dict)
+
+    def test_api_search_invalid_cursor(self):
+        r = self.client.get(
+            reverse('api_search'),
+            {'q': 'capitolo', 'project': 'pip', 'cursor': 'invalid'}
+        )
+        self.assertEqual(r.status_code, 400)
+
+
+class TestSearchPagination(TestCase):
+
+    def test_paginate_first_page(self):
+        body = paginate({})
+        self.assertEqual(body['size'], 20)
+        self.assertNotIn('from', body)
+        self.assertNotIn('search_after', body)
+        self.assertEqual(body['sort'], [{'_score': 'desc'}, {'_uid': 'asc'}])
+
+    @override_settings(SEARCH_MAX_PAGE_SIZE=30, SEARCH_MAX_RESULT_WINDOW=100)
+    def test_paginate_limits(self):
+        self.assertEqual(paginate({}, size=1000)['size'], 30)
+        self.assertEqual(paginate({}, size=10, page=10)['from'], 90)
+        with self.assertRaises(InvalidSearchPage):
+            paginate({}, size=10, page=11)
+        with self.assertRaises(InvalidSearchPage):
+            paginate({}, size=0)
+        with self.assertRaises(InvalidSearchPage):
+            paginate({}, page='first')
+
+    def test_cursor(self):
+        cursor = encode_cursor([2.0, 'page#1'])
+        self.assertEqual(decode_cursor(cursor), [2.0, 'page#1'])
+        with self.assertRaises(InvalidSearchPage):
+            decode_cursor('not a cursor')
+
+    def test_next_cursor(self):
+        results = {'hits': {'hits': [
+            {'sort': [3.0, 'page#1']},
+            {'sort': [2.0, 'page#2']},
+        ]}}
+        self.assertEqual(
+            decode_cursor(get_next_cursor(results, size=2)),
+            [2.0, 'page#2']
+        )
+        # a page that isn't full is the last one
+        self.assertIsNone(get_next_cursor(results, size=3))
+        self.assertIsNone(get_next_cursor(None))
+
+    def test_add_result_links(self):
+        results = {'hits': {'hits': [
+            {'_source': {'project': 'pip', 'version': 'latest',
+                         'path': 'index', 'base_url': 'http://pip/en/latest/'}},
+            {'_source': {'project': 'sub', 'version': 'latest', 'path': 'a'}},
+            {'_source': {'project': ['sub'], 'version': ['latest'],
+                         'path': ['b']}},
+        ]}}
+        calls = []
+
+        def get_base_url(project, version):
+            calls.append((project, version))
+            return 'http://{0}/{1}/'.format(project, version)
+
+        add_result_links(results, get_base_url)
+        hits = results['hits']['hits']
+        self.assertEqual(
+            [hit['fields']['link'] for hit in hits],
+            ['http://pip/en/latest/index', 'http://sub/latest/a',
+             'http://sub/latest/b'],
+        )
+        self.assertNotIn('_source', hits[0])
+        self.assertNotIn('base_url', hits[0]['fields'])
+        # the base URL is computed once per project and version
+        self.assertEqual(calls, [('sub', 'latest')])
+
+
+class TestIndex(TestCase):
+
+    def get_index(self):
+        index = Index()
+        index.es = Mock()
+        return index
+
+    def test_update_aliases(self):
+        index = self.get_index()
+        index.es.indices.get_alias.return_value = {'readthedocs-old': {}}
+        index.update_aliases('readthedocs-new')
+        index.es.indices.update_aliases.assert_called_once_with(body={
+            'actions': [
+                {'remove': {'index': 'readthedocs-old',
+                            'alias': 'readthedocs'}},
+                {'add': {'index': 'readthedocs-new', 'alias': 'readthedocs'}},
+            ],
+        })
+        index.es.indices.delete.assert_called_once_with(
+            index='readthedocs-old')
+
+    def test_update_aliases_replaces_index(self):
+        index = self.get_index()
+        index.es.indices.get_alias.side_effect = exceptions.NotFoundError
+        index.es.indices.exists.return_value = True
+        index.update_aliases('readthedocs-new')
+        index.es.indices.delete.assert_called_once_with(index='readthedocs')
+        index.es.indices.update_aliases.assert_called_once_with(body={
+            'actions': [
+                {'add': {'index': 'readthedocs-new', 'alias': 'readthedocs'}},
+            ],
+        })
+
+
+@override_settings(SEARCH_CACHE_TIMEOUT=60)
+class TestSearchCache(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.index = Mock(_index='readthedocs', _type='page')
+        self.index.search.return_value = {'hits': {'hits': []}}
+
+    def test_cached_search(self):
+        body = {'query': {'match': {'title': 'pip'}}, 'size': 20}
+        cached_search(self.index, body, ['pip'], routing='pip')
+        # equal bodies share the cached results
+        cached_search(
+            self.index, {'size': 20, 'query': {'match': {'title': 'pip'}}},
+            ['pip'], routing='pip')
+        self.assertEqual(self.index.search.call_count, 1)
+        self.index.search.assert_called_with(body, routing='pip')
+
+        cached_search(self.index, body, ['pip'], routing='other')
+        cached_search(self.index, body)
+        self.assertEqual(self.index.search.call_count, 3)
+
+    def test_invalidate_project(self):
+        body = {'query': {'match': {'title': 'pip'}}}
+        cached_search(self.index, body, ['pip'])
+        cached_search(self.index, body, ['other'])
+        cached_search(self.index, body)
+        self.assertEqual(self.index.search.call_count, 3)
+
+        invalidate_search_cache('pip')
+        cached_search(self.index, body, ['other'])
+        self.assertEqual(self.index.search.call_count, 3)
+        cached_search(self.index, body, ['pip'])
+        cached_search(self.index, body)
+        self.assertEqual(self.index.search.call_count, 5)
+
+    def test_invalidate_index(self):
+        body = {'query': {'match': {'title': 'pip'}}}
+        cached_search(self.index, body, ['pip'])
+        invalidate_search_cache()
+        cached_search(self.index, body, ['pip'])
+        self.assertEqual(self.index.search.call_count, 2)
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+from __future__ import (
+    absolute_import, division, print_function, unicode_literals)
+
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from mock import patch
+
+from readthedocs.core.middleware import ElasticsearchStatsMiddleware
+
+from readthedocs.search.client import (
+    get_es_client, get_es_stats, get_operation, reset_es_client,
+    reset_es_stats)
+from readthedocs.search.indexes import PageIndex, ProjectIndex
+
+
+class TestSearchClient(TestCase):
+
+    def setUp(self):
+        reset_es_client()
+        reset_es_stats()
+
+    def tearDown(self):
+        reset_es_client()
+
+    def test_client_is_shared(self):
+        self.assertIs(get_es_client(), get_es_client())
+        self.assertIs(PageIndex().es, ProjectIndex().es)
+
+    def test_client_is_recreated_after_fork(self):
+        client = get_es_client()
+        with patch('readthedocs.search.client.os.getpid', return_value=-1):
+            self.assertIsNot(get_es_client(), client)
+
+    @override_settings(ES_CLIENT_OPTIONS={'max_retries': 7})
+    def test_client_options(self):
+        self.assertEqual(get_es_client().transport.max_retries, 7)
+
+    def test_get_operation(self):
+        self.assertEqual(get_operation('GET', '/readthedocs/page/_search'), '_search')
+        self.assertEqual(get_operation('POST', '/_bulk?refresh=true'), '_bulk')
+        self.assertEqual(get_operation('PUT', '/readthedocs/project/1'), 'put')
+
+    @patch(
+        'elasticsearch.connection.http_urllib3.Urllib3HttpConnection.perform_request',
+        return_value=(200, {}, '{}'),
+    )
+    def test_stats(self, perform_request):
+        get_es_client().search(index='readthedocs', body={})
+        get_es_client().search(index='readthedocs', body={})
+        stats = get_es_stats()
+        self.assertEqual(stats['_search']['count'], 2)
+        self.assertEqual(stats['_search']['errors'], 0)
+
+    @patch('readthedocs.core.middleware.log')
+    @patch(
+        'elasticsearch.connection.http_urllib3.Urllib3HttpConnection.perform_request',
+        return_value=(200, {}, '{}'),
+    )
+    def test_stats_middleware(self, perform_request, log):
+        middleware = ElasticsearchStatsMiddleware()
+        get_es_client().search(index='readthedocs', body={})
+        request = RequestFactory().get('/search/')
+        middleware.process_request(request)
+        get_es_client().search(index='readthedocs', body={})
+        response = HttpResponse()
+        self.assertIs(middleware.process_response(request, response), response)
+        self.assertEqual(log.info.call_count, 1)
+        # only the request made while serving is counted
+        self.assertEqual(log.info.call_args[0][1:4], ('/search/', 1, 0))
+
+        request = RequestFactory().get('/')
+        middleware.process_request(request)
+        middleware.process_response(request, response)
+        self.assertEqual(log.info.call_count, 1)
@@ -3,7 +3,9 @@ import os
 
 from django.test import TestCase
 
-from readthedocs.search.parse_json import process_file
+from readthedocs.search.parse_json import (
+    find_json_files, get_changed_json_files, get_deleted_page_names,
+    get_page_names, iter_processed_files, process_file)
 
 base_dir = os.path.dirname(os.path.dirname(__file__))
 
@@ -20,3 +22,41 @@ class TestHacks(TestCase):
         # Only capture h2's after the first section
         for obj in data['sections'][1:]:
             self.assertEqual(obj['content'][:5], '\n<h2>')
+
+    def test_find_json_files(self):
+        files = list(find_json_files(os.path.join(base_dir, 'files')))
+        self.assertEqual(files, [os.path.join(base_dir, 'files', 'api.fjson')])
+
+    def test_iter_processed_files(self):
+        filenames = [
+            os.path.join(base_dir, 'files/api.fjson'),
+            os.path.join(base_dir, 'files/missing.fjson'),
+        ]
+        for processes in (1, 2):
+            pages = list(iter_processed_files(
+                filenames, processes=processes, batch_size=1))
+            self.assertEqual(len(pages), 1)
+            self.assertEqual(pages[0]['path'], 'api')
+
+    def test_get_page_names(self):
+        self.assertEqual(get_page_names('api/client.html'), ['api/client'])
+        self.assertEqual(
+            get_page_names('api/client/index.html'),
+            ['api/client/index', 'api/client'],
+        )
+        self.assertEqual(get_page_names('_static/style.css'), [])
+
+    def test_get_changed_json_files(self):
+        files = list(get_changed_json_files(
+            os.path.join(base_dir, 'files'),
+            ['api.html', 'missing.html', 'search.html'],
+        ))
+        self.assertEqual(files, [os.path.join(base_dir, 'files', 'api.fjson')])
+
+    def test_get_deleted_page_names(self):
+        # ``api.fjson`` exists, the page ``api`` wasn't built to api/index.html
+        names = get_deleted_page_names(
+            os.path.join(base_dir, 'files'),
+            ['api/index.html', 'gone.html'],
+        )
+        self.assertEqual(names, ['api/index', 'gone'])
@@ -152,6 +152,55 @@ class TestSyncVersions(TestCase):
         version_8 = Version.objects.get(slug='0.8.3')
         self.assertFalse(version_8.active)
 
+    def test_sync_versions_in_bulk(self):
+        version_post_data = {
+            'branches': [
+                {
+                    'identifier': 'origin/master',
+                    'verbose_name': 'master',
+                },
+            ],
+            'tags': [
+                {
+                    'identifier': 'new_identifier',
+                    'verbose_name': 'to_delete',
+                },
+                {
+                    'identifier': '1234',
+                    'verbose_name': 'release/1.0',
+                },
+                {
+                    'identifier': '5678',
+                    'verbose_name': 'release-1.0',
+                },
+            ],
+        }
+
+        r = self.client.post(
+            '/api/v2/project/{}/sync_versions/'.format(self.pip.pk),
+            data=json.dumps(version_post_data),
+            content_type='application/json',
+        )
+        json_data = json.loads(r.content)
+        self.assertEqual(
+            set(json_data['added_versions']),
+            {'release-1.0', 'release-1.0_a'},
+        )
+        self.assertEqual(json_data['deleted_versions'], [])
+        # Slugs are allocated like when versions are saved one by one
+        self.assertEqual(
+            Version.objects.get(project=self.pip, slug='release-1.0').identifier,
+            '1234',
+        )
+        self.assertEqual(
+            Version.objects.get(project=self.pip, slug='release-1.0_a').identifier,
+            '5678',
+        )
+        self.assertEqual(
+            Version.objects.get(project=self.pip, slug='to_delete').identifier,
+            'new_identifier',
+        )
+
 
 class TestStableVersion(TestCase):
     fixtures = ['eric', 'test_data']
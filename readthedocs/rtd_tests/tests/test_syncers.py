@@ -0,0 +1,93 @@
+"""Test the build artifacts syncers"""
+
+from __future__ import absolute_import
+
+import os
+import shutil
+import tempfile
+
+from django.test import TestCase
+from mock import patch
+
+from readthedocs.builds.syncers import LocalDeltaSyncer
+from readthedocs.projects.tasks import remove_dir
+
+
+class LocalDeltaSyncerTests(TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.source = os.path.join(self.root, 'artifacts')
+        self.target = os.path.join(self.root, 'rtd-builds', 'latest')
+        os.makedirs(os.path.join(self.source, '_static'))
+        self._write('index.html', 'index')
+        self._write('_static/style.css', 'body {}')
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def _write(self, relpath, content):
+        with open(os.path.join(self.source, relpath), 'w') as fd:
+            fd.write(content)
+
+    def _read(self, relpath):
+        with open(os.path.join(self.target, relpath)) as fd:
+            return fd.read()
+
+    def test_first_sync_copies_everything(self):
+        stats = LocalDeltaSyncer.copy(self.source, self.target)
+        self.assertEqual(stats['files_copied'], 2)
+        self.assertEqual(stats['bytes_copied'], len('index') + len('body {}'))
+        self.assertEqual(stats['files_linked'], 0)
+        self.assertEqual(self._read('index.html'), 'index')
+        self.assertEqual(self._read('_static/style.css'), 'body {}')
+        self.assertTrue(
+            os.path.exists(LocalDeltaSyncer.manifest_path(self.target)))
+
+    def test_only_changed_files_are_copied(self):
+        LocalDeltaSyncer.copy(self.source, self.target)
+        self._write('index.html', 'new index')
+        stats = LocalDeltaSyncer.copy(self.source, self.target)
+        self.assertEqual(stats['files_copied'], 1)
+        self.assertEqual(stats['bytes_copied'], len('new index'))
+        self.assertEqual(stats['files_linked'], 1)
+        self.assertEqual(self._read('index.html'), 'new index')
+
+    def test_removed_files_are_deleted(self):
+        LocalDeltaSyncer.copy(self.source, self.target)
+        os.remove(os.path.join(self.source, '_static/style.css'))
+        stats = LocalDeltaSyncer.copy(self.source, self.target)
+        self.assertEqual(stats['files_deleted'], 1)
+        self.assertEqual(stats['files_copied'], 0)
+        self.assertFalse(
+            os.path.exists(os.path.join(self.target, '_static/style.css')))
+        manifest, tree, link = sorted(os.listdir(os.path.dirname(self.target)))
+        self.assertTrue(tree.startswith('.latest.sync-'))
+        self.assertEqual(manifest, '.latest.manifest.json')
+        self.assertEqual(link, 'latest')
+        self.assertEqual(os.readlink(self.target), tree)
+
+    def test_existing_tree_without_manifest(self):
+        shutil.copytree(self.source, self.target)
+        stats = LocalDeltaSyncer.copy(self.source, self.target)
+        self.assertEqual(stats['files_copied'], 0)
+        self.assertEqual(stats['files_linked'], 2)
+
+    def test_existing_tree_restored_on_failure(self):
+        shutil.copytree(self.source, self.target)
+        with patch('readthedocs.builds.syncers.atomic_symlink',
+                   side_effect=OSError):
+            with self.assertRaises(OSError):
+                LocalDeltaSyncer.copy(self.source, self.target)
+        self.assertFalse(os.path.islink(self.target))
+        self.assertEqual(self._read('index.html'), 'index')
+        self.assertEqual(
+            sorted(os.listdir(os.path.dirname(self.target))), ['latest'])
+
+    def test_remove_published_tree(self):
+        LocalDeltaSyncer.copy(self.source, self.target)
+        remove_dir(self.target)
+        self.assertEqual(
+            os.listdir(os.path.dirname(self.target)),
+            ['.latest.manifest.json'],
+        )
@@ -0,0 +1,108 @@
+"""
+Cached search results.
+
+Results of the searches are cached for a short time, keyed on the search body
+and on generations bumped to make them stale:
+
+* the index generation, part of every key, changes when the whole index
+  does, e.g. after a full reindex or the removal of projects;
+* searches limited to some projects use the generation of each of them,
+  bumped when the project is indexed, see
+  :py:func:`readthedocs.restapi.utils.index_search_request`;
+* searches including any project use a generation bumped when any project
+  is indexed.
+
+Pages become searchable at the next refresh of the index: a search made
+between the invalidation and the refresh caches the previous results for
+the whole ``SEARCH_CACHE_TIMEOUT``.
+
+Django settings that can be defined:
+
+    `SEARCH_CACHE_TIMEOUT`: seconds the results of a search are cached, ``0``
+                            disables the cache
+"""
+
+from __future__ import absolute_import
+
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.encoding import force_bytes
+
+from readthedocs.core.utils import incr_cache_generation
+
+SEARCH_CACHE_KEY = 'search:{index}:{type}:{hash}'
+SEARCH_INDEX_GENERATION_KEY = 'search:generation'
+SEARCH_ALL_PROJECTS_GENERATION_KEY = 'search:generation:projects'
+SEARCH_PROJECT_GENERATION_KEY = 'search:generation:project:{project}'
+
+
+def get_search_cache_timeout():
+    return getattr(settings, 'SEARCH_CACHE_TIMEOUT', 60)
+
+
+def invalidate_search_cache(project_slug=None):
+    """
+    Make the cached results that can include ``project_slug`` stale
+
+    Without ``project_slug`` all the cached results are invalidated.
+    """
+    if project_slug:
+        incr_cache_generation(SEARCH_ALL_PROJECTS_GENERATION_KEY)
+        incr_cache_generation(
+            SEARCH_PROJECT_GENERATION_KEY.format(project=project_slug))
+    else:
+        incr_cache_generation(SEARCH_INDEX_GENERATION_KEY)
+
+
+def get_search_generations(project_slugs=None):
+    """Generations of the results of a search limited to ``project_slugs``"""
+    keys = [SEARCH_INDEX_GENERATION_KEY]
+    if project_slugs:
+        keys.extend(sorted(
+            SEARCH_PROJECT_GENERATION_KEY.format(project=slug)
+            for slug in set(project_slugs)
+        ))
+    else:
+        keys.append(SEARCH_ALL_PROJECTS_GENERATION_KEY)
+    generations = cache.get_many(keys)
+    return [generations.get(key, 0) for key in keys]
+
+
+def get_search_cache_key(index, body, project_slugs=None, **kwargs):
+    # Keys are sorted so equal bodies built in a different order match
+    data = json.dumps(
+        {
+            'body': body,
+            'kwargs': kwargs,
+            'generations': get_search_generations(project_slugs),
+        },
+        sort_keys=True,
+        separators=(',', ':'),
+    )
+    return SEARCH_CACHE_KEY.format(
+        index=index._index,
+        type=index._type,
+        hash=hashlib.md5(force_bytes(data)).hexdigest(),
+    )
+
+
+def cached_search(index, body, project_slugs=None, **kwargs):
+    """
+    Return the results of ``index.search(body, **kwargs)``, from the cache.
+
+    :param project_slugs: slugs of the projects the search is limited to,
+        ``None`` if the results can include any project
+    """
+    timeout = get_search_cache_timeout()
+    if not timeout:
+        return index.search(body, **kwargs)
+
+    key = get_search_cache_key(index, body, project_slugs, **kwargs)
+    results = cache.get(key)
+    if results is None:
+        results = index.search(body, **kwargs)
+        cache.set(key, results, timeout)
+    return results
@@ -0,0 +1,132 @@
+"""
+Shared Elasticsearch client.
+
+Creating an ``Elasticsearch`` instance sets up a new connection pool, so a
+single client is kept per process and reused by all the search code. The
+registry is keyed by process id: a forked worker (celery, uwsgi) creates its
+own client instead of sharing the sockets of its parent.
+
+Django settings that can be defined:
+
+    `ES_HOSTS`: A list of hosts where Elasticsearch lives.
+
+    `ES_CLIENT_OPTIONS`: A dict of options passed to the client, e.g.
+                         ``maxsize`` (connections per host), ``timeout``,
+                         ``max_retries`` and ``retry_on_timeout``.
+
+Every request sent by the client is timed and counted per operation, see
+:py:func:`get_es_stats`.
+"""
+from __future__ import absolute_import, division
+
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from elasticsearch import Elasticsearch, Transport
+
+log = logging.getLogger(__name__)
+
+DEFAULT_CLIENT_OPTIONS = {
+    'maxsize': 10,
+    'timeout': 10,
+    'max_retries': 3,
+    'retry_on_timeout': True,
+}
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+_stats = defaultdict(lambda: {'count': 0, 'errors': 0, 'time': 0.0})
+_stats_lock = threading.Lock()
+
+
+def get_operation(method, url):
+    """
+    Return a short name for the operation of a request.
+
+    This is the last ``_`` prefixed part of the URL (``_search``, ``_bulk``,
+    ``_delete_by_query``...) or the HTTP method for document operations.
+    """
+    for part in reversed(url.split('?')[0].strip('/').split('/')):
+        if part.startswith('_'):
+            return part
+    return method.lower()
+
+
+class InstrumentedTransport(Transport):
+
+    """Transport that records latency and errors of every request."""
+
+    def perform_request(self, method, url, *args, **kwargs):
+        operation = get_operation(method, url)
+        start = time.time()
+        failed = False
+        try:
+            return super(InstrumentedTransport, self).perform_request(
+                method, url, *args, **kwargs)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            elapsed = time.time() - start
+            with _stats_lock:
+                stats = _stats[operation]
+                stats['count'] += 1
+                stats['time'] += elapsed
+                if failed:
+                    stats['errors'] += 1
+            log.debug(
+                'Elasticsearch request: operation=%s time=%.3fs failed=%s',
+                operation, elapsed, failed,
+            )
+
+
+def get_client_options():
+    options = dict(DEFAULT_CLIENT_OPTIONS)
+    options.update(getattr(settings, 'ES_CLIENT_OPTIONS', {}))
+    return options
+
+
+def get_es_client():
+    """Return the Elasticsearch client of the current process."""
+    pid = os.getpid()
+    client = _clients.get(pid)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(pid)
+            if client is None:
+                # Clients inherited from the parent process are dropped
+                _clients.clear()
+                client = Elasticsearch(
+                    settings.ES_HOSTS,
+                    transport_class=InstrumentedTransport,
+                    **get_client_options()
+                )
+                _clients[pid] = client
+    return client
+
+
+def reset_es_client():
+    """Drop the client of the current process, e.g. after changing settings."""
+    with _clients_lock:
+        _clients.clear()
+
+
+def get_es_stats():
+    """
+    Return the request stats of the current process.
+
+    :returns: a dict keyed by operation, with the number of requests, the
+        number of failed ones and the total time spent, in seconds
+    """
+    with _stats_lock:
+        return dict((op, dict(stats)) for op, stats in _stats.items())
+
+
+def reset_es_stats():
+    with _stats_lock:
+        _stats.clear()
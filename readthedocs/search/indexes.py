@@ -6,6 +6,9 @@ Django settings that should be defined:
     `ES_HOSTS`: A list of hosts where Elasticsearch lives. E.g.
                 ['192.168.1.1:9200', '192.168.2.1:9200']
 
+    `ES_CLIENT_OPTIONS`: Options of the shared client, see
+                         :py:mod:`readthedocs.search.client`.
+
     `ES_DEFAULT_NUM_REPLICAS`: An integer of the number of replicas.
 
     `ES_DEFAULT_NUM_SHARDS`: An integer of the number of shards.
@@ -17,12 +20,17 @@ TODO: Handle page removal case in Page.
 from __future__ import absolute_import
 from builtins import object
 import datetime
+import logging
 
-from elasticsearch import Elasticsearch, exceptions
+from elasticsearch import exceptions
 from elasticsearch.helpers import bulk
 
 from django.conf import settings
 
+from readthedocs.search.client import get_es_client
+
+log = logging.getLogger(__name__)
+
 
 class Index(object):
 
@@ -34,7 +42,7 @@ class Index(object):
     _type = None
 
     def __init__(self):
-        self.es = Elasticsearch(settings.ES_HOSTS)
+        self.es = get_es_client()
 
     def get_settings(self, settings_override=None):
         """
@@ -92,7 +100,7 @@ class Index(object):
         return '{0}-{1}'.format(
             self._index, datetime.datetime.now().strftime('%Y%m%d%H%M%S'))
 
-    def create_index(self, index=None):
+    def create_index(self, index=None, settings_override=None):
         """
         Creates index.
 
@@ -101,7 +109,7 @@ class Index(object):
         """
         index = index or self._index
         body = {
-            'settings': self.get_settings(),
+            'settings': self.get_settings(settings_override),
         }
         self.es.indices.create(index=index, body=body)
 
@@ -137,6 +145,30 @@ class Index(object):
         # TODO: This doesn't work with the new ES setup.
         bulk(self.es, docs, chunk_size=chunk_size)
 
+    def bulk_delete(self, ids, index=None, chunk_size=500, routing=None):
+        """
+        Given a list of document ids, uses Elasticsearch bulk deletion.
+
+        Documents that are already missing from the index are ignored.
+        Returns the number of documents deleted.
+        """
+        index = index or self._index
+        docs = []
+        for doc_id in ids:
+            doc = {
+                '_op_type': 'delete',
+                '_index': index,
+                '_type': self._type,
+                '_id': doc_id,
+            }
+            if routing:
+                doc['_routing'] = routing
+            docs.append(doc)
+
+        deleted, _ = bulk(
+            self.es, docs, chunk_size=chunk_size, raise_on_error=False)
+        return deleted
+
     def index_document(self, data, index=None, parent=None, routing=None):
         doc = self.extract_document(data)
         kwargs = {
@@ -187,6 +219,13 @@ class Index(object):
         except exceptions.NotFoundError:
             pass
 
+        if not old_index and self.es.indices.exists(index=self._index):
+            # An index named like the alias, e.g. created by indexing before
+            # any alias existed, would make adding the alias fail
+            log.warning('Deleting index %s to replace it with an alias',
+                        self._index)
+            self.es.indices.delete(index=self._index)
+
         actions = []
         if old_index:
             actions.append({'remove': {'index': old_index,
@@ -287,6 +326,8 @@ class PageIndex(Index):
                     'weight': {'type': 'float'},
                     'progetto': {'type': 'keyword'},
                     'publisher': {'type': 'keyword'},
+                    # Canonical URL of the version, to link to the page
+                    'base_url': {'type': 'keyword', 'index': False},
                 }
             }
         }
@@ -297,7 +338,7 @@ class PageIndex(Index):
         doc = {}
 
         attrs = ('id', 'project_id', 'project', 'title', 'headers', 'version', 'path',
-                 'content', 'taxonomy', 'commit', 'progetto', 'publisher')
+                 'content', 'taxonomy', 'commit', 'progetto', 'publisher', 'base_url')
         for attr in attrs:
             doc[attr] = data.get(attr, '')
 
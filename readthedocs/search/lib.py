@@ -1,10 +1,14 @@
 """Utilities related to searching Elastic."""
 from __future__ import absolute_import
 from __future__ import print_function
+
+import base64
+import json
 from pprint import pprint
 
 from django.conf import settings
 
+from .cache import cached_search
 from .indexes import PageIndex, ProjectIndex, SectionIndex
 
 from readthedocs.builds.constants import LATEST
@@ -14,8 +18,180 @@ from readthedocs.search.signals import (before_project_search,
                                         before_section_search)
 
 
-def search_project(request, query, language=None, publisher=None, progetto=None):
-    """Search index for projects matching query."""
+class InvalidSearchPage(ValueError):
+
+    """Raised when the requested page or cursor cannot be used."""
+
+
+def normalize_query(query):
+    """Collapse the whitespace of a query, it doesn't change the results."""
+    return ' '.join(query.split())
+
+
+def get_page_size(size=None):
+    """
+    Return the number of results per page.
+
+    Falls back to ``SEARCH_PAGE_SIZE`` and never exceeds
+    ``SEARCH_MAX_PAGE_SIZE``.
+    """
+    max_size = getattr(settings, 'SEARCH_MAX_PAGE_SIZE', 100)
+    if size is None:
+        return getattr(settings, 'SEARCH_PAGE_SIZE', 20)
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        raise InvalidSearchPage('Invalid page size: {}'.format(size))
+    if size < 1:
+        raise InvalidSearchPage('Invalid page size: {}'.format(size))
+    return min(size, max_size)
+
+
+def encode_cursor(sort_values):
+    """Encode the sort values of a hit into an opaque cursor."""
+    data = json.dumps(sort_values, separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor returned by :py:func:`encode_cursor`."""
+    try:
+        data = base64.urlsafe_b64decode(cursor.encode('ascii'))
+        sort_values = json.loads(data.decode('utf-8'))
+    except (TypeError, ValueError, UnicodeError):
+        raise InvalidSearchPage('Invalid cursor: {}'.format(cursor))
+    if not isinstance(sort_values, list):
+        raise InvalidSearchPage('Invalid cursor: {}'.format(cursor))
+    return sort_values
+
+
+def paginate(body, size=None, page=None, cursor=None):
+    """
+    Add pagination to a search body.
+
+    Shallow pages use ``from``/``size``, up to ``SEARCH_MAX_RESULT_WINDOW``
+    results. Deeper results are reached with ``cursor``, the value returned
+    by :py:func:`get_next_cursor` for the previous page, which is passed to
+    Elasticsearch as ``search_after``.
+
+    Hits are sorted by score, with the document uid as tie breaker so the
+    sort values of the last hit identify a position in the results.
+    """
+    size = get_page_size(size)
+    body['size'] = size
+    body['sort'] = [
+        {'_score': 'desc'},
+        {'_uid': 'asc'},
+    ]
+    if cursor:
+        body['search_after'] = decode_cursor(cursor)
+        return body
+
+    try:
+        page = int(page or 1)
+    except (TypeError, ValueError):
+        raise InvalidSearchPage('Invalid page: {}'.format(page))
+    if page < 1:
+        raise InvalidSearchPage('Invalid page: {}'.format(page))
+    offset = (page - 1) * size
+    if offset + size > getattr(settings, 'SEARCH_MAX_RESULT_WINDOW', 1000):
+        raise InvalidSearchPage(
+            'Page {} is too deep, use a cursor instead'.format(page))
+    if offset:
+        body['from'] = offset
+    return body
+
+
+def get_next_cursor(results, size=None):
+    """
+    Return the cursor of the page following ``results``.
+
+    ``None`` is returned when ``results`` is the last page.
+    """
+    if not results:
+        return None
+    hits = results.get('hits', {}).get('hits', [])
+    if not hits or len(hits) < get_page_size(size):
+        return None
+    sort_values = hits[-1].get('sort')
+    if not sort_values:
+        return None
+    return encode_cursor(sort_values)
+
+
+def get_field(fields, name):
+    """Return a field of a hit, older indexes return a list of values."""
+    value = fields.get(name)
+    if isinstance(value, list):
+        return value[0] if value else None
+    return value
+
+
+def add_result_links(results, get_base_url):
+    """
+    Add the ``link`` of every page hit of ``results``.
+
+    Links are built from the ``base_url`` stored with the pages when they are
+    indexed. For the pages indexed before it was stored,
+    ``get_base_url(project_slug, version_slug)`` is called, once per project
+    and version. The ``_source`` of the hits is moved to ``fields``, as
+    attributes starting with an underscore can't be rendered.
+    """
+    base_urls = {}
+    for hit in results.get('hits', {}).get('hits', []):
+        fields = hit.pop('_source', {})
+        base_url = fields.pop('base_url', None)
+        if not base_url:
+            key = (get_field(fields, 'project'), get_field(fields, 'version'))
+            if key not in base_urls:
+                base_urls[key] = get_base_url(*key)
+            base_url = base_urls[key]
+        fields['link'] = base_url + get_field(fields, 'path')
+        hit['fields'] = fields
+    return results
+
+
+def get_highlight_options():
+    """Options limiting the highlighted fragments of long text fields."""
+    return {
+        'fragment_size': getattr(settings, 'SEARCH_HIGHLIGHT_FRAGMENT_SIZE', 150),
+        'number_of_fragments': getattr(settings, 'SEARCH_HIGHLIGHT_FRAGMENTS', 3),
+    }
+
+
+class SearchPage(object):
+
+    """Page of search results, as used by the pagination of the template."""
+
+    def __init__(self, number, size, total):
+        self.number = number
+        self.size = size
+        self.total = total
+
+    def has_previous(self):
+        return self.number > 1
+
+    def has_next(self):
+        max_results = getattr(settings, 'SEARCH_MAX_RESULT_WINDOW', 1000)
+        return self.number * self.size < min(self.total, max_results)
+
+    def previous_page_number(self):
+        return self.number - 1
+
+    def next_page_number(self):
+        return self.number + 1
+
+
+def search_project(request, query, language=None, publisher=None, progetto=None,
+                   size=None, page=None, cursor=None):
+    """
+    Search index for projects matching query.
+
+    ``size``, ``page`` and ``cursor`` select the page of results, see
+    :py:func:`paginate`. Results are cached, see
+    :py:mod:`readthedocs.search.cache`.
+    """
+    query = normalize_query(query)
     body = {
         "query": {
             "bool": {
@@ -40,12 +216,12 @@ def search_project(request, query, language=None, publisher=None, progetto=None)
         "highlight": {
             "fields": {
                 "name": {},
-                "description": {},
+                "description": get_highlight_options(),
             }
         },
         "_source": ["name", "slug", "description", "lang", "url", "publisher", "progetto"],
-        "size": 50  # TODO: Support pagination.
     }
+    paginate(body, size=size, page=page, cursor=cursor)
 
     final_filter = []
     if language:
@@ -58,11 +234,11 @@ def search_project(request, query, language=None, publisher=None, progetto=None)
 
     before_project_search.send(request=request, sender=ProjectIndex, body=body)
 
-    return ProjectIndex().search(body)
+    return cached_search(ProjectIndex(), body)
 
 
 def search_file(request, query, project_slug=None, version_slug=LATEST, taxonomy=None,
-                publisher=None, progetto=None):
+                publisher=None, progetto=None, size=None, page=None, cursor=None):
     """
     Search index for files matching query.
 
@@ -73,8 +249,16 @@ def search_file(request, query, project_slug=None, version_slug=LATEST, taxonomy
     :param project_slug: :py:class:`Project` slug
     :param version_slug: slug for :py:class:`Project` version slug
     :param taxonomy: taxonomy for search
+    :param size: number of results per page
+    :param page: page number, for shallow pagination
+    :param cursor: cursor returned by :py:func:`get_next_cursor`
+    :raises InvalidSearchPage: if the page or cursor are not valid
+
+    Results are cached, see :py:mod:`readthedocs.search.cache`.
     """
     kwargs = {}
+    project_slugs = None
+    query = normalize_query(query)
     body = {
         # avoid elastic search returning hits with very low score
         "min_score": getattr(settings, 'ES_SEARCH_FILE_MIN_SCORE', 1),
@@ -124,13 +308,14 @@ def search_file(request, query, project_slug=None, version_slug=LATEST, taxonomy
         "highlight": {
             "fields": {
                 "title": {},
-                "headers": {},
-                "content": {},
+                "headers": get_highlight_options(),
+                "content": get_highlight_options(),
             }
         },
-        "_source": ["title", "project", "version", "path", "publisher", "progetto"],
-        "size": 50  # TODO: Support pagination.
+        "_source": ["title", "project", "version", "path", "publisher", "progetto",
+                    "base_url"],
     }
+    paginate(body, size=size, page=page, cursor=cursor)
 
     if any([project_slug, version_slug, taxonomy, publisher, progetto]):
         final_filter = []
@@ -181,7 +366,7 @@ def search_file(request, query, project_slug=None, version_slug=LATEST, taxonomy
         print("After Signal")
         pprint(body)
 
-    return PageIndex().search(body, **kwargs)
+    return cached_search(PageIndex(), body, project_slugs, **kwargs)
 
 
 def search_section(request, query, project_slug=None, version_slug=LATEST,
@@ -7,38 +7,145 @@ import logging
 import codecs
 import fnmatch
 import json
+import multiprocessing
 import os
 
 from builtins import next, range  # pylint: disable=redefined-builtin
+from django.conf import settings
 from pyquery import PyQuery
 
+from readthedocs.core.utils import chunks
+
 log = logging.getLogger(__name__)
 
 
-def process_all_json_files(version, build_dir=True):
-    """Return a list of pages to index"""
+IGNORED_JSON_FILES = ['search.fjson', 'genindex.fjson', 'py-modindex.fjson']
+
+
+def find_json_files(full_path):
+    """Yield the path of every ``.fjson`` file to index under ``full_path``."""
+    for root, _, files in os.walk(full_path):
+        for filename in fnmatch.filter(files, '*.fjson'):
+            if filename in IGNORED_JSON_FILES:
+                continue
+            yield os.path.join(root, filename)
+
+
+def get_page_names(html_path):
+    """
+    Return the names of the pages that could have produced ``html_path``.
+
+    Page names are the ``current_page_name`` used as ``path`` in the index:
+    ``api/client.html`` comes from ``api/client``, while with the
+    ``dirhtml`` builder ``api/client/index.html`` comes from ``api/client``
+    too. Non HTML files don't map to any page.
+    """
+    if not html_path.endswith('.html'):
+        return []
+    names = [html_path[:-len('.html')]]
+    dirname, filename = os.path.split(html_path)
+    if filename == 'index.html' and dirname:
+        names.append(dirname)
+    return names
+
+
+def get_changed_json_files(full_path, html_paths):
+    """Yield the ``.fjson`` files under ``full_path`` built with ``html_paths``."""
+    for html_path in html_paths:
+        for name in get_page_names(html_path):
+            filename = os.path.join(full_path, '{0}.fjson'.format(name))
+            if os.path.basename(filename) in IGNORED_JSON_FILES:
+                continue
+            if os.path.exists(filename):
+                yield filename
+
+
+def get_deleted_page_names(full_path, html_paths):
+    """
+    Return the names of the pages gone with the deleted ``html_paths``.
+
+    A name whose ``.fjson`` file is still under ``full_path`` belongs to an
+    existing page: with the ``html`` builder deleting ``api/index.html``
+    removes ``api/index``, not the page ``api`` built to ``api.html``.
+    """
+    return [
+        name
+        for html_path in html_paths
+        for name in get_page_names(html_path)
+        if not os.path.exists(
+            os.path.join(full_path, '{0}.fjson'.format(name)))
+    ]
+
+
+def _process_file_safe(filename):
+    """Wrap :py:func:`process_file` so a broken page doesn't stop the pool."""
+    try:
+        return process_file(filename)
+    # we're unsure which exceptions can be raised
+    # pylint: disable=bare-except
+    except:
+        log.info('Unable to process file: %s', filename, exc_info=True)
+        return None
+
+
+def iter_processed_files(filenames, processes=None, batch_size=None):
+    """
+    Parse ``filenames`` in a process pool, yielding one page dict at a time.
+
+    Files are handed to the pool in batches of ``batch_size`` so that only a
+    bounded number of parsed pages is held in memory, regardless of how many
+    files there are. If the pool can't be started (e.g. inside a daemonic
+    celery worker) or only one process is requested, files are parsed in the
+    current process.
+    """
+    if processes is None:
+        processes = getattr(settings, 'SEARCH_INDEX_PROCESSES', None)
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    if batch_size is None:
+        batch_size = getattr(settings, 'SEARCH_INDEX_CHUNK_SIZE', 500)
+
+    pool = None
+    if processes > 1:
+        try:
+            pool = multiprocessing.Pool(processes)
+        except (AssertionError, OSError):
+            log.warning(
+                'Unable to start search parsing pool, parsing serially',
+                exc_info=True,
+            )
+
+    try:
+        for batch in chunks(filenames, batch_size):
+            if pool is not None:
+                results = pool.imap(_process_file_safe, batch)
+            else:
+                results = (_process_file_safe(filename) for filename in batch)
+            for result in results:
+                if result:
+                    yield result
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+
+def iter_all_json_files(version, build_dir=True, processes=None):
+    """Yield the pages to index for ``version``, parsing them in parallel."""
     if build_dir:
         full_path = version.project.full_json_path(version.slug)
     else:
         full_path = version.project.get_production_media_path(
             type_='json', version_slug=version.slug, include_file=False)
-    html_files = []
-    for root, _, files in os.walk(full_path):
-        for filename in fnmatch.filter(files, '*.fjson'):
-            if filename in ['search.fjson', 'genindex.fjson', 'py-modindex.fjson']:
-                continue
-            html_files.append(os.path.join(root, filename))
-    page_list = []
-    for filename in html_files:
-        try:
-            result = process_file(filename)
-            if result:
-                page_list.append(result)
-        # we're unsure which exceptions can be raised
-        # pylint: disable=bare-except
-        except:
-            pass
-    return page_list
+    return iter_processed_files(
+        find_json_files(full_path),
+        processes=processes,
+    )
+
+
+def process_all_json_files(version, build_dir=True):
+    """Return a list of pages to index"""
+    return list(iter_all_json_files(version, build_dir=build_dir))
 
 
 def process_headers(data, filename):
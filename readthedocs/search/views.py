@@ -44,21 +44,37 @@ def elastic_search(request):
         progetto=request.GET.get('progetto'),
     )
     results = ''
+    page = None
 
     facets = {}
 
+    try:
+        page_number = int(request.GET.get('page', 1))
+    except ValueError:
+        page_number = 1
+
     if user_input.query:
-        if user_input.type == 'project':
-            results = search_lib.search_project(
-                request, user_input.query, language=user_input.language,
-                publisher=user_input.publisher, progetto=user_input.progetto)
-        elif user_input.type == 'file':
-            results = search_lib.search_file(
-                request, user_input.query, project_slug=user_input.project,
-                version_slug=user_input.version, taxonomy=user_input.taxonomy,
-                progetto=user_input.progetto, publisher=user_input.publisher)
+        try:
+            if user_input.type == 'project':
+                results = search_lib.search_project(
+                    request, user_input.query, language=user_input.language,
+                    publisher=user_input.publisher, progetto=user_input.progetto,
+                    page=page_number)
+            elif user_input.type == 'file':
+                results = search_lib.search_file(
+                    request, user_input.query, project_slug=user_input.project,
+                    version_slug=user_input.version, taxonomy=user_input.taxonomy,
+                    progetto=user_input.progetto, publisher=user_input.publisher,
+                    page=page_number)
+        except search_lib.InvalidSearchPage:
+            log.debug('Invalid search page: %s', request.GET.get('page'))
 
     if results:
+        page = search_lib.SearchPage(
+            number=page_number,
+            size=search_lib.get_page_size(),
+            total=results['hits'].get('total', 0),
+        )
         # pre and post 1.0 compat
         for num, hit in enumerate(results['hits']['hits']):
             for key, val in list(hit['_source'].items()):
@@ -102,6 +118,7 @@ def elastic_search(request):
     template_vars.update({
         'results': results,
         'facets': facets,
+        'page': page,
     })
     return render(
         request,
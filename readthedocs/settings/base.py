@@ -136,6 +136,7 @@ class CommunityBaseSettings(Settings):
         'readthedocs.core.middleware.SubdomainMiddleware',
         'readthedocs.core.middleware.SingleVersionMiddleware',
         'corsheaders.middleware.CorsMiddleware',
+        'readthedocs.core.middleware.ElasticsearchStatsMiddleware',
     )
 
     AUTHENTICATION_BACKENDS = (
@@ -204,6 +205,31 @@ class CommunityBaseSettings(Settings):
         }
     }
     CACHE_MIDDLEWARE_SECONDS = 60
+    # Resolver data is invalidated by signals, this is just an upper bound
+    RESOLVER_CACHE_TIMEOUT = 60 * 60
+    # Cached footers are invalidated by builds and signals as well
+    FOOTER_CACHE_TIMEOUT = 60 * 60
+    # Rendered docs italia homepage and publisher listings
+    DOCSITALIA_LISTINGS_CACHE_TIMEOUT = 60 * 60
+    # Compiled project redirects, invalidated when redirects change. Each
+    # process keeps a copy for a few seconds to skip the cache round trip
+    REDIRECTS_CACHE_TIMEOUT = 60 * 60
+    REDIRECTS_LOCAL_CACHE_TIMEOUT = 10
+    # Sections of the indexed pages served by the embed API, replaced when
+    # the pages are indexed again
+    EMBED_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+    # Docs italia metadata files fetched from GitHub, refreshed with
+    # conditional requests
+    DOCSITALIA_METADATA_CACHE_TIMEOUT = 60 * 60 * 24
+    DOCSITALIA_METADATA_TIMEOUT = 10
+    # Publisher organizations synced at the same time from GitHub
+    DOCSITALIA_SYNC_CONCURRENCY = 4
+    # Removed docs italia projects cleared from the search index per request,
+    # and seconds between the checks of the progress of the page deletes
+    DOCSITALIA_ES_CLEANUP_CHUNK_SIZE = 500
+    DOCSITALIA_ES_CLEANUP_POLL_INTERVAL = 5
+    # Longest wait for the reset of an exhausted OAuth provider rate limit
+    OAUTH_RATE_LIMIT_MAX_WAIT = 60
 
     # I18n
     TIME_ZONE = 'America/Chicago'
@@ -266,6 +292,38 @@ class CommunityBaseSettings(Settings):
     DOCKER_ENABLE = False
     DOCKER_IMAGE = 'readthedocs/build:2.0'
 
+    # Documentation formats built at once after the HTML build. Docker builds
+    # are also bounded by the container memory, see
+    # DOCS_BUILD_MEMORY_PER_BUILDER
+    DOCS_BUILD_CONCURRENCY = 1
+    DOCS_BUILD_MEMORY_PER_BUILDER = '512m'
+
+    # Webhooks don't queue a new build while the version has one waiting to
+    # start, unless that one is older than this many seconds
+    BUILD_COALESCE_MAX_AGE = 60 * 60
+
+    # Build command output is read while commands run and saved in batches,
+    # see readthedocs.doc_builder.output
+    BUILD_COMMAND_OUTPUT_STREAMING = True
+    BUILD_COMMAND_OUTPUT_MAX_SIZE = 1024 * 1024
+    BUILD_COMMAND_OUTPUT_FLUSH_SIZE = 64 * 1024
+    BUILD_COMMAND_OUTPUT_FLUSH_INTERVAL = 5
+    # Command outputs longer than this are stored compressed
+    BUILD_COMMAND_OUTPUT_COMPRESS_SIZE = 64 * 1024
+
+    # Seconds the core requirements installed in a virtualenv are reused
+    # before being upgraded again
+    PYTHON_CORE_REQUIREMENTS_MAX_AGE = 60 * 60 * 24
+    # Shared directory of prebuilt wheels for the core requirements, it must
+    # be writable by the builders. Disabled when None
+    PYTHON_WHEELHOUSE_PATH = None
+
+    # Git checkouts: 'full' clones everything, 'shallow' fetches the last
+    # GIT_CLONE_DEPTH commits of the ref being built, 'partial' fetches all
+    # its commits but downloads file contents on checkout only
+    GIT_CLONE_STRATEGY = 'full'
+    GIT_CLONE_DEPTH = 50
+
     # All auth
     ACCOUNT_ADAPTER = 'readthedocs.core.adapters.AccountAdapter'
     ACCOUNT_EMAIL_REQUIRED = True
@@ -308,6 +366,10 @@ class CommunityBaseSettings(Settings):
 
     # RTD Settings
     REPO_LOCK_SECONDS = 30
+    # Threads used to hash the built files and rows per bulk query when
+    # reconciling ImportedFiles
+    IMPORTED_FILES_HASH_THREADS = 8
+    IMPORTED_FILES_BATCH_SIZE = 500
     ALLOW_PRIVATE_REPOS = False
     DEFAULT_PRIVACY_LEVEL = 'public'
     GROK_API_HOST = 'https://api.grokthedocs.com'
@@ -317,6 +379,30 @@ class CommunityBaseSettings(Settings):
     ES_HOSTS = ['127.0.0.1:9200']
     ES_DEFAULT_NUM_REPLICAS = 0
     ES_DEFAULT_NUM_SHARDS = 5
+    # Connection pool and retry policy of the shared client
+    ES_CLIENT_OPTIONS = {
+        'maxsize': 10,
+        'timeout': 10,
+        'max_retries': 3,
+        'retry_on_timeout': True,
+    }
+    # Pages parsed and sent to Elasticsearch per bulk request
+    SEARCH_INDEX_CHUNK_SIZE = 500
+    # Processes used to parse pages for indexing, ``None`` uses all the CPUs
+    SEARCH_INDEX_PROCESSES = None
+    # Seconds a full reindex waits for the new index to be ready for search
+    ES_REINDEX_WARM_TIMEOUT = 600
+    # Search results per page, the ``size`` parameter can't exceed the max
+    SEARCH_PAGE_SIZE = 20
+    SEARCH_MAX_PAGE_SIZE = 100
+    # Deepest result reachable with page numbers, use cursors past it
+    SEARCH_MAX_RESULT_WINDOW = 1000
+    # Highlighted fragments returned for long fields
+    SEARCH_HIGHLIGHT_FRAGMENT_SIZE = 150
+    SEARCH_HIGHLIGHT_FRAGMENTS = 3
+    # Search results are cached for a short time, indexing a project
+    # invalidates the results that can include it
+    SEARCH_CACHE_TIMEOUT = 60
 
     ALLOWED_HOSTS = ['*']
 
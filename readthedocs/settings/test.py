@@ -17,6 +17,17 @@ class CommunityTestSettings(CommunityDevSettings):
     DEBUG = False
     TEMPLATE_DEBUG = False
 
+    # The test cache outlives the database rollbacks between tests
+    RESOLVER_CACHE_TIMEOUT = 0
+    FOOTER_CACHE_TIMEOUT = 0
+    DOCSITALIA_LISTINGS_CACHE_TIMEOUT = 0
+    REDIRECTS_CACHE_TIMEOUT = 0
+    REDIRECTS_LOCAL_CACHE_TIMEOUT = 0
+    SEARCH_CACHE_TIMEOUT = 0
+
+    # Most build tests mock ``Popen.communicate`` and ``exec_start``
+    BUILD_COMMAND_OUTPUT_STREAMING = False
+
     @property
     def LOGGING(self):  # noqa - avoid pep8 N802
         logging = super(CommunityDevSettings, self).LOGGING
@@ -5,11 +5,13 @@ from __future__ import (
     absolute_import, division, print_function, unicode_literals)
 
 import csv
+import io
 import logging
 import os
 import re
 
 import git
+from django.conf import settings
 from django.core.exceptions import ValidationError
 from git.exc import BadName
 from six import PY2, StringIO
@@ -20,10 +22,82 @@ from readthedocs.vcs_support.base import BaseVCS, VCSVersion
 
 log = logging.getLogger(__name__)
 
+# Clone strategies, see ``GIT_CLONE_STRATEGY``
+CLONE_FULL = 'full'
+CLONE_SHALLOW = 'shallow'
+CLONE_PARTIAL = 'partial'
+
+
+class RefIndex(object):
+
+    """
+    Snapshot of the refs of a git repository.
+
+    The refs are read once from ``packed-refs`` and from the loose ref files,
+    loose refs taking precedence like in git. Symbolic refs are skipped.
+
+    :param git_dir: path to the ``.git`` directory
+    """
+
+    def __init__(self, git_dir):
+        self.git_dir = git_dir
+        self.refs = {}
+        self.read_packed_refs()
+        self.read_loose_refs()
+
+    def read_packed_refs(self):
+        try:
+            with io.open(os.path.join(self.git_dir, 'packed-refs'),
+                         encoding='utf-8') as packed_refs:
+                for line in packed_refs:
+                    # Skip the header and the peeled commits of tags
+                    if line.startswith(('#', '^')):
+                        continue
+                    row = line.split()
+                    if len(row) == 2:
+                        self.refs[row[1]] = row[0]
+        except IOError:
+            pass
+
+    def read_loose_refs(self):
+        refs_dir = os.path.join(self.git_dir, 'refs')
+        for root, _, files in os.walk(refs_dir):
+            for filename in files:
+                path = os.path.join(root, filename)
+                try:
+                    with io.open(path, encoding='utf-8') as ref_file:
+                        value = ref_file.read().strip()
+                except (IOError, UnicodeDecodeError):
+                    continue
+                if not value or value.startswith('ref:'):
+                    continue
+                name = os.path.relpath(path, self.git_dir).replace(os.sep, '/')
+                self.refs[name] = value
+
+    def get(self, name):
+        """Return the object id of the full ref ``name``, or ``None``."""
+        return self.refs.get(name)
+
+    def with_prefix(self, prefix):
+        """Return the sorted ``(name, object id)`` of refs under ``prefix``."""
+        return sorted(
+            (name[len(prefix):], object_id)
+            for name, object_id in self.refs.items()
+            if name.startswith(prefix)
+        )
+
 
 class Backend(BaseVCS):
 
-    """Git VCS backend."""
+    """
+    Git VCS backend.
+
+    By default the whole repository is cloned and fetched. With the
+    ``GIT_CLONE_STRATEGY`` setting set to ``shallow`` (the last
+    ``GIT_CLONE_DEPTH`` commits) or ``partial`` (all the commits, file
+    contents downloaded on checkout) only the ref being built is fetched, and
+    tags and branches are listed from the remote.
+    """
 
     supports_tags = True
     supports_branches = True
@@ -33,6 +107,10 @@ class Backend(BaseVCS):
         super(Backend, self).__init__(*args, **kwargs)
         self.token = kwargs.get('token', None)
         self.repo_url = self._get_clone_url()
+        self.clone_strategy = getattr(
+            settings, 'GIT_CLONE_STRATEGY', CLONE_FULL)
+        self._remote_refs = None
+        self._ref_index = None
 
     def _get_clone_url(self):
         if '://' in self.repo_url:
@@ -86,10 +164,110 @@ class Backend(BaseVCS):
         return True
 
     def fetch(self):
+        self._ref_index = None
         code, _, _ = self.run('git', 'fetch', '--tags', '--prune')
         if code != 0:
             raise RepositoryError
 
+    @property
+    def ref_index(self):
+        """
+        Snapshot of the local refs, see :py:class:`RefIndex`.
+
+        It's taken on first use and renewed after fetching.
+        """
+        if self._ref_index is None:
+            self._ref_index = RefIndex(os.path.join(self.working_dir, '.git'))
+        return self._ref_index
+
+    def get_fetch_options(self):
+        """Options limiting what clone and fetch download."""
+        if self.clone_strategy == CLONE_SHALLOW:
+            return ['--depth', str(getattr(settings, 'GIT_CLONE_DEPTH', 50))]
+        if self.clone_strategy == CLONE_PARTIAL:
+            return ['--filter=blob:none']
+        return []
+
+    def fetch_ref(self, identifier):
+        """
+        Fetch only the branch, tag or commit ``identifier``.
+
+        Falls back to fetching everything if the remote refuses the ref, e.g.
+        a commit not pointed by any ref.
+        """
+        ref = identifier
+        if ref.startswith('origin/'):
+            ref = ref[len('origin/'):]
+
+        refs = dict(self.remote_refs)
+        tags_by_commit = dict(
+            (commit, name) for name, commit in self.remote_refs
+            if name.startswith('refs/tags/')
+        )
+        if 'refs/heads/' + ref in refs:
+            refspec = '+refs/heads/{0}:refs/remotes/origin/{0}'.format(ref)
+        elif 'refs/tags/' + ref in refs:
+            refspec = '+refs/tags/{0}:refs/tags/{0}'.format(ref)
+        elif ref in tags_by_commit:
+            refspec = '+{0}:{0}'.format(tags_by_commit[ref])
+        else:
+            refspec = ref
+
+        self._ref_index = None
+        cmd = ['git', 'fetch'] + self.get_fetch_options() + ['origin', refspec]
+        code, _, _ = self.run(*cmd)
+        if code != 0:
+            log.warning(
+                'Failed to fetch ref, fetching everything: ref=%s', identifier)
+            cmd = ['git', 'fetch', '--tags', '--prune']
+            # Checkouts made with another strategy can be complete already,
+            # git refuses to unshallow them
+            if os.path.exists(
+                    os.path.join(self.working_dir, '.git', 'shallow')):
+                cmd.append('--unshallow')
+            # The clone only tracks the default branch
+            cmd.extend(['origin', '+refs/heads/*:refs/remotes/origin/*'])
+            code, _, _ = self.run(*cmd)
+            if code != 0:
+                raise RepositoryError
+
+    @property
+    def remote_refs(self):
+        """List of ``(ref name, commit)`` of the branches and tags of origin."""
+        if self._remote_refs is None:
+            retcode, stdout, _ = self.run(
+                'git',
+                'ls-remote',
+                '--heads',
+                '--tags',
+                'origin',
+                record_as_success=True,
+            )
+            if retcode != 0:
+                return []
+            self._remote_refs = self.parse_remote_refs(stdout)
+        return self._remote_refs
+
+    def parse_remote_refs(self, data):
+        """
+        Parse output of git ls-remote, eg:
+
+            bd533a768ff661991a689d3758fcfe72f455435d refs/heads/master
+            3b32886c8d3cb815df3793b3937b2e91d0fb00f1 refs/tags/2.0.0
+            c0288a17899b2c6818f74e3a90b77e2a1779f96a refs/tags/2.0.0^{}
+
+        Peeled tags (``^{}``) are skipped, tags are identified by the same
+        object as with ``git show-ref``.
+        """
+        refs = []
+        for line in data.splitlines():
+            row = line.split()
+            if len(row) != 2 or row[1].endswith('^{}'):
+                continue
+            commit_hash, name = row
+            refs.append((name, commit_hash))
+        return refs
+
     def checkout_revision(self, revision=None):
         if not revision:
             branch = self.default_branch or self.fallback_branch
@@ -113,25 +291,31 @@ class Backend(BaseVCS):
         # TODO remove with https://github.com/rtfd/readthedocs-build/issues/30
         from readthedocs.projects.models import Feature
         cmd = ['git', 'clone']
-        if not self.project.has_feature(Feature.SKIP_SUBMODULES):
+        if self.clone_strategy != CLONE_FULL:
+            # Only the default branch, the ref to build is fetched by
+            # ``fetch_ref`` and submodules are updated after the checkout
+            cmd.extend(['--no-checkout', '--single-branch'])
+            cmd.extend(self.get_fetch_options())
+        elif not self.project.has_feature(Feature.SKIP_SUBMODULES):
             cmd.append('--recursive')
         cmd.extend([self.repo_url, '.'])
+        self._ref_index = None
         code, _, _ = self.run(*cmd)
         if code != 0:
             raise RepositoryError
 
     @property
     def tags(self):
-        retcode, stdout, _ = self.run(
-            'git',
-            'show-ref',
-            '--tags',
-            record_as_success=True,
-        )
-        # error (or no tags found)
-        if retcode != 0:
-            return []
-        return self.parse_tags(stdout)
+        if self.clone_strategy != CLONE_FULL:
+            return [
+                VCSVersion(self, commit_hash, name.replace('refs/tags/', ''))
+                for name, commit_hash in self.remote_refs
+                if name.startswith('refs/tags/')
+            ]
+        return [
+            VCSVersion(self, commit_hash, name)
+            for name, commit_hash in self.ref_index.with_prefix('refs/tags/')
+        ]
 
     def parse_tags(self, data):
         """
@@ -165,17 +349,22 @@ class Backend(BaseVCS):
 
     @property
     def branches(self):
+        if self.clone_strategy != CLONE_FULL:
+            return [
+                VCSVersion(
+                    self,
+                    'origin/' + name.replace('refs/heads/', ''),
+                    name.replace('refs/heads/', ''),
+                )
+                for name, _ in self.remote_refs
+                if name.startswith('refs/heads/')
+            ]
         # Only show remote branches
-        retcode, stdout, _ = self.run(
-            'git',
-            'branch',
-            '-r',
-            record_as_success=True,
-        )
-        # error (or no branches found)
-        if retcode != 0:
-            return []
-        return self.parse_branches(stdout)
+        return [
+            VCSVersion(self, 'origin/' + name, name)
+            for name, _ in self.ref_index.with_prefix('refs/remotes/origin/')
+            if name != 'HEAD'
+        ]
 
     def parse_branches(self, data):
         """
@@ -222,7 +411,8 @@ class Backend(BaseVCS):
         # Clone or update repository
         if self.repo_exists():
             self.set_remote_url(self.repo_url)
-            self.fetch()
+            if self.clone_strategy == CLONE_FULL:
+                self.fetch()
         else:
             self.make_clean_working_dir()
             self.clone()
@@ -231,6 +421,9 @@ class Backend(BaseVCS):
         if not identifier:
             identifier = self.default_branch or self.fallback_branch
 
+        if self.clone_strategy != CLONE_FULL:
+            self.fetch_ref(identifier)
+
         identifier = self.find_ref(identifier)
 
         # Checkout the correct identifier for this branch.
@@ -274,6 +467,12 @@ class Backend(BaseVCS):
         return ref
 
     def ref_exists(self, ref):
+        # Ref names are looked up in the index, other revisions (commits,
+        # relative revisions...) are resolved by git
+        if ref.startswith(('refs/', 'remotes/', 'tags/', 'heads/')):
+            if not ref.startswith('refs/'):
+                ref = 'refs/' + ref
+            return self.ref_index.get(ref) is not None
         try:
             r = git.Repo(self.working_dir)
             if r.commit(ref):